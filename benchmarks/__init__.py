@@ -0,0 +1 @@
+"""SoraGiri (空斬り) benchmarks - run from the repo root with `python -m benchmarks.<name>`"""
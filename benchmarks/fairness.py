@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+SoraGiri (空斬り) - Queue fairness between guilds
+
+Replays one burst against the JobQueue three times: one busy guild
+floods the queue with bulk mentions while a few quiet guilds send single
+slices after it. Jobs are simulated (a fixed sleep), so no API is
+involved.
+The first run puts every job in one line (first come, first served), the
+second shares workers fairly between guilds, and the third also runs the
+quiet guilds' interactive slices ahead of the bulk ones. It reports jobs
+and p50/p95/p99 queue wait for the busy and the quiet guilds.
+
+Usage:
+    python -m benchmarks.fairness
+    python -m benchmarks.fairness --flood 200 --quiet 5 --workers 8
+"""
+
+import asyncio
+import argparse
+
+from cogs.soragiri.jobs import JobQueue
+from cogs.soragiri.scheduler import Priority
+
+
+async def run(fair: bool, tiers: bool, flood: int, quiet: int, workers: int, job_seconds: float) -> dict:
+    queue = JobQueue(workers=workers, max_queue=0, per_user=0)
+    jobs = []
+
+    def submit(guild, user, priority):
+        # One shared tenant makes the scheduler plain FIFO
+        tenant = (guild, user) if fair else ("all",)
+        priority = priority if tiers else Priority.INTERACTIVE
+        job = queue.submit(user, lambda: asyncio.sleep(job_seconds), tenant=tenant, priority=priority)
+        job.guild = guild
+        jobs.append(job)
+
+    # The busy guild's users each mention a handful of links at once
+    for i in range(flood):
+        submit("busy", f"busy-{i % 10}", Priority.BATCH)
+    await asyncio.sleep(job_seconds)
+    for guild in range(quiet):
+        for user in range(2):
+            submit(f"quiet-{guild}", f"quiet-{guild}-{user}", Priority.INTERACTIVE)
+
+    await asyncio.gather(*(job.done for job in jobs))
+    await queue.close()
+
+    waits = {}
+    for job in jobs:
+        waits.setdefault(job.guild, []).append(job.wait_time)
+    return waits
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def main(flood: int, quiet: int, workers: int, job_seconds: float) -> None:
+    print(f"{flood} bulk jobs from one guild, then 2 slices from each of {quiet} other guilds, "
+          f"{workers} workers, {job_seconds * 1000:.0f} ms per job")
+    for label, fair, tiers in (("fifo", False, False), ("fair share", True, False), ("fair share + tiers", True, True)):
+        waits = await run(fair, tiers, flood, quiet, workers, job_seconds)
+        print(f"\n  {label}")
+        quiet_waits = [w for guild, values in waits.items() if guild != "busy" for w in values]
+        for guild, values in (("busy", waits["busy"]), ("quiet", quiet_waits)):
+            print(
+                f"    {guild:<6} {len(values):4d} jobs  "
+                f"p50 {percentile(values, 0.5):6.2f}s  "
+                f"p95 {percentile(values, 0.95):6.2f}s  "
+                f"p99 {percentile(values, 0.99):6.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flood", type=int, default=100, help="Bulk jobs from the busy guild")
+    parser.add_argument("--quiet", type=int, default=4, help="Other guilds, two slices each")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--job-ms", type=int, default=20, help="Simulated time per job")
+    args = parser.parse_args()
+    asyncio.run(main(args.flood, args.quiet, args.workers, args.job_ms / 1000))
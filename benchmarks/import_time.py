@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+SoraGiri (空斬り) - Import time and CLI cold start
+
+Each case runs in a fresh interpreter, so nothing is already imported,
+and is repeated to take the median:
+
+    package      import cogs.soragiri
+    engine       from cogs.soragiri import SoraGiri
+    cli          import soragiri_cli
+    cli-eager    the same with cogs.soragiri.cog imported first, which is
+                 what every import cost while the package __init__ loaded
+                 the cog (and discord.py) eagerly
+    cog          from cogs.soragiri import SoraGiriCog
+
+For each it reports import time, peak RSS, modules loaded and whether
+discord.py came along. It then times whole processes from start to exit:
+`soragiri_cli.py --help` and `python -m cogs.soragiri --help`.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 20
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CASES = {
+    "package": "import cogs.soragiri",
+    "engine": "from cogs.soragiri import SoraGiri",
+    "cli": "import soragiri_cli",
+    "cli-eager": "import cogs.soragiri.cog; import soragiri_cli",
+    "cog": "from cogs.soragiri import SoraGiriCog",
+}
+
+COMMANDS = {
+    "soragiri_cli.py --help": [sys.executable, "soragiri_cli.py", "--help"],
+    "-m cogs.soragiri --help": [sys.executable, "-m", "cogs.soragiri", "--help"],
+}
+
+# Runs in the fresh interpreter: times the statement and reports on itself
+PROBE = """
+import sys, time, json, resource
+before = len(sys.modules)
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": (peak if sys.platform == "darwin" else peak * 1024) / (1024 * 1024),
+    "modules": len(sys.modules) - before,
+    "discord": "discord" in sys.modules,
+}}))
+"""
+
+
+def probe(statement: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def cold_start(command: list[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(command, cwd=ROOT, capture_output=True, check=True)
+    return time.perf_counter() - started
+
+
+def main(runs: int) -> None:
+    print(f"Import cost in a fresh interpreter (median of {runs})")
+    for name, statement in CASES.items():
+        try:
+            samples = [probe(statement) for _ in range(runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"  {name:<10} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        seconds = statistics.median(s["seconds"] for s in samples)
+        rss = statistics.median(s["rss_mb"] for s in samples)
+        print(f"  {name:<10} {seconds * 1000:7.1f} ms  rss {rss:6.1f} MB  "
+              f"{samples[0]['modules']:>4} modules  discord {'yes' if samples[0]['discord'] else 'no'}")
+
+    print(f"Process start to exit (median of {runs})")
+    for name, command in COMMANDS.items():
+        seconds = statistics.median(cold_start(command) for _ in range(runs))
+        print(f"  {name:<24} {seconds * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per case (default: 10)")
+    args = parser.parse_args()
+    main(args.runs)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+SoraGiri (空斬り) - Event-loop lag during concurrent downloads
+
+Serves a random file from a local aiohttp server (in a separate process,
+so serving doesn't count against the measured loop) and downloads it N
+times concurrently, while a ticker measures how late the event loop wakes
+up.
+Compares the original download path (8 KB chunks written synchronously
+on the loop) with the current RangedDownloader (batched writes on a
+writer thread), first over one connection per download and then over
+--parallelism ranges.
+
+Usage:
+    python -m benchmarks.loop_lag
+    python -m benchmarks.loop_lag --size-mb 128 --downloads 16
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+from cogs.soragiri.download import RangedDownloader
+
+
+TICK = 0.005  # ticker period (seconds)
+
+
+class LagMonitor:
+    """Records how late each TICK-second sleep wakes up"""
+
+    def __init__(self):
+        self.samples: list[float] = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + TICK
+            await asyncio.sleep(TICK)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def __enter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+    def summary(self) -> str:
+        ordered = sorted(self.samples) or [0.0]
+        p = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+        return (f"lag p50 {p(0.50):6.2f} ms  p99 {p(0.99):6.2f} ms  "
+                f"max {ordered[-1] * 1000:6.2f} ms  mean {statistics.mean(ordered) * 1000:5.2f} ms")
+
+
+async def legacy_download(session: aiohttp.ClientSession, url: str, output_path: Path) -> None:
+    """The original _download_video: 8 KB chunks, blocking writes on the loop"""
+    async with session.get(url) as resp:
+        with open(output_path, "wb") as f:
+            async for chunk in resp.content.iter_chunked(8192):
+                f.write(chunk)
+
+
+async def run(label: str, fetch, url: str, downloads: int, workdir: Path) -> None:
+    async with aiohttp.ClientSession() as session:
+        started = time.monotonic()
+        with LagMonitor() as monitor:
+            await asyncio.gather(*(
+                fetch(session, url, workdir / f"{label}_{i}.mp4") for i in range(downloads)
+            ))
+        elapsed = time.monotonic() - started
+
+    for path in workdir.glob(f"{label}_*"):
+        path.unlink()
+    print(f"  {label:<9} {elapsed:6.2f}s  {monitor.summary()}")
+
+
+def serve(source: Path, port: int) -> None:
+    """File server process"""
+    async def serve_file(request: web.Request) -> web.FileResponse:
+        return web.FileResponse(source)
+
+    app = web.Application()
+    app.router.add_get("/video.mp4", serve_file)  # also answers HEAD
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+async def wait_for_server(url: str) -> None:
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.head(url):
+                    return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("benchmark file server did not start")
+
+
+async def main(size_mb: int, downloads: int, parallelism: int, port: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        source = workdir / "source.bin"
+        source.write_bytes(os.urandom(size_mb * 1024 * 1024))
+
+        server = multiprocessing.Process(target=serve, args=(source, port), daemon=True)
+        server.start()
+        try:
+            url = f"http://127.0.0.1:{port}/video.mp4"
+            await wait_for_server(url)
+
+            print(f"{downloads} concurrent downloads of {size_mb} MB")
+            await run("legacy", legacy_download, url, downloads, workdir)
+            # Same connection count as legacy, so only the write path differs
+            single = RangedDownloader(parallelism=1)
+            await run("engine/1", single.fetch, url, downloads, workdir)
+            single.close()
+            ranged = RangedDownloader(parallelism=parallelism)
+            await run(f"engine/{parallelism}", ranged.fetch, url, downloads, workdir)
+            ranged.close()
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the served file (default: 64)")
+    parser.add_argument("--downloads", type=int, default=8, help="Concurrent downloads (default: 8)")
+    parser.add_argument("--parallelism", type=int, default=4, help="Ranges per engine download (default: 4)")
+    parser.add_argument("--port", type=int, default=8791, help="Port for the local file server (default: 8791)")
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb, args.downloads, args.parallelism, args.port))
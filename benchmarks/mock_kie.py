@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+SoraGiri (空斬り) - Mock Kie.ai server
+
+A local stand-in for the Kie.ai task API and its result CDN, for
+benchmarks and load tests that shouldn't spend credits:
+
+    POST /api/v1/jobs/createTask     create a task
+    GET  /api/v1/jobs/recordInfo     task status (waiting -> generating -> success/fail)
+                                     (tasks created with a callBackUrl also get
+                                     their final record POSTed to it)
+    GET  /files/<task>.mp4           result file (HEAD and Range supported)
+    GET  /stats                      request counters as JSON
+    POST /stats/reset                zero the counters
+
+Queue and processing delays, failure, 429 and lost-callback rates, a
+share of tasks stuck in the queue and the result size are configurable.
+Tasks can only be queried with the API key that created them, and keys
+listed as broke have no credits. Point an engine at it with
+SoraGiri(api_key, base_url="http://127.0.0.1:8790/api/v1").
+
+Usage:
+    python -m benchmarks.mock_kie --port 8790 --process-delay 2 --rate-429 0.05
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+
+@dataclass
+class MockConfig:
+    """How the mock behaves"""
+    queue_delay: float = 0.5        # seconds a task reports "waiting"
+    process_delay: float = 2.0      # seconds it then reports "generating"
+    jitter: float = 0.2             # +/- share of random variation on both delays
+    fail_rate: float = 0.0          # share of tasks that end in "fail"
+    rate_429: float = 0.0           # share of API calls answered with HTTP 429
+    retry_after: float = 0.2        # Retry-After sent with each 429 (seconds)
+    callback_loss: float = 0.0      # share of callbacks never sent
+    broke_keys: tuple = ()          # API keys answered with code 402 (no credits)
+    stuck_rate: float = 0.0         # share of tasks that get stuck in the queue
+    stuck_factor: float = 10.0      # how many times longer a stuck task waits
+    file_size: int = 2 * 1024 * 1024
+    seed: Optional[int] = None
+
+
+@dataclass
+class _Task:
+    created: float
+    queue_delay: float
+    process_delay: float
+    fails: bool
+    host: str
+    key: str
+
+
+class MockKie:
+    """The mock's state and request handlers"""
+
+    def __init__(self, config: MockConfig, file_path: Path):
+        """
+        Args:
+            config: Delays, error rates and file size
+            file_path: File served for every result (file_size bytes)
+        """
+        self.config = config
+        self.file_path = file_path
+        self.tasks: dict[str, _Task] = {}
+        self.counts: dict[str, int] = {}
+        self._random = random.Random(config.seed)
+        self._callbacks: set[asyncio.Task] = set()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/v1/jobs/createTask", self.create)
+        app.router.add_get("/api/v1/jobs/recordInfo", self.query)
+        app.router.add_route("HEAD", "/api/v1", self.ping)
+        app.router.add_get("/files/{name}", self.file)  # also answers HEAD
+        app.router.add_get("/stats", self.stats)
+        app.router.add_post("/stats/reset", self.reset)
+        app.on_cleanup.append(self._close)
+        return app
+
+    async def _close(self, app: web.Application) -> None:
+        for callback in self._callbacks:
+            callback.cancel()
+        if self._session is not None:
+            await self._session.close()
+
+    def _count(self, name: str) -> None:
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def _vary(self, seconds: float) -> float:
+        jitter = self.config.jitter
+        return max(0.0, seconds * self._random.uniform(1 - jitter, 1 + jitter))
+
+    def _queue_delay(self) -> float:
+        """Time in the queue for a new task; a stuck one waits stuck_factor times longer"""
+        seconds = self._vary(self.config.queue_delay)
+        if self._random.random() < self.config.stuck_rate:
+            self._count("stuck")
+            seconds *= self.config.stuck_factor
+        return seconds
+
+    def _throttled(self, endpoint: str) -> Optional[web.Response]:
+        """A 429 for this call, if the dice say so"""
+        if self._random.random() >= self.config.rate_429:
+            return None
+        self._count(f"{endpoint}_429")
+        return web.json_response(
+            {"code": 429, "message": "Too many requests"},
+            status=429,
+            headers={"Retry-After": str(self.config.retry_after)}
+        )
+
+    async def ping(self, request: web.Request) -> web.Response:
+        return web.Response()
+
+    async def create(self, request: web.Request) -> web.Response:
+        self._count("create")
+        throttled = self._throttled("create")
+        if throttled:
+            return throttled
+
+        key = self._key(request)
+        self._count(f"create_key_{key}")
+        if key in self.config.broke_keys:
+            self._count("create_402")
+            return web.json_response({"code": 402, "message": "Insufficient credits"})
+
+        body = await request.json()
+        if not body.get("input", {}).get("video_url"):
+            return web.json_response({"code": 422, "message": "video_url is required"})
+
+        task_id = f"mock{len(self.tasks) + 1:08d}"
+        task = self.tasks[task_id] = _Task(
+            created=time.monotonic(),
+            queue_delay=self._queue_delay(),
+            process_delay=self._vary(self.config.process_delay),
+            fails=self._random.random() < self.config.fail_rate,
+            host=request.host,
+            key=key
+        )
+
+        callback_url = body.get("callBackUrl")
+        if callback_url:
+            callback = asyncio.create_task(self._call_back(callback_url, task_id, task))
+            self._callbacks.add(callback)
+            callback.add_done_callback(self._callbacks.discard)
+
+        return web.json_response({"code": 200, "data": {"taskId": task_id}})
+
+    async def _call_back(self, url: str, task_id: str, task: _Task) -> None:
+        """POST the task's final record to its callBackUrl once it is done"""
+        finish = task.created + task.queue_delay + task.process_delay
+        await asyncio.sleep(max(0.0, finish - time.monotonic()) + 0.001)
+        if self._random.random() < self.config.callback_loss:
+            self._count("callback_lost")
+            return
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        self._count("callback")
+        try:
+            body = {"code": 200, "msg": "success", "data": self._record(task_id, task)}
+            async with self._session.post(url, json=body) as resp:
+                if resp.status != 200:
+                    self._count("callback_refused")
+        except aiohttp.ClientError:
+            self._count("callback_failed")
+
+    async def query(self, request: web.Request) -> web.Response:
+        self._count("query")
+        throttled = self._throttled("query")
+        if throttled:
+            return throttled
+
+        task_id = request.query.get("taskId", "")
+        task = self.tasks.get(task_id)
+        if task is None or task.key != self._key(request):
+            if task is not None:
+                self._count("query_wrong_key")
+            return web.json_response({"code": 404, "message": "task not found"})
+
+        return web.json_response({"code": 200, "data": self._record(task_id, task)})
+
+    @staticmethod
+    def _key(request: web.Request) -> str:
+        return request.headers.get("Authorization", "").removeprefix("Bearer ")
+
+    @staticmethod
+    def _record(task_id: str, task: _Task) -> dict:
+        """The task as recordInfo (and the callback) describes it right now"""
+        elapsed = time.monotonic() - task.created
+        if elapsed < task.queue_delay:
+            return {"taskId": task_id, "state": "waiting"}
+        if elapsed < task.queue_delay + task.process_delay:
+            return {"taskId": task_id, "state": "generating"}
+        if task.fails:
+            return {"taskId": task_id, "state": "fail", "failMsg": "mock failure"}
+        return {
+            "taskId": task_id,
+            "state": "success",
+            "costTime": int(task.process_delay * 1000),
+            "resultJson": json.dumps({"resultUrls": [f"http://{task.host}/files/{task_id}.mp4"]})
+        }
+
+    async def file(self, request: web.Request) -> web.StreamResponse:
+        self._count("file_head" if request.method == "HEAD" else "file")
+        return web.FileResponse(self.file_path)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"tasks": len(self.tasks), **self.counts})
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.counts.clear()
+        return web.json_response({})
+
+
+def run_server(config: MockConfig, port: int, host: str = "127.0.0.1") -> None:
+    """Run the mock until the process is stopped (e.g. as a multiprocessing target)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "result.mp4"
+        # Incompressible, like real video
+        file_path.write_bytes(random.Random(config.seed).randbytes(config.file_size))
+        web.run_app(MockKie(config, file_path).app(), host=host, port=port, print=None, access_log=None)
+
+
+async def wait_until_up(base_url: str, timeout: float = 10.0) -> None:
+    """Wait for a mock started in another process to accept requests"""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.head(base_url):
+                    return
+            except aiohttp.ClientError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"mock Kie.ai server at {base_url} did not start")
+                await asyncio.sleep(0.1)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Command-line options for MockConfig"""
+    defaults = MockConfig()
+    parser.add_argument("--queue-delay", type=float, default=defaults.queue_delay,
+                        help=f"Seconds a task waits in the queue (default: {defaults.queue_delay})")
+    parser.add_argument("--process-delay", type=float, default=defaults.process_delay,
+                        help=f"Seconds a task generates (default: {defaults.process_delay})")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter,
+                        help=f"Random +/- share on both delays (default: {defaults.jitter})")
+    parser.add_argument("--fail-rate", type=float, default=defaults.fail_rate,
+                        help="Share of tasks that fail (default: 0)")
+    parser.add_argument("--rate-429", type=float, default=defaults.rate_429,
+                        help="Share of API calls answered with 429 (default: 0)")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after,
+                        help=f"Retry-After seconds sent with a 429 (default: {defaults.retry_after})")
+    parser.add_argument("--callback-loss", type=float, default=defaults.callback_loss,
+                        help="Share of task callbacks never sent (default: 0)")
+    parser.add_argument("--broke-keys", default="",
+                        help="Comma-separated API keys answered with 402 (no credits)")
+    parser.add_argument("--stuck-rate", type=float, default=defaults.stuck_rate,
+                        help="Share of tasks stuck in the queue (default: 0)")
+    parser.add_argument("--stuck-factor", type=float, default=defaults.stuck_factor,
+                        help=f"Queue delay multiplier for stuck tasks (default: {defaults.stuck_factor})")
+    parser.add_argument("--file-mb", type=float, default=defaults.file_size / (1024 * 1024),
+                        help="Size of each result file in MB (default: 2)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed, for repeatable runs")
+
+
+def config_from(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        queue_delay=args.queue_delay,
+        process_delay=args.process_delay,
+        jitter=args.jitter,
+        fail_rate=args.fail_rate,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        callback_loss=args.callback_loss,
+        broke_keys=tuple(k for k in args.broke_keys.split(",") if k),
+        stuck_rate=args.stuck_rate,
+        stuck_factor=args.stuck_factor,
+        file_size=int(args.file_mb * 1024 * 1024),
+        seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8790, help="Port to listen on (default: 8790)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    config = config_from(args)
+    print(f"Mock Kie.ai on http://127.0.0.1:{args.port}/api/v1  {asdict(config)}")
+    run_server(config, args.port)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+SoraGiri (空斬り) - Engine throughput and latency
+
+Starts the mock Kie.ai server (benchmarks.mock_kie) in a separate process,
+so serving doesn't count against the measured loop, and drives the engine
+through each workload at several concurrency levels:
+
+    slice    slice() to a file: create, poll, ranged download
+    bytes    slice_to_bytes(): the whole video in memory
+    stream   slice_to_stream(): a spooled file
+    batch    slice_many() over the whole job list
+
+Every job uses a fresh video URL, so the result cache and request
+coalescing never short-cut the work. For each run it reports throughput,
+p50/p95/p99 latency (for batch: time until each result is yielded), API
+and file requests per job, 429s, peak RSS and event-loop lag. --json
+writes the numbers to a file for comparing engine changes. --webhook
+runs the engine in callback mode, with an embedded receiver the mock
+posts results to. --keys spreads the jobs over a pool of mock API keys.
+--hedge runs every case twice, without and with hedged resubmission of
+tasks stuck in the queue, and reports the hedge rate and the change in
+p99 latency (pair it with --stuck-rate, or there is little to hedge).
+
+Usage:
+    python -m benchmarks.throughput
+    python -m benchmarks.throughput --workloads slice,batch --concurrency 1,16,64 --jobs 128
+    python -m benchmarks.throughput --rate-429 0.05 --fail-rate 0.02 --json before.json
+    python -m benchmarks.throughput --webhook --callback-loss 0.01
+    python -m benchmarks.throughput --keys 3 --broke-keys bench-key-0 --rate-429 0.05
+    python -m benchmarks.throughput --hedge --stuck-rate 0.05 --workloads slice --jobs 200
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from pathlib import Path
+from typing import Optional
+
+import aiohttp
+
+from cogs.soragiri import SoraGiri
+from cogs.soragiri.cache import ResultCache
+from cogs.soragiri.webhook import WebhookReceiver
+from cogs.soragiri.hedge import HedgePolicy
+from benchmarks.loop_lag import LagMonitor
+from benchmarks.mock_kie import MockConfig, run_server, wait_until_up, add_arguments, config_from
+
+
+WORKLOADS = ("slice", "bytes", "stream", "batch")
+
+
+class RssMonitor:
+    """Samples resident memory and keeps the peak"""
+
+    INTERVAL = 0.05
+
+    def __init__(self):
+        self.peak = 0
+        self._task = None
+        self._page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def sample(self) -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page
+        except OSError:
+            # No procfs: the lifetime peak is the best there is (KB on Linux, bytes on macOS)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+
+    async def _run(self):
+        while True:
+            self.peak = max(self.peak, self.sample())
+            await asyncio.sleep(self.INTERVAL)
+
+    def __enter__(self):
+        self.peak = self.sample()
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+        self.peak = max(self.peak, self.sample())
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def mock_stats(session: aiohttp.ClientSession, root: str, reset: bool = False) -> dict:
+    if reset:
+        async with session.post(f"{root}/stats/reset") as resp:
+            return await resp.json()
+    async with session.get(f"{root}/stats") as resp:
+        return await resp.json()
+
+
+async def run_workload(
+    giri: SoraGiri,
+    workload: str,
+    urls: list[str],
+    concurrency: int,
+    workdir: Path
+) -> tuple[list[float], int]:
+    """Run one workload; returns (per-job latencies, successes)"""
+    latencies: list[float] = []
+    succeeded = 0
+
+    if workload == "batch":
+        started = time.monotonic()
+        async for result in giri.slice_many(urls, output_dir=workdir, concurrency=concurrency, use_cache=False):
+            latencies.append(time.monotonic() - started)
+            succeeded += result.success
+            if result.output_path:
+                Path(result.output_path).unlink(missing_ok=True)
+        return latencies, succeeded
+
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(index: int, url: str) -> None:
+        nonlocal succeeded
+        async with gate:
+            started = time.monotonic()
+            if workload == "slice":
+                path = workdir / f"job_{index}.mp4"
+                result = await giri.slice(url, path, use_cache=False)
+                path.unlink(missing_ok=True)
+                ok = result.success
+            elif workload == "bytes":
+                ok, _ = await giri.slice_to_bytes(url, use_cache=False)
+            else:
+                result = await giri.slice_to_stream(url, use_cache=False)
+                ok = result.success
+                if result.file:
+                    result.file.close()
+            latencies.append(time.monotonic() - started)
+            succeeded += ok
+
+    await asyncio.gather(*(one(i, url) for i, url in enumerate(urls)))
+    return latencies, succeeded
+
+
+async def bench(
+    api_root: str,
+    workload: str,
+    concurrency: int,
+    jobs: int,
+    poll_rate: float,
+    session: aiohttp.ClientSession,
+    run_id: int,
+    webhook_port: Optional[int] = None,
+    keys: int = 1,
+    hedge_ratio: Optional[float] = None
+) -> dict:
+    server_root = api_root.rsplit("/api/", 1)[0]
+    urls = [f"https://sora.chatgpt.com/p/bench-{run_id}-{i}" for i in range(jobs)]
+    await mock_stats(session, server_root, reset=True)
+    gc.collect()
+
+    webhook = None
+    if webhook_port:
+        webhook = WebhookReceiver(f"http://127.0.0.1:{webhook_port}/callback", port=webhook_port, host="127.0.0.1")
+
+    # Quick to learn, so short runs hedge too
+    hedging = None
+    if hedge_ratio is not None:
+        hedging = HedgePolicy(percentile=0.9, max_ratio=hedge_ratio, min_delay=0.0, min_samples=8)
+
+    api_key = ",".join(f"bench-key-{i}" for i in range(keys)) if keys > 1 else "bench"
+    async with SoraGiri(
+        api_key, base_url=api_root, poll_rate=poll_rate, cache=ResultCache(), webhook=webhook,
+        hedging=hedging
+    ) as giri:
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.monotonic()
+            with LagMonitor() as lag, RssMonitor() as rss:
+                latencies, succeeded = await run_workload(giri, workload, urls, concurrency, Path(tmp))
+            elapsed = time.monotonic() - started
+
+    stats = await mock_stats(session, server_root)
+    ordered = sorted(latencies)
+    lag_samples = sorted(lag.samples) or [0.0]
+    return {
+        "workload": workload,
+        "concurrency": concurrency,
+        "hedging": hedging is not None,
+        "jobs": jobs,
+        "succeeded": succeeded,
+        "seconds": elapsed,
+        "jobs_per_second": jobs / elapsed if elapsed else 0.0,
+        "latency_p50": percentile(ordered, 0.50),
+        "latency_p95": percentile(ordered, 0.95),
+        "latency_p99": percentile(ordered, 0.99),
+        "creates_per_job": stats.get("create", 0) / jobs,
+        "queries_per_job": stats.get("query", 0) / jobs,
+        "callbacks_per_job": stats.get("callback", 0) / jobs,
+        "file_requests_per_job": (stats.get("file", 0) + stats.get("file_head", 0)) / jobs,
+        "stuck_per_job": stats.get("stuck", 0) / jobs,
+        "hedges_per_job": hedging.hedge_rate if hedging else 0.0,
+        "hedge_wins": hedging.hedge_wins if hedging else 0,
+        "throttled": stats.get("create_429", 0) + stats.get("query_429", 0),
+        "peak_rss_mb": rss.peak / (1024 * 1024),
+        "lag_p99_ms": percentile(lag_samples, 0.99) * 1000,
+        "lag_max_ms": lag_samples[-1] * 1000
+    }
+
+
+def print_row(row: dict) -> None:
+    print(
+        f"  {row['workload']:<7} c={row['concurrency']:<4} {row['succeeded']:>4}/{row['jobs']:<4} "
+        f"{row['jobs_per_second']:7.2f} jobs/s  "
+        f"p50 {row['latency_p50']:6.2f}s p95 {row['latency_p95']:6.2f}s p99 {row['latency_p99']:6.2f}s  "
+        f"req/job {row['creates_per_job']:.2f}c {row['queries_per_job']:.2f}q {row['file_requests_per_job']:.2f}f"
+        f"{' %.2fcb' % row['callbacks_per_job'] if row['callbacks_per_job'] else ''}  "
+        f"{'hedged %.1f%% (%d won)  ' % (row['hedges_per_job'] * 100, row['hedge_wins']) if row['hedging'] else ''}"
+        f"429s {row['throttled']:<3}  rss {row['peak_rss_mb']:6.1f} MB  "
+        f"lag p99 {row['lag_p99_ms']:6.2f} ms max {row['lag_max_ms']:6.2f} ms"
+    )
+
+
+async def main(
+    config: MockConfig,
+    workloads: list[str],
+    levels: list[int],
+    jobs: Optional[int],
+    poll_rate: float,
+    port: int,
+    json_path: Optional[Path],
+    webhook: bool = False,
+    keys: int = 1,
+    hedge_ratio: Optional[float] = None
+) -> None:
+    server = multiprocessing.Process(target=run_server, args=(config, port), daemon=True)
+    server.start()
+    rows = []
+    try:
+        api_root = f"http://127.0.0.1:{port}/api/v1"
+        await wait_until_up(api_root)
+
+        print(f"Mock Kie.ai: queue {config.queue_delay}s, process {config.process_delay}s, "
+              f"fail {config.fail_rate:.0%}, 429 {config.rate_429:.0%}, "
+              f"{config.file_size / (1024 * 1024):.1f} MB results; poll_rate {poll_rate}/s"
+              f"{'; webhook mode' if webhook else ''}{f'; {keys} API keys' if keys > 1 else ''}"
+              f"{f'; {config.stuck_rate:.0%} stuck x{config.stuck_factor:g}' if config.stuck_rate else ''}")
+        async with aiohttp.ClientSession() as session:
+            for workload in workloads:
+                for concurrency in levels:
+                    count = jobs or max(8, concurrency * 4)
+                    for ratio in ([None, hedge_ratio] if hedge_ratio is not None else [None]):
+                        row = await bench(
+                            api_root, workload, concurrency, count, poll_rate, session, len(rows),
+                            webhook_port=port + 1 if webhook else None, keys=keys, hedge_ratio=ratio
+                        )
+                        print_row(row)
+                        rows.append(row)
+                    if hedge_ratio is not None:
+                        before, after = rows[-2]["latency_p99"], rows[-1]["latency_p99"]
+                        change = (after - before) / before if before else 0.0
+                        print(f"  {'':<7} hedging: p99 {before:.2f}s -> {after:.2f}s ({change:+.1%}), "
+                              f"{rows[-1]['hedges_per_job']:.1%} of tasks hedged")
+    finally:
+        server.terminate()
+        server.join()
+
+    if json_path:
+        json_path.write_text(json.dumps(
+            {"mock": config.__dict__, "poll_rate": poll_rate, "webhook": webhook, "keys": keys,
+             "hedge_ratio": hedge_ratio, "runs": rows},
+            indent=2
+        ))
+        print(f"Results written to {json_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", default=",".join(WORKLOADS),
+                        help=f"Comma-separated workloads (default: {','.join(WORKLOADS)})")
+    parser.add_argument("--concurrency", default="1,8,32",
+                        help="Comma-separated concurrency levels (default: 1,8,32)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Jobs per run (default: 4 x concurrency, at least 8)")
+    parser.add_argument("--poll-rate", type=float, default=5.0,
+                        help="Engine status queries per second (default: 5, the engine default)")
+    parser.add_argument("--port", type=int, default=8790, help="Port for the mock server (default: 8790)")
+    parser.add_argument("--webhook", action="store_true",
+                        help="Use callback mode (receiver on --port + 1) instead of polling")
+    parser.add_argument("--keys", type=int, default=1, help="API keys in the engine's pool (default: 1)")
+    parser.add_argument("--hedge", type=float, nargs="?", const=0.05, default=None, metavar="RATIO",
+                        help="Also run each case with hedging, at most RATIO hedges per task (default: 0.05)")
+    parser.add_argument("--json", type=Path, default=None, help="Write results as JSON to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workload(s): {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    asyncio.run(main(
+        config_from(args), workloads, levels, args.jobs, args.poll_rate, args.port, args.json,
+        args.webhook, args.keys, args.hedge
+    ))
@@ -7,14 +7,50 @@ Usage:
     # In your bot
     await bot.load_extension("cogs.soragiri")
 
+    # As a library, or from the command line (no discord.py needed)
+    from cogs.soragiri import SoraGiri
+    python -m cogs.soragiri <sora_url>
+
 Requires:
     - KIE_API_KEY environment variable
     - aiohttp
-    - discord.py
+    - discord.py (only for the cog)
+
+Exports are loaded on first access, so the engine can be used without
+importing (or installing) discord.py.
 """
 
-from .cog import SoraGiriCog, setup
-from .core import SoraGiri, SliceState, SliceResult
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .cog import SoraGiriCog, setup
+    from .core import SoraGiri, SliceState, SliceResult, ProgressEvent, normalize_video_url
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "SoraGiriCog": ".cog",
+    "setup": ".cog",
+    "SoraGiri": ".core",
+    "SliceState": ".core",
+    "SliceResult": ".core",
+    "ProgressEvent": ".core",
+    "normalize_video_url": ".core",
+}
 
-__all__ = ["SoraGiriCog", "SoraGiri", "SliceState", "SliceResult", "setup"]
+__all__ = ["SoraGiriCog", "SoraGiri", "SliceState", "SliceResult", "ProgressEvent", "normalize_video_url", "setup"]
 __version__ = "2.1.0"
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Cache it, so later lookups skip this hook
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
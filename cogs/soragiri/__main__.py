@@ -0,0 +1,104 @@
+"""
+SoraGiri (空斬り) - Core entry point
+
+A plain command line over the engine alone: no discord.py, no banner, no
+colors. Progress goes to stderr and one line per finished cut to stdout
+(the output path, or the error), so it fits in scripts and pipelines.
+The full-featured CLI is soragiri_cli.py in the repository.
+
+Usage:
+    python -m cogs.soragiri <sora_url> [-o output.mp4]
+    python -m cogs.soragiri <url1> <url2> ... -d clean/ -c 8
+    cat urls.txt | python -m cogs.soragiri -i - -d clean/
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from .core import SoraGiri, SliceState, SliceResult, ProgressEvent, output_name_for, read_url_list, unique_video_urls
+from .cache import ResultCache
+from .artifacts import store_from_env
+
+
+def _log(message: str) -> None:
+    print(f"[SoraGiri] {message}", file=sys.stderr)
+
+
+def _on_progress(event: ProgressEvent) -> None:
+    # State changes only; the polls in between stay quiet
+    if not (event.attempt and event.state == SliceState.SLICING):
+        _log(f"{output_name_for(event.video_url)}: {event.message}")
+
+
+def _report(result: SliceResult) -> bool:
+    if result.success:
+        print(result.output_path, flush=True)
+    else:
+        print(f"FAILED {result.video_url}: {result.error}", flush=True)
+    return result.success
+
+
+async def run(urls: list[str], api_key: str, output: Optional[Path], output_dir: Path, concurrency: int) -> bool:
+    """Slice every URL, reporting each cut as it finishes; True if all of them succeeded"""
+    cache = ResultCache(path=os.getenv("SORAGIRI_CACHE_PATH") or None)
+    async with SoraGiri(api_key, cache=cache, artifacts=store_from_env()) as giri:
+        if output:
+            return _report(await giri.slice(urls[0], output, on_progress=_on_progress))
+
+        ok = True
+        async for result in giri.slice_many(
+            urls, output_dir=output_dir, concurrency=concurrency, on_progress=_on_progress
+        ):
+            ok = _report(result) and ok
+        return ok
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m cogs.soragiri",
+        description="SoraGiri (空斬り) - Watermark Slicing Engine (core only)"
+    )
+    parser.add_argument("urls", nargs="*", metavar="url", help="Sora video URL(s)")
+    parser.add_argument("-o", "--output", type=Path, help="Output file path (single URL only)")
+    parser.add_argument("-i", "--input", metavar="FILE", help="Read URLs from FILE, one per line ('-' for stdin)")
+    parser.add_argument("-d", "--output-dir", type=Path, default=Path("."),
+                        help="Directory for outputs named after each video (default: current directory)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Slices in flight at once (default: 4)")
+    args = parser.parse_args(argv)
+
+    urls = list(args.urls)
+    if args.input:
+        urls.extend(read_url_list(args.input))
+
+    # Same video listed twice is only sliced once
+    urls = unique_video_urls(urls)
+
+    if not urls:
+        parser.error("no URLs given (pass them as arguments or with --input)")
+    if args.output and len(urls) > 1:
+        parser.error("-o/--output takes a single URL; use --output-dir for several")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    load_dotenv()
+    api_key = os.getenv("KIE_API_KEY")
+    if not api_key:
+        _log("KIE_API_KEY not set - blade is dull")
+        sys.exit(1)
+
+    try:
+        ok = asyncio.run(run(urls, api_key, args.output, args.output_dir, args.concurrency))
+    except KeyboardInterrupt:
+        _log("Blade sheathed.")
+        sys.exit(130)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
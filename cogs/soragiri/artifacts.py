@@ -0,0 +1,330 @@
+"""
+SoraGiri (空斬り) - Artifact store
+Keeps finished videos on local disk, so delivering or exporting a cut a
+second time is a disk read instead of another download from the CDN.
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import asyncio
+import hashlib
+import secrets
+from pathlib import Path
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional, Union, AsyncIterator
+
+
+# Linux ioctl that clones a file's extents (copy-on-write) on btrfs, XFS, ...
+FICLONE = 0x40049409
+
+
+def store_from_env() -> Optional["ArtifactStore"]:
+    """
+    The store configured by SORAGIRI_ARTIFACT_DIR (and SORAGIRI_ARTIFACT_MB,
+    its size budget in MB, default 2048), or None if it isn't set.
+    """
+    root = os.getenv("SORAGIRI_ARTIFACT_DIR")
+    if not root:
+        return None
+    try:
+        megabytes = int(os.getenv("SORAGIRI_ARTIFACT_MB", "2048"))
+    except ValueError:
+        print("[SoraGiri] WARNING: SORAGIRI_ARTIFACT_MB is not a number; using 2048")
+        megabytes = 2048
+    return ArtifactStore(root, max_bytes=megabytes * 1024 * 1024)
+
+
+@dataclass
+class Artifact:
+    """A stored video"""
+    key: str                        # normalized source URL
+    digest: str                     # SHA-256 of the content
+    size: int
+    path: Path
+    output_url: Optional[str]       # where Kie.ai served it
+    cost_time_ms: Optional[int]
+    stored_at: float
+
+
+class ArtifactStore:
+    """
+    Content-addressed, size-bounded store of finished videos.
+
+    Videos are keyed by normalized source URL and stored once per content
+    hash under root/objects, so two URLs with the same result share a
+    file. Files arrive by temp-and-rename and are never modified, so a
+    reader never sees half a video. When the store grows past max_bytes
+    the least recently used videos go first, and anything older than ttl
+    is dropped regardless.
+
+    An SQLite index in root keeps the store across restarts; several
+    processes may share one root.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        max_bytes: int = 2 * 1024 ** 3,
+        ttl: float = 30 * 24 * 60 * 60
+    ):
+        """
+        Args:
+            root: Directory for the videos and their index
+            max_bytes: Total size of stored videos (older ones are evicted)
+            ttl: Seconds a video is kept at most, however often it is used
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.objects = self.root / "objects"
+        self.tmp = self.root / "tmp"
+        self._db: Optional[sqlite3.Connection] = None
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes of stored videos (each distinct file counted once)"""
+        return self._connect().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM artifacts GROUP BY digest)"
+        ).fetchone()[0]
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.mp4"
+
+    def temp_path(self, key: str) -> Path:
+        """
+        Where a download for key is written before put(). The same key
+        always gets the same path, so an interrupted download resumes; use
+        claim() so two processes never write it at once.
+        """
+        self._connect()
+        return self.tmp / f"{hashlib.sha256(key.encode()).hexdigest()[:24]}.mp4"
+
+    @asynccontextmanager
+    async def claim(self, key: str) -> AsyncIterator[Path]:
+        """
+        Exclusive use of key's download path, across processes sharing the
+        root. Waits while another process holds it; that process may well
+        have stored the video by then, so check get() again.
+
+        Where file locks aren't available, each process gets its own path
+        (downloads then resume only within one process).
+        """
+        path = self.temp_path(key)
+        with open(path.with_suffix(".lock"), "a") as lock:
+            # Fresh mtime, so _sweep_tmp() leaves a lock in use alone
+            os.utime(lock.fileno())
+            try:
+                import fcntl
+            except ImportError:
+                yield path.with_name(f"{path.stem}.{os.getpid()}.mp4")
+                return
+            while True:
+                try:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(0.25)
+            try:
+                yield path
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def get(self, key: str) -> Optional[Artifact]:
+        """The stored video for key, or None (expired or missing files count as gone)"""
+        row = self._connect().execute(
+            "SELECT digest, size, output_url, cost_time_ms, stored_at FROM artifacts WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        digest, size, output_url, cost_time_ms, stored_at = row
+        path = self.object_path(digest)
+        if time.time() - stored_at > self.ttl or not path.exists():
+            self.discard(key)
+            return None
+
+        with self._db:
+            self._db.execute("UPDATE artifacts SET used_at = ? WHERE key = ?", (time.time(), key))
+        return Artifact(key, digest, size, path, output_url, cost_time_ms, stored_at)
+
+    async def put(
+        self,
+        key: str,
+        source: Path,
+        output_url: Optional[str] = None,
+        cost_time_ms: Optional[int] = None
+    ) -> Artifact:
+        """
+        Move a finished file into the store under key.
+
+        Args:
+            key: Normalized source URL
+            source: The file; it is moved (renamed), not copied, so it
+                should live on the store's filesystem (see claim())
+            output_url: Result URL the video came from
+            cost_time_ms: Kie.ai processing time, served with cache hits
+
+        Returns:
+            The stored Artifact
+        """
+        source = Path(source)
+        digest, size = await asyncio.to_thread(self._hash, source)
+        path = self.object_path(digest)
+        if path.exists():
+            # Same content is already stored
+            source.unlink(missing_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Read-only: exports may be hardlinks to this very file
+            os.chmod(source, 0o444)
+            os.replace(source, path)
+
+        now = time.time()
+        previous = self._connect().execute("SELECT digest FROM artifacts WHERE key = ?", (key,)).fetchone()
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO artifacts (key, digest, size, output_url, cost_time_ms, stored_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, digest, size, output_url, cost_time_ms, now, now)
+            )
+        if previous and previous[0] != digest:
+            self._drop_orphan(previous[0])
+        self.evict(keep=key)
+        return Artifact(key, digest, size, path, output_url, cost_time_ms, now)
+
+    async def export(self, artifact: Artifact, output_path: Path) -> str:
+        """
+        Place a stored video at output_path: a reflink (copy-on-write
+        clone) where the filesystem allows, which shares the data without
+        copying it, and a plain copy otherwise. Either way the output is a
+        file of its own with normal, writable permissions, so changing or
+        deleting it never touches the store. The file appears atomically;
+        an existing one is replaced.
+
+        Returns:
+            How it was placed: "reflink" or "copy"
+        """
+        return await asyncio.to_thread(self._export, artifact.path, Path(output_path))
+
+    def discard(self, key: str) -> None:
+        """Forget a video (its file goes once no other key uses it)"""
+        db = self._connect()
+        row = db.execute("SELECT digest FROM artifacts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        with db:
+            db.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+        self._drop_orphan(row[0])
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Drop expired videos, then the least recently used until the store
+        fits max_bytes.
+
+        Args:
+            keep: Key never evicted (the video just stored)
+
+        Returns:
+            Videos dropped
+        """
+        db = self._connect()
+        expired = db.execute(
+            "SELECT key FROM artifacts WHERE stored_at < ? AND key IS NOT ?",
+            (time.time() - self.ttl, keep)
+        ).fetchall()
+        for (key,) in expired:
+            self.discard(key)
+
+        dropped = len(expired)
+        while self.total_bytes > self.max_bytes:
+            row = db.execute(
+                "SELECT key FROM artifacts WHERE key IS NOT ? ORDER BY used_at LIMIT 1", (keep,)
+            ).fetchone()
+            if row is None:
+                break
+            self.discard(row[0])
+            dropped += 1
+        return dropped
+
+    def close(self) -> None:
+        """Close the index (it reopens on next use)"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _drop_orphan(self, digest: str) -> None:
+        """Delete a file no key refers to anymore"""
+        used = self._db.execute("SELECT 1 FROM artifacts WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+        if not used:
+            self.object_path(digest).unlink(missing_ok=True)
+
+    @staticmethod
+    def _hash(path: Path) -> tuple[str, int]:
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size
+
+    @staticmethod
+    def _export(source: Path, output_path: Path) -> str:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp = output_path.with_name(f".{output_path.name}.{secrets.token_hex(4)}.tmp")
+        try:
+            method = ArtifactStore._clone(source, temp)
+            # Stored objects are read-only; the user's copy shouldn't be
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp, 0o666 & ~umask)
+            os.replace(temp, output_path)
+            return method
+        finally:
+            temp.unlink(missing_ok=True)
+
+    @staticmethod
+    def _clone(source: Path, target: Path) -> str:
+        try:
+            import fcntl
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except (ImportError, OSError):
+            target.unlink(missing_ok=True)
+
+        shutil.copyfile(source, target)
+        return "copy"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.objects.mkdir(parents=True, exist_ok=True)
+            self.tmp.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.root / "index.sqlite3")
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS artifacts ("
+                    "key TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, "
+                    "output_url TEXT, cost_time_ms INTEGER, stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS artifacts_used ON artifacts (used_at)")
+                self._db.execute("CREATE INDEX IF NOT EXISTS artifacts_digest ON artifacts (digest)")
+            self._sweep_tmp()
+        return self._db
+
+    def _sweep_tmp(self, age: float = 24 * 60 * 60) -> None:
+        """Remove downloads abandoned over a day ago"""
+        cutoff = time.time() - age
+        for path in self.tmp.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,139 @@
+"""
+SoraGiri (空斬り) - Result cache
+Remembers finished cuts so re-slicing a known video costs nothing.
+"""
+
+import time
+import sqlite3
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Union
+
+
+# Kie.ai keeps generated files downloadable for 14 days. Inside that
+# window a cached result URL is trusted; past it, it is probed first.
+RESULT_URL_TTL = 14 * 24 * 60 * 60
+
+
+@dataclass
+class CacheEntry:
+    """A cached slice result"""
+    output_url: str
+    cost_time_ms: Optional[int]
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class ResultCache:
+    """
+    Maps normalized video URLs to finished slice results.
+
+    An in-memory LRU sits in front of an optional SQLite file, so hits are
+    served from memory and results survive restarts when a path is given.
+    Entries younger than ttl are fresh; older entries are reported as
+    expired and must be verified by the caller before they are served.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = RESULT_URL_TTL,
+        path: Optional[Union[str, Path]] = None
+    ):
+        """
+        Args:
+            max_entries: Entries kept in the in-memory LRU
+            ttl: Seconds a result URL is trusted without a liveness check
+            path: Optional SQLite file for persistence across restarts
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self._memory: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """True if the entry can be served without a liveness check"""
+        return entry.age < self.ttl
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up a result (fresh or expired), or None"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+
+        db = self._connect()
+        if db is None:
+            return None
+
+        row = db.execute(
+            "SELECT output_url, cost_time_ms, stored_at FROM results WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        entry = CacheEntry(*row)
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, output_url: str, cost_time_ms: Optional[int] = None) -> CacheEntry:
+        """Store a finished result"""
+        entry = CacheEntry(output_url, cost_time_ms, time.time())
+        self._remember(key, entry)
+
+        db = self._connect()
+        if db is not None:
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, output_url, cost_time_ms, stored_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, entry.output_url, entry.cost_time_ms, entry.stored_at)
+                )
+        return entry
+
+    def discard(self, key: str) -> None:
+        """Forget a result (e.g. its URL went dead)"""
+        self._memory.pop(key, None)
+
+        db = self._connect()
+        if db is not None:
+            with db:
+                db.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        """Close the SQLite store (it reopens on next use)"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, output_url TEXT NOT NULL, "
+                    "cost_time_ms INTEGER, stored_at REAL NOT NULL)"
+                )
+        return self._db
@@ -8,19 +8,117 @@ Drop this folder into any bot's cogs/ directory and load with:
 
 import os
 import re
-import io
+import time
+import shutil
+import asyncio
+import tempfile
 import discord
+from dataclasses import dataclass, field
 from discord import app_commands
 from discord.ext import commands
-from typing import Optional
+from pathlib import Path
+from typing import Optional, BinaryIO
 
 # Import the blade (relative import - same package)
-from .core import SoraGiri, SliceState
+from .core import (
+    SoraGiri, SliceState, SliceResult, ProgressEvent,
+    output_name_for, unique_video_urls
+)
+from .cache import ResultCache
+from .artifacts import store_from_env
+from .journal import JobJournal, JobRecord
+from .jobs import JobQueue, QueuedJob, QueueFull
+from .progress import ProgressRenderer
+from .metrics import MetricsSink, MetricsRegistry, MetricsServer
+from .delivery import Delivery, plan_delivery, reencode_available, reencode_to_fit
+from .webhook import WebhookReceiver
+from .hedge import HedgePolicy
+from .scheduler import FairScheduler, Priority
 
 
 # Sora URL pattern
 SORA_URL_PATTERN = re.compile(r'https?://sora\.chatgpt\.com/[^\s<>"]+')
 
+# Discord's limits for one message: attachments, and upload size outside
+# boosted guilds (DMs included)
+MAX_ATTACHMENTS = 10
+DEFAULT_UPLOAD_LIMIT = 10 * 1024 * 1024
+
+
+def _env_int(name: str, default: int) -> int:
+    """Integer setting from the environment, falling back to default"""
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        print(f"[SoraGiri] WARNING: {name} is not a number - using {default}")
+        return default
+
+
+def _guild_weights(spec: str) -> dict[int, float]:
+    """Per-guild scheduling shares from "guild_id:weight,guild_id:weight" """
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            guild_id, weight = item.split(":")
+            weights[int(guild_id)] = float(weight)
+        except ValueError:
+            print(f"[SoraGiri] WARNING: Ignoring SORAGIRI_GUILD_WEIGHTS entry {item!r} (want guild_id:weight)")
+    return weights
+
+
+def _tenant(message: discord.Message, user_id: int) -> tuple:
+    """Who a slice is scheduled for: (guild, user), with DMs as one guild"""
+    return (message.guild.id if message.guild else "dm", user_id)
+
+
+def _format_eta(eta: float) -> str:
+    """Human ETA, e.g. 'ETA ~2m 05s'"""
+    minutes, seconds = divmod(int(eta), 60)
+    return f"ETA ~{minutes}m {seconds:02d}s" if minutes else f"ETA ~{seconds}s"
+
+
+def _format_wait(position: int, eta: Optional[float]) -> str:
+    """Queue position text for the progress embed"""
+    text = f"Waiting for a free blade: **#{position}** in line"
+    if eta is not None:
+        text += f"\n{_format_eta(eta)}"
+    return text
+
+
+def _unique_urls(content: str) -> list[str]:
+    """Sora URLs in a message, first occurrence of each video only"""
+    return unique_video_urls(SORA_URL_PATTERN.findall(content))
+
+
+def _format_size(size: Optional[int]) -> str:
+    """Human file size, e.g. '23.4 MB'"""
+    if size is None:
+        return "unknown size"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def _upload_limit(message: discord.Message) -> int:
+    """Largest file the message's channel accepts, in bytes"""
+    return message.guild.filesize_limit if message.guild else DEFAULT_UPLOAD_LIMIT
+
+
+def _upload_batches(results: list[tuple[str, SliceResult]], limit: int) -> list[list[tuple[str, SliceResult]]]:
+    """
+    Split finished cuts into replies Discord accepts: at most
+    MAX_ATTACHMENTS files and `limit` bytes each. A file over the limit on
+    its own still gets a reply (and the error Discord answers with).
+    """
+    batches, batch, size = [], [], 0
+    for url, result in results:
+        if batch and (len(batch) >= MAX_ATTACHMENTS or size + result.output_size > limit):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append((url, result))
+        size += result.output_size
+    if batch:
+        batches.append(batch)
+    return batches
+
 
 class ProgressEmbed:
     """Manages the progress embed for Discord messages"""
@@ -57,6 +155,65 @@ class ProgressEmbed:
 
         return embed
 
+    @classmethod
+    def create_group(cls, lines: list[tuple[SliceState, str, str]]) -> discord.Embed:
+        """Create one embed tracking several cuts, from (state, url, message) lines"""
+        states = {state for state, _, _ in lines}
+        if states <= {SliceState.COMPLETE}:
+            icon, title, color = cls.STATES[SliceState.COMPLETE]
+        elif states <= {SliceState.FAILED}:
+            icon, title, color = cls.STATES[SliceState.FAILED]
+        elif states <= {SliceState.COMPLETE, SliceState.FAILED}:
+            icon, title, color = "⚠️", "Partly Severed", 0xFFA500
+        else:
+            icon, title, color = cls.STATES[SliceState.SLICING]
+
+        rows = [
+            f"{cls.STATES.get(state, ('•',))[0]} `{url[:50]}`\n{message}"
+            for state, url, message in lines
+        ]
+
+        embed = discord.Embed(
+            title=f"{icon} SoraGiri 空斬り",
+            description=f"**{title}**\n\n" + "\n".join(rows),
+            color=color
+        )
+        return embed
+
+
+@dataclass(eq=False)
+class MentionGroup:
+    """Several cuts requested in one mention, answered by one reply"""
+    urls: list[str]
+    reply: Optional[discord.Message] = None
+    jobs: dict[str, QueuedJob] = field(default_factory=dict)
+    lines: dict[str, tuple[SliceState, str]] = field(default_factory=dict)
+    results: dict[str, SliceResult] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for url in self.urls:
+            self.lines[url] = (SliceState.INITIALIZING, "Preparing the blade...")
+
+    @property
+    def done(self) -> bool:
+        return len(self.results) == len(self.urls)
+
+    def set(self, url: str, state: SliceState, message: str) -> None:
+        self.lines[url] = (state, message)
+
+    def finish(self, url: str, result: SliceResult) -> None:
+        """Record a cut's result (or its refusal) and its final line"""
+        self.results[url] = result
+        if result.success:
+            self.lines[url] = (SliceState.COMPLETE, "Watermark severed.")
+        else:
+            self.lines[url] = (SliceState.FAILED, f"`{result.error}`")
+
+    def embed(self) -> discord.Embed:
+        return ProgressEmbed.create_group(
+            [(state, url, message) for url, (state, message) in self.lines.items()]
+        )
+
 
 class SoraGiriCog(commands.Cog, name="SoraGiri"):
     """
@@ -67,12 +224,151 @@ class SoraGiriCog(commands.Cog, name="SoraGiri"):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+
+        # Optional Prometheus endpoint; without it metrics are dropped
+        metrics_port = os.getenv("SORAGIRI_METRICS_PORT")
+        if metrics_port:
+            self.metrics = MetricsRegistry()
+            self.metrics_server = MetricsServer(
+                self.metrics,
+                port=_env_int("SORAGIRI_METRICS_PORT", 0),
+                host=os.getenv("SORAGIRI_METRICS_HOST", "127.0.0.1")
+            )
+        else:
+            self.metrics = MetricsSink()
+            self.metrics_server = None
+
         api_key = os.getenv("KIE_API_KEY")
         if api_key:
-            self.giri = SoraGiri(api_key)
+            # Optional persistent result cache (survives bot restarts)
+            cache = ResultCache(path=os.getenv("SORAGIRI_CACHE_PATH") or None)
+            # Optional job journal: jobs interrupted by a restart are finished
+            # and delivered once the bot is back
+            journal_path = os.getenv("SORAGIRI_JOURNAL_PATH")
+            journal = JobJournal(journal_path) if journal_path else None
+            # Optional callback mode: Kie.ai posts finished tasks to a public
+            # URL and polling only runs as a slow safety net
+            webhook_url = os.getenv("SORAGIRI_WEBHOOK_URL")
+            webhook = WebhookReceiver(
+                webhook_url,
+                port=_env_int("SORAGIRI_WEBHOOK_PORT", 8787),
+                host=os.getenv("SORAGIRI_WEBHOOK_HOST", "0.0.0.0"),
+                secret=os.getenv("SORAGIRI_WEBHOOK_SECRET") or None
+            ) if webhook_url else None
+            # Optional hedging: tasks stuck in the queue get a second task,
+            # on at most SORAGIRI_HEDGE_BUDGET percent of tasks
+            hedge_budget = _env_int("SORAGIRI_HEDGE_BUDGET", 0)
+            hedging = HedgePolicy(
+                percentile=_env_int("SORAGIRI_HEDGE_PERCENTILE", 95) / 100,
+                max_ratio=hedge_budget / 100
+            ) if hedge_budget > 0 else None
+            self.giri = SoraGiri(
+                api_key, cache=cache, journal=journal, metrics=self.metrics, webhook=webhook,
+                # KIE_API_KEY may list several keys (comma-separated); tasks are
+                # spread over them, each limited to SORAGIRI_KEY_CONCURRENCY
+                key_concurrency=_env_int("SORAGIRI_KEY_CONCURRENCY", 0),
+                hedging=hedging,
+                # Optional artifact store (SORAGIRI_ARTIFACT_DIR): repeat
+                # deliveries of a cut are read from local disk, not the CDN
+                artifacts=store_from_env()
+            )
+            if len(self.giri.keys) > 1:
+                print(f"[SoraGiri] {len(self.giri.keys)} API keys in the pool")
         else:
             self.giri = None
             print("[SoraGiri] WARNING: KIE_API_KEY not set - blade is dull")
+        self._recovery: Optional[asyncio.Task] = None
+
+        # Slices wait in a bounded queue for one of a fixed number of
+        # workers, shared fairly between guilds and then their users
+        self.jobs = JobQueue(
+            workers=_env_int("SORAGIRI_WORKERS", 4),
+            max_queue=_env_int("SORAGIRI_QUEUE_SIZE", 50),
+            per_user=_env_int("SORAGIRI_USER_LIMIT", 3),
+            metrics=self.metrics,
+            scheduler=FairScheduler(
+                weights=_guild_weights(os.getenv("SORAGIRI_GUILD_WEIGHTS", "")),
+                max_wait=_env_int("SORAGIRI_STARVATION_SECONDS", 120)
+            )
+        )
+        # Links one mention may ask for (0 = unlimited); they run concurrently
+        self.mention_limit = _env_int("SORAGIRI_MENTION_LIMIT", 5)
+
+        # Cuts over the upload limit are sent as links, or re-encoded to fit
+        # when enabled and ffmpeg is installed
+        self.reencode = os.getenv("SORAGIRI_REENCODE", "0").lower() in ("1", "true", "yes")
+        if self.reencode and not reencode_available():
+            print("[SoraGiri] WARNING: SORAGIRI_REENCODE is set but ffmpeg/ffprobe were not found")
+            self.reencode = False
+
+        # Progress edits are coalesced per message and budgeted per channel
+        self.progress = ProgressRenderer(metrics=self.metrics)
+
+    async def cog_load(self):
+        """Open the engine's connection pool (and pre-warm it if enabled)"""
+        if self.metrics_server:
+            await self.metrics_server.start()
+            print(f"[SoraGiri] Metrics at http://{self.metrics_server.host}:{self.metrics_server.port}/metrics")
+        if self.giri:
+            warmup = os.getenv("SORAGIRI_PREWARM", "1").lower() not in ("0", "false", "no")
+            await self.giri.start(warmup=warmup)
+            if self.giri.webhook:
+                print(f"[SoraGiri] Awaiting Kie.ai callbacks on port {self.giri.webhook.port} "
+                      f"for {self.giri.webhook.public_url}")
+            if self.giri.journal:
+                self._recovery = asyncio.create_task(self._recover())
+
+    async def cog_unload(self):
+        """Close the engine's connection pool"""
+        if self._recovery:
+            self._recovery.cancel()
+        await self.jobs.close()
+        await self.progress.close()
+        if self.giri:
+            await self.giri.close()
+        if self.metrics_server:
+            await self.metrics_server.close()
+
+    async def _recover(self):
+        """Finish jobs from before a restart and reply where they were requested"""
+        await self.bot.wait_until_ready()
+        async for job, result in self.giri.recover():
+            try:
+                await self._deliver_recovered(job, result)
+            except Exception as e:
+                print(f"[SoraGiri] Could not deliver recovered cut {job.job_id[:8]}: {e}")
+
+    async def _deliver_recovered(self, job: JobRecord, result: SliceResult):
+        """Deliver one recovered job to its journaled message"""
+        destination = job.destination or {}
+        channel_id = destination.get("channel_id")
+        message_id = destination.get("message_id")
+        if not channel_id or not message_id:
+            self.giri.mark_delivered(job.job_id)
+            return
+
+        try:
+            channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+        except (discord.NotFound, discord.Forbidden):
+            # The channel is gone; nobody is left to deliver to
+            self.giri.mark_delivered(job.job_id)
+            return
+
+        message = channel.get_partial_message(message_id)
+        if result.success:
+            try:
+                # Oversized results are not downloaded; they go out as links
+                await self.giri.fetch(result, max_bytes=_upload_limit(message))
+            except Exception as e:
+                result.success, result.error = False, f"Download error: {e}"
+
+        if destination.get("grouped"):
+            # Part of a multi-link reply: leave the shared embed alone
+            group = MentionGroup([job.video_url], reply=message)
+            group.finish(job.video_url, result)
+            await self._deliver_group(group, show_status=False)
+        else:
+            await self._deliver(message, job.video_url, result)
 
     @app_commands.command(name="slice", description="Remove watermark from a Sora video")
     @app_commands.describe(url="The Sora video URL (sora.chatgpt.com/...)")
@@ -112,13 +408,19 @@ class SoraGiriCog(commands.Cog, name="SoraGiri"):
             )
             return
 
+        try:
+            self.jobs.admit(interaction.user.id)
+        except QueueFull as e:
+            await interaction.response.send_message(f"⏳ {e}", ephemeral=True)
+            return
+
         # Initial response
         embed = ProgressEmbed.create(SliceState.INITIALIZING, "Preparing the blade...", url)
         await interaction.response.send_message(embed=embed)
         message = await interaction.original_response()
 
         # Process
-        await self._do_slice(message, url)
+        await self._enqueue(message, url, interaction.user.id, _tenant(message, interaction.user.id))
 
     async def _process_slice_ctx(self, ctx: commands.Context, url: str):
         """Process slice via prefix command"""
@@ -131,86 +433,170 @@ class SoraGiriCog(commands.Cog, name="SoraGiri"):
             await ctx.reply("❌ Invalid URL. Must be from `sora.chatgpt.com`")
             return
 
+        try:
+            self.jobs.admit(ctx.author.id)
+        except QueueFull as e:
+            await ctx.reply(f"⏳ {e}")
+            return
+
         # Initial response
         embed = ProgressEmbed.create(SliceState.INITIALIZING, "Preparing the blade...", url)
         message = await ctx.reply(embed=embed)
 
         # Process
-        await self._do_slice(message, url)
+        await self._enqueue(message, url, ctx.author.id, _tenant(message, ctx.author.id))
+
+    async def _enqueue(self, message: discord.Message, url: str, owner: int, tenant: tuple):
+        """Put an interactive slice in the job queue, showing its place in line while it waits"""
+        queued = [None]  # Mutable container for closure
+
+        async def show_position(position: int, eta: Optional[float]):
+            if queued[0] is not None and self.jobs.position(queued[0]) is None:
+                return  # Already started; don't overwrite its progress
+            embed = ProgressEmbed.create(SliceState.QUEUED, _format_wait(position, eta), url)
+            self.progress.update(message, embed)
+
+        try:
+            queued[0] = self.jobs.submit(
+                owner, lambda: self._do_slice(message, url), show_position,
+                tenant=tenant, priority=Priority.INTERACTIVE
+            )
+        except QueueFull as e:
+            # Lost a race for the last slot since the admission check
+            embed = ProgressEmbed.create(SliceState.FAILED, str(e), url)
+            await self.progress.finish(message, embed)
 
     async def _do_slice(self, message: discord.Message, url: str):
         """Execute the slice operation"""
-        last_state = [None]  # Mutable container for closure
-
-        async def update_progress(state: SliceState, msg: str):
-            """Update the embed with progress"""
-            if state != last_state[0]:
-                last_state[0] = state
-                embed = ProgressEmbed.create(state, msg, url)
-                try:
-                    await message.edit(embed=embed)
-                except discord.errors.NotFound:
-                    pass
+        def update_progress(event: ProgressEvent):
+            """Queue the embed for this event (the renderer drops stale ones)"""
+            text = event.message
+            if event.attempt and event.eta:
+                text += f"\n{_format_eta(event.eta)}"
+            self.progress.update(message, ProgressEmbed.create(event.state, text, url))
 
         try:
             # Add reaction
-            try:
-                await message.add_reaction("⚔️")
-            except:
-                pass
+            self.progress.update(message, reaction="⚔️")
 
-            # Execute slice
-            success, result = await self.giri.slice_to_bytes(
+            # Execute slice (the video is streamed into a spooled file,
+            # not held in memory as one bytes object, and not downloaded at
+            # all when it is over the upload limit). The reply target is
+            # journaled so the cut survives a restart.
+            result = await self.giri.slice_to_stream(
                 video_url=url,
-                on_progress=update_progress
+                on_progress=update_progress,
+                max_bytes=_upload_limit(message),
+                destination={"channel_id": message.channel.id, "message_id": message.id}
             )
+            await self._deliver(message, url, result)
 
-            if success:
-                # Upload the video
-                video_bytes = result
-                file = discord.File(
-                    fp=io.BytesIO(video_bytes),
-                    filename="soragiri_clean.mp4"
-                )
+        except Exception as e:
+            embed = ProgressEmbed.create(
+                SliceState.FAILED,
+                f"Unexpected error: `{str(e)}`",
+                url
+            )
+            await self.progress.finish(message, embed, reaction="❌")
+
+    async def _prepare_upload(self, result: SliceResult, limit: int, on_reencode=None):
+        """
+        Re-encode a cut that was too large to download when that can fit it
+        under limit; otherwise it stays a link (result.file is None).
+        """
+        if not result.success or result.file is not None:
+            return
+        if plan_delivery(result.output_size, limit, self.reencode) is not Delivery.REENCODE:
+            return
+        if on_reencode:
+            on_reencode()
+        result.file = await self._reencode(result, limit)
 
-                # Final embed
-                embed = ProgressEmbed.create(
-                    SliceState.COMPLETE,
-                    "Watermark has been severed.",
-                    url
-                )
-                await message.edit(embed=embed)
-                await message.reply("Here's your clean cut:", file=file)
+    async def _reencode(self, result: SliceResult, limit: int) -> Optional[BinaryIO]:
+        """Download a result to disk and shrink it under limit; None if it won't fit"""
+        workdir = Path(tempfile.mkdtemp(prefix="soragiri-"))
+        try:
+            source, target = workdir / "source.mp4", workdir / "clean.mp4"
+            await self.giri.save(result, source)
+            if not await reencode_to_fit(source, target, limit):
+                self.metrics.inc("soragiri_reencodes_total", outcome="too_large")
+                return None
+            self.metrics.inc("soragiri_reencodes_total", outcome="fitted")
+            result.output_size = target.stat().st_size
+            # The open handle keeps the data after the directory is removed
+            return open(target, "rb")
+        except Exception as e:
+            print(f"[SoraGiri] Re-encode failed: {e}")
+            return None
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
 
-                # Update reaction
+    async def _deliver(self, message: discord.Message, url: str, result: SliceResult):
+        """Post a finished slice (video, link or error) and close its journaled job"""
+        try:
+            if result.success:
+                limit = _upload_limit(message)
+                await self._prepare_upload(result, limit, lambda: self.progress.update(
+                    message,
+                    ProgressEmbed.create(
+                        SliceState.DOWNLOADING,
+                        f"Too large to attach ({_format_size(result.output_size)}). Re-forging it to fit...",
+                        url
+                    )
+                ))
                 try:
-                    await message.clear_reaction("⚔️")
-                    await message.add_reaction("✅")
-                except:
-                    pass
+                    # Final embed and reaction, sent without waiting for the edit budget
+                    embed = ProgressEmbed.create(
+                        SliceState.COMPLETE,
+                        "Watermark has been severed.",
+                        url
+                    )
+                    await self.progress.finish(message, embed, reaction="✅")
+
+                    if result.file is None:
+                        # Over the upload limit: the hosted link is the delivery
+                        await message.reply(
+                            f"This cut is too large to attach here ({_format_size(result.output_size)}, "
+                            f"limit {_format_size(limit)}). Here's the link:\n{result.output_url}"
+                        )
+                        self.metrics.inc("soragiri_deliveries_total", method="link")
+                    else:
+                        # Upload the video straight from the spooled file
+                        file = discord.File(
+                            fp=result.file,
+                            filename="soragiri_clean.mp4"
+                        )
+                        try:
+                            await self._upload(message, "Here's your clean cut:", [file], result.output_size)
+                        finally:
+                            # discord.File swaps out fp.close until it is closed itself
+                            file.close()
+                finally:
+                    if result.file is not None:
+                        result.file.close()
 
             else:
                 # Failed
                 embed = ProgressEmbed.create(
                     SliceState.FAILED,
-                    f"The blade could not complete the cut.\n`{result}`",
+                    f"The blade could not complete the cut.\n`{result.error}`",
                     url
                 )
-                await message.edit(embed=embed)
+                await self.progress.finish(message, embed, reaction="❌")
 
-                try:
-                    await message.clear_reaction("⚔️")
-                    await message.add_reaction("❌")
-                except:
-                    pass
+            self.giri.mark_delivered(result.job_id)
 
-        except Exception as e:
-            embed = ProgressEmbed.create(
-                SliceState.FAILED,
-                f"Unexpected error: `{str(e)}`",
-                url
-            )
-            await message.edit(embed=embed)
+        except (discord.NotFound, discord.Forbidden):
+            # The message is gone or off-limits; nobody is left to deliver to
+            self.giri.mark_delivered(result.job_id)
+
+    async def _upload(self, message: discord.Message, text: str, files: list[discord.File], size: Optional[int]):
+        """Reply with attachments, reporting upload time and size"""
+        sent = time.monotonic()
+        await message.reply(text, files=files)
+        self.metrics.observe("soragiri_upload_seconds", time.monotonic() - sent)
+        self.metrics.inc("soragiri_upload_bytes_total", size or 0)
+        self.metrics.inc("soragiri_deliveries_total", len(files), method="attach")
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -221,16 +607,171 @@ class SoraGiriCog(commands.Cog, name="SoraGiri"):
         if self.bot.user not in message.mentions:
             return
 
-        # Check for Sora URLs
-        urls = SORA_URL_PATTERN.findall(message.content)
+        # Check for Sora URLs (each video once, however often it is linked)
+        urls = _unique_urls(message.content)
         if not urls:
             return
 
-        # Process each URL
-        for url in urls:
-            embed = ProgressEmbed.create(SliceState.INITIALIZING, "Preparing the blade...", url)
-            reply = await message.reply(embed=embed)
-            await self._do_slice(reply, url)
+        try:
+            self.jobs.admit(message.author.id)
+        except QueueFull as e:
+            await message.reply(f"⏳ {e}")
+            return
+
+        if len(urls) > 1:
+            await self._process_mention_group(message, urls)
+            return
+
+        embed = ProgressEmbed.create(SliceState.INITIALIZING, "Preparing the blade...", urls[0])
+        reply = await message.reply(embed=embed)
+        await self._enqueue(reply, urls[0], message.author.id, _tenant(message, message.author.id))
+
+    async def _process_mention_group(self, message: discord.Message, urls: list[str]):
+        """Queue every link of a mention at once, tracked by one shared embed"""
+        owner = message.author.id
+        accepted = urls[:self.mention_limit] if self.mention_limit else urls
+        group = MentionGroup(urls)
+        for url in urls[len(accepted):]:
+            group.finish(url, SliceResult(
+                success=False,
+                video_url=url,
+                error=f"Only {self.mention_limit} links per mention - send this one again."
+            ))
+
+        group.reply = await message.reply(embed=group.embed())
+        self.progress.update(group.reply, reaction="⚔️")
+
+        # Every link goes into the queue now; the workers cut them side by
+        # side, behind anyone's single slices. The whole mention takes one
+        # of the user's slots, so it never runs into their per-user limit
+        for url in accepted:
+            try:
+                group.jobs[url] = self.jobs.submit(
+                    owner,
+                    lambda url=url: self._group_slice(group, url),
+                    self._group_position(group, url),
+                    tenant=_tenant(message, owner),
+                    priority=Priority.BATCH,
+                    group=group
+                )
+            except QueueFull as e:
+                group.finish(url, SliceResult(success=False, video_url=url, error=str(e)))
+
+        if group.done:
+            await self._deliver_group(group)
+        else:
+            self.progress.update(group.reply, group.embed())
+
+    def _group_position(self, group: MentionGroup, url: str):
+        """Queue position callback for one link of a group"""
+        async def show_position(position: int, eta: Optional[float]):
+            job = group.jobs.get(url)
+            if job is not None and self.jobs.position(job) is None:
+                return  # Already started; don't overwrite its progress
+            group.set(url, SliceState.QUEUED, _format_wait(position, eta).replace("\n", " · "))
+            self.progress.update(group.reply, group.embed())
+
+        return show_position
+
+    async def _group_slice(self, group: MentionGroup, url: str):
+        """Cut one link of a group; the last one to finish delivers the group"""
+        def update_progress(event: ProgressEvent):
+            if url in group.results:
+                return  # A straggling event must not overwrite the outcome
+            text = event.message
+            if event.attempt and event.eta:
+                text += f" · {_format_eta(event.eta)}"
+            group.set(url, event.state, text)
+            self.progress.update(group.reply, group.embed())
+
+        try:
+            limit = _upload_limit(group.reply)
+            result = await self.giri.slice_to_stream(
+                video_url=url,
+                on_progress=update_progress,
+                max_bytes=limit,
+                destination={
+                    "channel_id": group.reply.channel.id,
+                    "message_id": group.reply.id,
+                    "grouped": True
+                }
+            )
+
+            def show_reencode():
+                group.set(url, SliceState.DOWNLOADING, "Too large to attach. Re-forging it to fit...")
+                self.progress.update(group.reply, group.embed())
+
+            await self._prepare_upload(result, limit, show_reencode)
+        except Exception as e:
+            result = SliceResult(success=False, video_url=url, error=f"Unexpected error: {e}")
+
+        group.finish(url, result)
+        if group.done:
+            await self._deliver_group(group)
+        else:
+            self.progress.update(group.reply, group.embed())
+
+    async def _deliver_group(self, group: MentionGroup, show_status: bool = True):
+        """
+        Post a group's cuts as few replies as Discord allows and close their
+        journaled jobs.
+
+        Args:
+            group: Group whose cuts have all finished
+            show_status: Finish the shared embed; off for cuts recovered
+                after a restart, which only reply with their own result
+        """
+        reply = group.reply
+        results = [(url, group.results[url]) for url in group.urls]
+        cuts = [(url, result) for url, result in results if result.success and result.file]
+        links = [(url, result) for url, result in results if result.success and not result.file]
+        try:
+            if show_status:
+                await self.progress.finish(reply, group.embed(), reaction="✅" if cuts or links else "❌")
+            else:
+                for url, result in results:
+                    if not result.success:
+                        await reply.reply(
+                            f"❌ The blade could not complete the cut for `{url[:50]}`.\n`{result.error}`"
+                        )
+
+            limit = _upload_limit(reply)
+            if links:
+                # Over the upload limit: the hosted links are the delivery
+                lines = [
+                    f"`{url[:50]}` ({_format_size(result.output_size)}): {result.output_url}"
+                    for url, result in links
+                ]
+                await reply.reply(
+                    f"Too large to attach here (limit {_format_size(limit)}). Here are the links:\n"
+                    + "\n".join(lines)
+                )
+                self.metrics.inc("soragiri_deliveries_total", len(links), method="link")
+
+            for batch in _upload_batches(cuts, limit):
+                files = [discord.File(fp=result.file, filename=output_name_for(url)) for url, result in batch]
+                text = "Here's your clean cut:" if len(files) == 1 else f"Here are your {len(files)} clean cuts:"
+                try:
+                    await self._upload(reply, text, files, sum(result.output_size or 0 for _, result in batch))
+                except (discord.NotFound, discord.Forbidden):
+                    raise
+                except discord.HTTPException as e:
+                    print(f"[SoraGiri] Grouped upload failed: {e}")
+                    await reply.reply(f"❌ Could not upload {len(files)} cut(s): `{e}`")
+                finally:
+                    # discord.File swaps out fp.close until it is closed itself
+                    for file in files:
+                        file.close()
+
+        except (discord.NotFound, discord.Forbidden):
+            # The message is gone or off-limits; nobody is left to deliver to
+            pass
+
+        finally:
+            for _, result in results:
+                if result.file:
+                    result.file.close()
+                self.giri.mark_delivered(result.job_id)
 
 
 async def setup(bot: commands.Bot):
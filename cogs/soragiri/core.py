@@ -3,14 +3,35 @@ SoraGiri (空斬り) - The Blade
 Core watermark removal engine. Zero Discord dependencies.
 """
 
+import re
 import json
+import time
+import sys
 import asyncio
-import inspect
+import hashlib
 import aiohttp
 from pathlib import Path
-from typing import Optional, Callable, Union, Awaitable
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Callable, Union, Iterable, AsyncIterable, AsyncIterator, BinaryIO
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from urllib.parse import urlsplit, urlunsplit
+
+from .flight import SingleFlight, Emitter
+from .events import ProgressFeed, positional_arity
+from .cache import ResultCache
+from .artifacts import ArtifactStore, Artifact
+from .journal import JobJournal, JobRecord, JobState
+from .polling import PollingStrategy, AdaptivePolling, FixedPolling, SafetyNetPolling, DEFAULT_DEADLINE
+from .poller import TaskPoller, PollOutcome, FINAL_STATES
+from .hedge import HedgePolicy
+from .ratelimit import RateGovernor, TokenBucket, parse_retry_after
+from .keys import KeyPool, ApiKey, KeyThrottled, split_keys, CREDIT_CODES, AUTH_CODES
+from .metrics import MetricsSink
+from .download import MemoryBudget, SpooledResult, RangedDownloader, DownloadStats, ResultTooLarge, probe_size
+
+if TYPE_CHECKING:
+    # Only needed in callback mode; its aiohttp.web import stays off the import path
+    from .webhook import WebhookReceiver
 
 
 class SliceState(Enum):
@@ -32,6 +53,102 @@ class SliceResult:
     output_url: Optional[str] = None
     error: Optional[str] = None
     cost_time_ms: Optional[int] = None
+    cached: bool = False
+    video_url: Optional[str] = None
+    polls: Optional[int] = None
+    rate_wait_ms: Optional[int] = None
+    retries: int = 0
+    download_bytes: Optional[int] = None
+    download_ms: Optional[int] = None
+    output_size: Optional[int] = None   # bytes of the result video, once known
+    job_id: Optional[str] = None
+    # Seconds per phase: create, queue, generate, rate_wait, download, total
+    timings: dict[str, float] = field(default_factory=dict)
+    file: Optional[BinaryIO] = field(default=None, repr=False)
+
+    @property
+    def download_throughput(self) -> Optional[float]:
+        """Download speed in bytes per second, if a download happened"""
+        if self.download_bytes is None or not self.download_ms:
+            return None
+        return self.download_bytes / (self.download_ms / 1000)
+
+
+@dataclass
+class ProgressEvent:
+    """A progress update, with numbers so subscribers needn't parse the message"""
+    state: SliceState
+    message: str
+    video_url: Optional[str] = None
+    task_id: Optional[str] = None
+    attempt: int = 0                    # status checks made so far
+    max_attempts: Optional[int] = None  # cap on status checks, if one was set
+    elapsed: float = 0.0                # seconds since the task was created
+    deadline: Optional[float] = None    # seconds the task may take
+    eta: Optional[float] = None         # expected seconds until it finishes
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Share of the time budget used (0..1), if there is a deadline"""
+        if not self.deadline:
+            return None
+        return min(1.0, self.elapsed / self.deadline)
+
+
+# A progress callback takes a ProgressEvent, or (legacy) a state and a message.
+# Sync and async callbacks are both fine; they never block the slice.
+ProgressCallback = Union[Callable[[ProgressEvent], Any], Callable[[SliceState, str], Any]]
+OnProgress = Union[None, ProgressCallback, Iterable[ProgressCallback]]
+
+
+def normalize_video_url(video_url: str) -> str:
+    """
+    Canonical form of a video URL, used to recognise duplicate requests.
+
+    Scheme and host are lowercased; query string, fragment and trailing
+    slashes are dropped (Sora share links only vary by tracking params).
+    """
+    parts = urlsplit(video_url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, "", ""))
+
+
+def output_name_for(video_url: str) -> str:
+    """Stable output filename for a video URL, e.g. 's_abc123.mp4'"""
+    slug = urlsplit(video_url.strip()).path.rstrip("/").rsplit("/", 1)[-1]
+    slug = re.sub(r"[^A-Za-z0-9_.-]", "_", slug).strip("._")
+    if not slug:
+        slug = hashlib.sha1(normalize_video_url(video_url).encode()).hexdigest()[:12]
+    return f"{slug}.mp4"
+
+
+def unique_video_urls(urls: Iterable[str]) -> list[str]:
+    """URLs in order, keeping only the first link to each video"""
+    unique = {}
+    for url in urls:
+        unique.setdefault(normalize_video_url(url), url.strip())
+    return list(unique.values())
+
+
+def read_url_list(path: str) -> list[str]:
+    """URLs from a file or '-' for stdin, one per line, '#' comments allowed"""
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        lines = [line.strip() for line in handle]
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+async def _iterate(items: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    """Iterate a sync or async iterable uniformly"""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
 
 
 class SoraGiri:
@@ -46,136 +163,955 @@ class SoraGiri:
     CREATE_ENDPOINT = f"{BASE_URL}/jobs/createTask"
     QUERY_ENDPOINT = f"{BASE_URL}/jobs/recordInfo"
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: Union[str, Iterable[str], KeyPool],
+        pool_limit: int = 100,
+        pool_limit_per_host: int = 20,
+        keepalive_timeout: float = 60.0,
+        dns_cache_ttl: int = 300,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 60.0,
+        cache: Optional[ResultCache] = None,
+        polling: Optional[PollingStrategy] = None,
+        deadline: float = DEFAULT_DEADLINE,
+        poll_rate: float = 5.0,
+        governor: Optional[RateGovernor] = None,
+        spool_threshold: int = 8 * 1024 * 1024,
+        memory_budget: int = 64 * 1024 * 1024,
+        download_parallelism: int = 4,
+        download_chunk_size: int = 1024 * 1024,
+        journal: Optional[JobJournal] = None,
+        metrics: Optional[MetricsSink] = None,
+        base_url: Optional[str] = None,
+        webhook: Optional["WebhookReceiver"] = None,
+        safety_poll_interval: float = 30.0,
+        key_concurrency: int = 0,
+        hedging: Optional[HedgePolicy] = None,
+        artifacts: Optional[ArtifactStore] = None
+    ):
         """
         Initialize SoraGiri with API credentials.
 
+        The engine owns one pooled HTTP session shared by every create, poll
+        and download call. Use it as an async context manager, or call
+        start()/close() explicitly for long-lived processes like the bot.
+
         Args:
-            api_key: Kie.ai API key
+            api_key: Kie.ai API key; several keys (a list, or one string
+                separated by commas) or a KeyPool spread tasks over a pool
+            pool_limit: Maximum open connections across all hosts
+            pool_limit_per_host: Maximum open connections per host (0 = unlimited)
+            keepalive_timeout: Seconds an idle connection is kept for reuse
+            dns_cache_ttl: Seconds resolved addresses are cached
+            connect_timeout: Seconds allowed to establish a connection
+            read_timeout: Seconds allowed between reads on a socket
+            cache: Result cache (default: in-memory only; pass a
+                ResultCache with a path to persist across restarts)
+            polling: Polling strategy (default: AdaptivePolling, which learns
+                from past costTime values)
+            deadline: Seconds a task may take before the slice times out
+            poll_rate: Status queries per second per API key across all
+                outstanding tasks (one shared poller tracks every task)
+            governor: Client-side rate limits and retries for API calls
+                (default: createTask 2/s with bursts of 5, recordInfo at
+                poll_rate; 429/5xx and connection errors retried 4 times).
+                Used as given with a single key; in a pool every key gets
+                its own default governor
+            spool_threshold: Streamed results larger than this many bytes
+                are moved from memory to a temp file
+            memory_budget: Bytes all in-flight streamed downloads may hold
+                in memory together; beyond it they spill to disk
+            download_parallelism: Byte ranges fetched at once when saving
+                to a file (servers without range support get one stream)
+            download_chunk_size: Download buffer size in bytes
+            journal: Optional durable job journal; with one, jobs interrupted
+                by a restart are finished by recover() instead of lost
+            metrics: Where instrumentation goes (e.g. a MetricsRegistry from
+                cogs.soragiri.metrics); dropped by default
+            base_url: Kie.ai API root (default: BASE_URL); point it at a
+                mock server for tests and benchmarks
+            webhook: Optional callback receiver. With one, new tasks ask
+                Kie.ai to post their result to it and are only polled
+                every safety_poll_interval seconds, in case a callback is
+                lost
+            safety_poll_interval: Seconds between status checks of tasks
+                waiting for a callback
+            key_concurrency: Tasks each API key may run at once (0 =
+                unlimited); further tasks wait for a free slot
+            hedging: Optional HedgePolicy. With one, a task stuck in the
+                queue longer than usual is raced against a second task for
+                the same video, within the policy's spend cap
+            artifacts: Optional ArtifactStore. With one, finished videos
+                are kept on local disk: saving, streaming or re-delivering
+                a cut a second time reads the stored copy instead of
+                downloading it again
         """
-        self.api_key = api_key
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
+        self.poll_rate = poll_rate
+
+        # Every key has its own rate limits and task slots; tasks go to the
+        # least-loaded healthy key and keep it until they finish
+        self.metrics = metrics or MetricsSink()
+        if isinstance(api_key, KeyPool):
+            self.keys = api_key
+        else:
+            tokens = split_keys(api_key) if isinstance(api_key, str) else list(api_key)
+            single = governor if governor is not None and len(tokens) == 1 else None
+            self.keys = KeyPool(
+                tokens,
+                governor=(lambda: single) if single else self._default_governor,
+                max_tasks=key_concurrency,
+                metrics=self.metrics
+            )
+        # The first key, as code written before key pools knows it
+        first = self.keys.keys[0]
+        self.api_key, self.headers, self.governor = first.token, first.headers, first.governor
+
+        if base_url:
+            self.BASE_URL = base_url.rstrip("/")
+            self.CREATE_ENDPOINT = f"{self.BASE_URL}/jobs/createTask"
+            self.QUERY_ENDPOINT = f"{self.BASE_URL}/jobs/recordInfo"
+
+        # Connection pool settings (applied when the session starts)
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=connect_timeout,
+            sock_read=read_timeout
+        )
+
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # In-flight slices and finished results, keyed on normalized URL
+        self._flights = SingleFlight()
+        self.cache = cache if cache is not None else ResultCache()
+
+        # When to query tasks, and how long to wait for them
+        self.polling = polling or AdaptivePolling()
+        self.deadline = deadline
+        self._poller: Optional[TaskPoller] = None
+
+        # Streamed downloads: small results stay in RAM, the rest spill to disk
+        self.spool_threshold = spool_threshold
+        self.memory_budget = MemoryBudget(memory_budget)
+        self.downloader = RangedDownloader(
+            parallelism=download_parallelism,
+            chunk_size=download_chunk_size
+        )
+
+        # Every job and its Kie.ai task, so a restart doesn't lose paid work
+        self.journal = journal
+
+        # Completion pushed by Kie.ai; polling becomes a slow safety net
+        self.webhook = webhook
+        self.safety_poll_interval = safety_poll_interval
+
+        # Second tasks for stuck ones, to cut the latency tail
+        self.hedging = hedging
+
+        # Finished videos on local disk; one download per video at a time
+        self.artifacts = artifacts
+        self._stores = SingleFlight()
+
+    def _default_governor(self) -> RateGovernor:
+        """Per-key rate limits: callers queue for API tokens instead of failing on bursts"""
+        return RateGovernor({
+            "create": TokenBucket(rate=2.0, burst=5),
+            "query": TokenBucket(rate=self.poll_rate, burst=max(1, int(self.poll_rate)))
+        })
+
+    async def __aenter__(self) -> "SoraGiri":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    @property
+    def started(self) -> bool:
+        """True while the shared session is open"""
+        return self._session is not None and not self._session.closed
+
+    async def start(self, warmup: bool = False) -> "SoraGiri":
+        """
+        Open the shared connection pool. Safe to call more than once.
+
+        Args:
+            warmup: Pre-open connections to the Kie.ai API host
+
+        Returns:
+            The engine itself, for chaining
+        """
+        if not self.started:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout
+            )
+            # Each key has its own query budget; the poller may use all of them
+            self._poller = TaskPoller(self._poll_task, max_rate=self.poll_rate * len(self.keys))
+
+        if self.webhook is not None and not self.webhook.running:
+            self.webhook.on_result = self._on_callback
+            await self.webhook.start()
+
+        if warmup:
+            await self.warmup()
+
+        return self
+
+    async def close(self) -> None:
+        """Stop the poller, webhook and writer thread, and close the connection pool and cache store"""
+        if self.webhook is not None:
+            await self.webhook.close()
+        if self._poller is not None:
+            await self._poller.close()
+            self._poller = None
+        self.downloader.close()
+        self.cache.close()
+        if self.artifacts is not None:
+            self.artifacts.close()
+        if self.journal is not None:
+            self.journal.close()
+        if self._session is not None:
+            session, self._session = self._session, None
+            if not session.closed:
+                await session.close()
+
+    async def warmup(self, connections: int = 2) -> int:
+        """
+        Pre-open connections to the API host so the first job skips the
+        TCP+TLS handshake. Failures are ignored; warming is best-effort.
+
+        Args:
+            connections: Number of parallel connections to open
+
+        Returns:
+            Number of connections that were opened successfully
+        """
+        session = await self._get_session()
+
+        async def touch() -> bool:
+            try:
+                async with session.head(self.BASE_URL, allow_redirects=False) as resp:
+                    await resp.release()
+                return True
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return False
+
+        results = await asyncio.gather(*(touch() for _ in range(max(1, connections))))
+        return sum(results)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, starting it lazily if needed"""
+        if not self.started:
+            await self.start()
+        return self._session
 
     async def slice(
         self,
         video_url: str,
         output_path: Optional[Path] = None,
-        on_progress: Optional[Callable[[SliceState, str], None]] = None,
-        max_attempts: int = 60,
-        poll_interval: float = 2.0
+        on_progress: OnProgress = None,
+        max_attempts: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
+        destination: Optional[dict] = None
     ) -> SliceResult:
         """
         Slice the watermark from a Sora video.
 
+        Concurrent calls for the same video (after URL normalization) share
+        one upstream task and polling loop; each caller still gets its own
+        progress callbacks, its own download and its own copy of the result.
+        Polling settings of the first caller apply to the shared task.
+
+        Progress is published, not awaited: every callback gets its own
+        bounded latest-value channel and delivery task, so a slow callback
+        never delays polling or the download. slice() returns once each
+        callback has seen the final event.
+
+        Videos sliced before are served from the result cache (result.cached
+        is True) without contacting Kie.ai.
+
+        With a journal, the job is recorded before any work starts and
+        result.job_id identifies it; call mark_delivered() once the result
+        has reached its destination.
+
         Args:
             video_url: URL to the Sora video (must be publicly accessible)
             output_path: Optional path to save the output video
-            on_progress: Optional callback for progress updates (state, message)
-            max_attempts: Maximum polling attempts (default: 60 = 2 minutes)
-            poll_interval: Seconds between status checks (default: 2.0)
+            on_progress: Optional progress callback, or a list of them. Each
+                takes a ProgressEvent, or (legacy) (state, message)
+            max_attempts: Optional cap on status checks (legacy; prefer deadline)
+            poll_interval: Fixed seconds between status checks (legacy; overrides
+                the engine's polling strategy for this call)
+            use_cache: Serve and store results through the result cache
+            deadline: Seconds the task may take (default: engine deadline)
+            polling: Polling strategy for this call (default: engine strategy)
+            destination: Where the result should go, journaled with the job
+                (any JSON-serialisable dict) and handed back by recover()
 
         Returns:
             SliceResult with success status and output path/url
         """
-        async def emit(state: SliceState, msg: str):
-            if on_progress:
-                result = on_progress(state, msg)
-                # Handle both sync and async callbacks
-                if inspect.iscoroutine(result):
-                    await result
+        feed = ProgressFeed(on_progress, video_url)
+        started = time.monotonic()
+        try:
+            job = None
+            if self.journal is not None:
+                job = self.journal.create(video_url, normalize_video_url(video_url), destination)
+
+            result = await self._slice(
+                video_url, output_path, feed, max_attempts, poll_interval,
+                use_cache, deadline, polling
+            )
+
+            if job is not None:
+                self._finish_job(job.job_id, result)
+                result.job_id = job.job_id
+            self._record_slice(result, time.monotonic() - started)
+            return result
+        finally:
+            await feed.close()
+
+    async def _slice(
+        self,
+        video_url: str,
+        output_path: Optional[Path],
+        feed: ProgressFeed,
+        max_attempts: Optional[int],
+        poll_interval: Optional[float],
+        use_cache: bool,
+        deadline: Optional[float],
+        polling: Optional[PollingStrategy]
+    ) -> SliceResult:
+        """slice() without journaling; progress goes to feed"""
+        def emit(state: SliceState, msg: str):
+            feed.publish(ProgressEvent(state, msg, video_url=video_url))
+
+        key = normalize_video_url(video_url)
+
+        result = await self._cached_result(key) if use_cache else None
+        if result is not None:
+            result.video_url = video_url
+            emit(SliceState.SLICING, "Clean cut found in the sheath.")
+        else:
+            # Concurrent callers for the same video share one task and poll loop
+            strategy, budget = self._polling_plan(max_attempts, poll_interval, deadline, polling)
+            result = await self._flights.run(
+                key,
+                lambda shared_emit: self._run_slice(video_url, shared_emit, strategy, budget, max_attempts),
+                feed.publish if feed else None
+            )
+            # Coalesced callers each get their own timings to add to
+            result = replace(result, video_url=video_url, timings=dict(result.timings))
+
+        if not result.success:
+            return result
 
         try:
-            async with aiohttp.ClientSession() as session:
-                # Phase 1: Initialize the slice
-                await emit(SliceState.INITIALIZING, "Unsheathing the blade...")
-                task_id = await self._create_task(session, video_url)
-                await emit(SliceState.QUEUED, f"Task locked: {task_id[:8]}...")
-
-                # Phase 2: Poll for completion
-                result_url = None
-                cost_time = None
-
-                for attempt in range(max_attempts):
-                    await asyncio.sleep(poll_interval)
-
-                    result = await self._query_task(session, task_id)
-                    data = result.get("data", {})
-                    state = data.get("state", "unknown")
-
-                    if state == "success":
-                        # Parse the result
-                        result_json_str = data.get("resultJson", "{}")
-                        result_json = json.loads(result_json_str)
-                        result_urls = result_json.get("resultUrls", [])
-                        cost_time = data.get("costTime")
-
-                        if result_urls:
-                            result_url = result_urls[0]
-                            await emit(SliceState.SLICING, "Watermark severed.")
-                            break
-                        else:
-                            return SliceResult(
-                                success=False,
-                                error="No output URL in response"
-                            )
-
-                    elif state == "fail":
-                        error_msg = data.get("failMsg", "Unknown failure")
-                        await emit(SliceState.FAILED, f"Blade shattered: {error_msg}")
-                        return SliceResult(success=False, error=error_msg)
-
-                    elif state in ("waiting", "queuing"):
-                        await emit(SliceState.QUEUED, f"In queue... [{attempt + 1}/{max_attempts}]")
-
-                    elif state == "generating":
-                        await emit(SliceState.SLICING, f"Slicing... [{attempt + 1}/{max_attempts}]")
+            # Phase 3: Download if output path specified
+            if output_path and result.output_url:
+                emit(SliceState.DOWNLOADING, "Retrieving the clean cut...")
+                result.output_size = await self.save(result, output_path)
+                emit(SliceState.COMPLETE, f"Saved to {output_path}")
+                result.output_path = output_path
+            else:
+                emit(SliceState.COMPLETE, "Slice complete.")
 
-                    else:
-                        await emit(SliceState.SLICING, f"Processing... [{attempt + 1}/{max_attempts}]")
+            return result
+
+        except Exception as e:
+            if result.cached:
+                # Cached link went bad between the check and the download
+                self.cache.discard(key)
+                return await self._slice(
+                    video_url, output_path, feed, max_attempts, poll_interval,
+                    use_cache=False, deadline=deadline, polling=polling
+                )
+            emit(SliceState.FAILED, str(e))
+            return SliceResult(success=False, error=str(e), video_url=video_url)
+
+    async def slice_many(
+        self,
+        video_urls: Union[Iterable[str], AsyncIterable[str]],
+        output_dir: Optional[Path] = None,
+        concurrency: int = 4,
+        on_progress: Optional[Callable[..., Any]] = None,
+        **slice_kwargs
+    ) -> AsyncIterator[SliceResult]:
+        """
+        Slice many videos with bounded concurrency, yielding results as they finish.
+
+        URLs are pulled from the input lazily, so huge or streaming inputs
+        never hold more than `concurrency` jobs in flight. Duplicate URLs
+        (after normalization) are sliced once.
+
+        Args:
+            video_urls: Iterable or async iterable of Sora video URLs
+            output_dir: Optional directory; each video is saved as output_name_for(url)
+            concurrency: Maximum slices in flight at once
+            on_progress: Optional progress callback taking a ProgressEvent
+                (event.video_url identifies the job), or (legacy) (url, state, message)
+            **slice_kwargs: Passed through to slice() (deadline, polling, use_cache, ...)
+
+        Yields:
+            SliceResult for each unique URL, in completion order (result.video_url
+            identifies the job)
+        """
+        slots = asyncio.Semaphore(max(1, concurrency))
+        finished: asyncio.Queue = asyncio.Queue()
+        pending: set[asyncio.Task] = set()
+        launched = 0
+        legacy_progress = on_progress is not None and positional_arity(on_progress) != 1
+
+        async def run_one(url: str) -> SliceResult:
+            try:
+                progress = on_progress
+                if legacy_progress:
+                    progress = lambda event: on_progress(url, event.state, event.message)
+                output_path = Path(output_dir) / output_name_for(url) if output_dir else None
+                return await self.slice(url, output_path=output_path, on_progress=progress, **slice_kwargs)
+            finally:
+                slots.release()
+
+        async def feed() -> None:
+            nonlocal launched
+            seen = set()
+            try:
+                async for url in _iterate(video_urls):
+                    key = normalize_video_url(url)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    await slots.acquire()
+                    task = asyncio.create_task(run_one(url))
+                    pending.add(task)
+                    task.add_done_callback(finished.put_nowait)
+                    launched += 1
+            finally:
+                finished.put_nowait(None)
+
+        feeder = asyncio.create_task(feed())
+        yielded = 0
+        feeding = True
+        try:
+            while feeding or yielded < launched:
+                task = await finished.get()
+                if task is None:
+                    feeding = False
+                    continue
+                pending.discard(task)
+                yielded += 1
+                yield task.result()
+
+            # Surface errors raised while reading the input
+            await feeder
+        finally:
+            feeder.cancel()
+            for task in pending:
+                task.cancel()
+
+    async def recover(self, concurrency: int = 8) -> AsyncIterator[tuple[JobRecord, SliceResult]]:
+        """
+        Finish journaled jobs that a restart interrupted.
+
+        Jobs whose Kie.ai task was already created go back to polling that
+        task (no new task is paid for); jobs that never got a task are
+        sliced again; finished jobs that were never delivered are handed
+        back as they are. Jobs for the same video share one task.
+
+        Args:
+            concurrency: Videos resumed at once
+
+        Yields:
+            (job, result) for every job that still needs delivering, in
+            completion order. Call mark_delivered(job.job_id) after delivery.
+        """
+        if self.journal is None:
+            return
+
+        self.journal.prune()
+        for job in self.journal.undelivered():
+            yield job, self._journaled_result(job)
+
+        # One resume per video; every job for it gets the result
+        groups: dict[str, list[JobRecord]] = {}
+        for job in self.journal.unfinished():
+            groups.setdefault(job.key, []).append(job)
+        if groups:
+            print(f"[SoraGiri] Resuming {len(groups)} interrupted cut(s) from the journal")
+
+        slots = asyncio.Semaphore(max(1, concurrency))
+
+        async def resume(jobs: list[JobRecord]) -> tuple[list[JobRecord], SliceResult]:
+            async with slots:
+                return jobs, await self._resume(jobs)
+
+        for finished in asyncio.as_completed([resume(jobs) for jobs in groups.values()]):
+            jobs, result = await finished
+            for job in jobs:
+                self._finish_job(job.job_id, result)
+                yield self.journal.get(job.job_id) or job, replace(
+                    result, video_url=job.video_url, job_id=job.job_id
+                )
+
+    def mark_delivered(self, job_id: Optional[str]) -> None:
+        """Record that a journaled job's result reached its destination"""
+        if self.journal is not None and job_id:
+            self.journal.mark_delivered(job_id)
+
+    async def _resume(self, jobs: list[JobRecord]) -> SliceResult:
+        """Finish one video's interrupted jobs, reusing its Kie.ai task when there is one"""
+        video_url = jobs[0].video_url
+        job = next((job for job in jobs if job.task_id), None)
+        if job is None:
+            return await self._slice(video_url, None, ProgressFeed(), None, None, True, None, None)
+
+        return await self._flights.run(
+            jobs[0].key,
+            lambda emit: self._run_slice(
+                video_url, emit, self.polling, self.deadline,
+                task_id=job.task_id, api_key_id=job.api_key_id
+            ),
+            None
+        )
+
+    def _discard_job(self, job_id: Optional[str]) -> None:
+        """Drop a journaled job that a retry replaces"""
+        if self.journal is not None and job_id:
+            self.journal.discard(job_id)
+
+    def _finish_job(self, job_id: str, result: SliceResult) -> None:
+        """Journal a job's outcome"""
+        if result.success and result.output_url:
+            self.journal.finish(job_id, output_url=result.output_url, cost_time_ms=result.cost_time_ms)
+        else:
+            self.journal.finish(job_id, error=result.error or "Unknown error")
+
+    @staticmethod
+    def _journaled_result(job: JobRecord) -> SliceResult:
+        """SliceResult for a job that finished before the restart"""
+        return SliceResult(
+            success=job.state == JobState.SUCCEEDED,
+            output_url=job.output_url,
+            error=job.error,
+            cost_time_ms=job.cost_time_ms,
+            video_url=job.video_url,
+            job_id=job.job_id,
+            polls=0
+        )
+
+    async def _cached_result(self, key: str) -> Optional[SliceResult]:
+        """Serve a result from the cache, verifying expired links are alive"""
+        entry = self.cache.get(key)
+        if entry is None or not self.cache.is_fresh(entry):
+            # A video on local disk doesn't need its result URL to still work
+            artifact = self.artifacts.get(key) if self.artifacts is not None else None
+            if artifact is not None:
+                return SliceResult(
+                    success=True,
+                    output_url=artifact.output_url,
+                    cost_time_ms=artifact.cost_time_ms,
+                    cached=True,
+                    polls=0,
+                    output_size=artifact.size
+                )
+        if entry is None:
+            return None
+
+        if not self.cache.is_fresh(entry):
+            if not await self._url_alive(entry.output_url):
+                self.cache.discard(key)
+                return None
+            # Still alive: fresh again, so the next hits skip the probe
+            self.cache.put(key, entry.output_url, entry.cost_time_ms)
+
+        return SliceResult(
+            success=True,
+            output_url=entry.output_url,
+            cost_time_ms=entry.cost_time_ms,
+            cached=True,
+            polls=0
+        )
+
+    async def _url_alive(self, url: str) -> bool:
+        """Cheap liveness probe for a result URL (HEAD, falling back to a 1-byte GET)"""
+        session = await self._get_session()
+        probe_timeout = aiohttp.ClientTimeout(total=10)
+        try:
+            async with session.head(url, allow_redirects=True, timeout=probe_timeout) as resp:
+                if resp.status < 400:
+                    return True
+                if resp.status not in (403, 405):
+                    return False
+
+            # Some CDNs refuse HEAD on signed URLs
+            headers = {"Range": "bytes=0-0"}
+            async with session.get(url, headers=headers, timeout=probe_timeout) as resp:
+                return resp.status in (200, 206)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    def _polling_plan(
+        self,
+        max_attempts: Optional[int],
+        poll_interval: Optional[float],
+        deadline: Optional[float],
+        polling: Optional[PollingStrategy]
+    ) -> tuple[PollingStrategy, float]:
+        """Resolve per-call polling arguments (including the legacy ones) against engine defaults"""
+        if polling is None:
+            polling = FixedPolling(poll_interval) if poll_interval else self.polling
+
+        if deadline is None:
+            if max_attempts:
+                # Legacy budget: attempts x interval
+                deadline = max_attempts * (poll_interval or 2.0)
+            else:
+                deadline = self.deadline
+
+        return polling, deadline
+
+    async def _run_slice(
+        self,
+        video_url: str,
+        emit: Emitter,
+        strategy: PollingStrategy,
+        deadline: float,
+        max_polls: Optional[int] = None,
+        task_id: Optional[str] = None,
+        api_key_id: Optional[str] = None
+    ) -> SliceResult:
+        """
+        Create the task and poll it to completion (shared by coalesced callers).
+
+        Pass task_id (and the fingerprint of the key that created it) to
+        resume polling a task created earlier instead.
+        """
+        polls = 0
+        resumed = task_id is not None
+        key: Optional[ApiKey] = None
+        stats = {"rate_wait": 0.0, "retries": 0}
+        timings: dict[str, float] = {}
+        # Seconds after creation at which the task was first seen generating
+        generating_at: list[float] = []
+
+        def progress(state: SliceState, msg: str, attempt: int = 0, elapsed: float = 0.0):
+            emit(ProgressEvent(
+                state, msg,
+                video_url=video_url,
+                task_id=task_id,
+                attempt=attempt,
+                max_attempts=max_polls,
+                elapsed=elapsed,
+                deadline=deadline,
+                eta=strategy.eta(elapsed)
+            ))
+
+        try:
+            session = await self._get_session()
+
+            # Phase 1: Initialize the slice
+            if task_id is None:
+                progress(SliceState.INITIALIZING, "Unsheathing the blade...")
+                created = time.monotonic()
+                task_id, key = await self._create_task(session, video_url, stats)
+                timings["create"] = time.monotonic() - created
+                self.metrics.observe("soragiri_task_create_seconds", timings["create"])
+                if self.journal is not None:
+                    self.journal.attach_task(normalize_video_url(video_url), task_id, key.id)
+            else:
+                # Status queries only work with the key that created the task
+                key = self.keys.claim(api_key_id)
+                self.keys.assign(task_id, key)
+            progress(SliceState.QUEUED, f"Task locked: {task_id[:8]}...")
+
+            # Phase 2: Hand the task to the shared poller and wait for it
+            async def on_update(state: str, count: int, elapsed: float):
+                timer = f"[{elapsed:.0f}/{deadline:.0f}s]"
+                if state in ("waiting", "queuing"):
+                    progress(SliceState.QUEUED, f"In queue... {timer}", count, elapsed)
+
+                elif state == "generating":
+                    if not generating_at:
+                        generating_at.append(elapsed)
+                    progress(SliceState.SLICING, f"Slicing... {timer}", count, elapsed)
 
                 else:
-                    # Loop exhausted without success
-                    return SliceResult(
-                        success=False,
-                        error="Timeout: blade could not complete the cut"
-                    )
+                    progress(SliceState.SLICING, f"Processing... {timer}", count, elapsed)
 
-                # Phase 3: Download if output path specified
-                if output_path and result_url:
-                    await emit(SliceState.DOWNLOADING, "Retrieving the clean cut...")
-                    await self._download_video(session, result_url, output_path)
-                    await emit(SliceState.COMPLETE, f"Saved to {output_path}")
+            # Tasks created with a callback URL get their result pushed.
+            # Resumed tasks may have missed theirs and are polled as usual.
+            watch_strategy = strategy
+            if self.webhook is not None and not resumed:
+                watch_strategy = SafetyNetPolling(strategy, self.safety_poll_interval)
+                progress(SliceState.SLICING, "Slicing... Kie.ai will call back when the cut is done.")
+            if self.hedging is not None and not resumed:
+                outcome = await self._watch_hedged(
+                    session, video_url, task_id, watch_strategy, deadline, on_update, max_polls,
+                    stats, generating_at, progress
+                )
+            else:
+                outcome = await self._poller.watch(task_id, watch_strategy, deadline, on_update, max_polls)
+            polls = outcome.polls
+            data = outcome.data
+            self._record_task(
+                outcome.state, outcome.elapsed, polls,
+                generating_at[0] if generating_at else None,
+                data.get("costTime") if outcome.state == "success" else None,
+                timings
+            )
+            if self.hedging is not None and outcome.state == "success":
+                self.hedging.record_queue(timings["queue"])
 
+            if outcome.state == "success":
+                # Parse the result
+                result_json_str = data.get("resultJson", "{}")
+                result_json = json.loads(result_json_str)
+                result_urls = result_json.get("resultUrls", [])
+
+                if result_urls:
+                    cost_time = data.get("costTime")
+                    self._learn(strategy, cost_time)
+                    self.cache.put(normalize_video_url(video_url), result_urls[0], cost_time)
+                    progress(SliceState.SLICING, "Watermark severed.")
                     return SliceResult(
                         success=True,
-                        output_path=output_path,
-                        output_url=result_url,
-                        cost_time_ms=cost_time
+                        output_url=result_urls[0],
+                        cost_time_ms=cost_time,
+                        polls=polls,
+                        **self._rate_stats(stats, timings)
                     )
                 else:
-                    await emit(SliceState.COMPLETE, "Slice complete.")
                     return SliceResult(
-                        success=True,
-                        output_url=result_url,
-                        cost_time_ms=cost_time
+                        success=False,
+                        error="No output URL in response",
+                        polls=polls,
+                        **self._rate_stats(stats, timings)
                     )
 
+            elif outcome.state == "fail":
+                error_msg = data.get("failMsg", "Unknown failure")
+                progress(SliceState.FAILED, f"Blade shattered: {error_msg}")
+                return SliceResult(success=False, error=error_msg, polls=polls, **self._rate_stats(stats, timings))
+
+            # Budget exhausted without success
+            return SliceResult(
+                success=False,
+                error="Timeout: blade could not complete the cut",
+                polls=polls,
+                **self._rate_stats(stats, timings)
+            )
+
         except Exception as e:
-            await emit(SliceState.FAILED, str(e))
-            return SliceResult(success=False, error=str(e))
+            progress(SliceState.FAILED, str(e))
+            return SliceResult(success=False, error=str(e), polls=polls, **self._rate_stats(stats, timings))
+
+        finally:
+            if key is not None:
+                self.keys.release(key, task_id)
+
+    async def _watch_hedged(
+        self,
+        session: aiohttp.ClientSession,
+        video_url: str,
+        task_id: str,
+        strategy: PollingStrategy,
+        deadline: float,
+        on_update: Callable,
+        max_polls: Optional[int],
+        stats: dict,
+        generating_at: list[float],
+        progress: Callable
+    ) -> PollOutcome:
+        """
+        Watch a task, racing a hedge against it if it stays queued too long.
+
+        The hedge is a second task for the same video, sent once the task
+        has waited the policy's delay without being seen generating (and
+        the spend cap allows it). The first success wins; a failure only
+        counts once the other task has ended too. The loser is no longer
+        polled.
+        """
+        started = time.monotonic()
+        primary = self._poller.watch(task_id, strategy, deadline, on_update, max_polls)
+        self.hedging.task_started()
+        delay = self.hedging.delay()
+        if delay is None or delay >= deadline:
+            return await primary
+
+        hedge = None
+        hedge_key = hedge_id = None
+        try:
+            done, _ = await asyncio.wait([primary], timeout=delay)
+            if done or generating_at or not self.hedging.allow():
+                return await primary
+            try:
+                queued = await self._still_queued(session, task_id, strategy)
+            except Exception as e:
+                # A failed status check says nothing about the task itself
+                print(f"[SoraGiri] Hedge for task {task_id[:8]} skipped: {e}")
+                self.metrics.inc("soragiri_hedges_total", outcome="not_sent")
+                return await primary
+            if not queued:
+                return await primary
+
+            progress(SliceState.QUEUED, "The queue is slow - drawing a second blade...")
+            try:
+                hedge_id, hedge_key = await self._create_task(session, video_url, stats)
+            except Exception as e:
+                print(f"[SoraGiri] Hedge for task {task_id[:8]} not sent: {e}")
+                self.metrics.inc("soragiri_hedges_total", outcome="not_sent")
+                return await primary
+            self.hedging.hedged()
+            offset = time.monotonic() - started
+
+            async def hedge_update(state: str, count: int, elapsed: float):
+                await on_update(state, count, offset + elapsed)
+
+            hedge = self._poller.watch(hedge_id, strategy, max(1.0, deadline - offset), hedge_update, max_polls)
+            racing = {primary: False, hedge: True}
+            fallback: Optional[PollOutcome] = None
+            error: Optional[BaseException] = None
+            while racing:
+                done, _ = await asyncio.wait(racing, return_when=asyncio.FIRST_COMPLETED)
+                # Primary first when both end together
+                for future in sorted(done, key=lambda f: racing[f]):
+                    is_hedge = racing.pop(future)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    outcome = future.result()
+                    if is_hedge:
+                        # Elapsed time counts from the primary task's creation
+                        outcome = replace(outcome, elapsed=outcome.elapsed + offset)
+                    if outcome.state == "success":
+                        self.metrics.inc("soragiri_hedges_total", outcome="won" if is_hedge else "lost")
+                        if is_hedge:
+                            self.hedging.won()
+                        return outcome
+                    fallback = fallback or outcome
+
+            self.metrics.inc("soragiri_hedges_total", outcome="lost")
+            if fallback is not None:
+                return fallback
+            raise error
+
+        finally:
+            # Stop tracking whichever task lost (or everything, if cancelled)
+            for future in (primary, hedge):
+                if future is not None and not future.done():
+                    future.cancel()
+            if hedge_key is not None:
+                self.keys.release(hedge_key, hedge_id)
+
+    async def _still_queued(self, session: aiohttp.ClientSession, task_id: str, strategy: PollingStrategy) -> bool:
+        """
+        Whether a task is still waiting in Kie.ai's queue. Polled tasks
+        report it as they go; tasks awaiting a callback are checked once.
+        """
+        if not isinstance(strategy, SafetyNetPolling):
+            return True
+        data = (await self._query_task(session, task_id)).get("data") or {}
+        if data.get("state") in FINAL_STATES:
+            self._poller.complete(task_id, data)
+            return False
+        return data.get("state") in ("waiting", "queuing")
+
+    @staticmethod
+    def _rate_stats(stats: dict, timings: dict[str, float]) -> dict:
+        """SliceResult fields for client-side rate-limit wait, retries and phase timings"""
+        return {
+            "rate_wait_ms": int(stats["rate_wait"] * 1000),
+            "retries": stats["retries"],
+            "timings": {**timings, "rate_wait": stats["rate_wait"]}
+        }
+
+    def _record_task(
+        self,
+        state: str,
+        waited: float,
+        polls: int,
+        generating_at: Optional[float],
+        cost_time_ms: Optional[int],
+        timings: dict[str, float]
+    ) -> None:
+        """
+        Split a task's wait into queue and generate time and report it.
+
+        The first poll that saw the task generating bounds its queue time;
+        without one, Kie.ai's costTime is taken as the generating part and
+        the rest (including the lag until a poll noticed the finish) as
+        queue time.
+        """
+        if generating_at is not None:
+            queue = generating_at
+        elif cost_time_ms is not None:
+            queue = max(0.0, waited - cost_time_ms / 1000)
+        else:
+            queue = 0.0
+        timings["queue"] = queue
+        timings["generate"] = waited - queue
+
+        self.metrics.inc("soragiri_tasks_total", outcome=state)
+        self.metrics.observe("soragiri_task_queue_seconds", queue)
+        self.metrics.observe("soragiri_task_generate_seconds", waited - queue)
+        self.metrics.observe("soragiri_task_polls", polls)
+
+    def _record_slice(self, result: SliceResult, seconds: float) -> None:
+        """Report a finished slice() call and stamp its total time"""
+        result.timings["total"] = seconds
+        if result.cached:
+            outcome = "cached"
+        else:
+            outcome = "success" if result.success else "failed"
+        self.metrics.inc("soragiri_slices_total", outcome=outcome)
+        self.metrics.observe("soragiri_slice_seconds", seconds, outcome=outcome)
+
+    def _record_download(self, result: SliceResult, size: int, seconds: float) -> None:
+        """Record a finished download on the result and in the metrics"""
+        result.download_bytes = size
+        result.download_ms = int(seconds * 1000)
+        result.timings["download"] = seconds
+        self.metrics.inc("soragiri_download_bytes_total", size)
+        self.metrics.observe("soragiri_download_seconds", seconds)
+        if seconds > 0:
+            self.metrics.observe("soragiri_download_throughput_bytes_per_second", size / seconds)
+
+    def _learn(self, strategy: PollingStrategy, cost_time_ms: Optional[int]) -> None:
+        """Feed a finished task's processing time to the polling strategies"""
+        self.polling.record(cost_time_ms)
+        if strategy is not self.polling:
+            strategy.record(cost_time_ms)
 
     async def slice_to_bytes(
         self,
         video_url: str,
-        on_progress: Optional[Callable[[SliceState, str], None]] = None,
-        max_attempts: int = 60,
-        poll_interval: float = 2.0
+        on_progress: OnProgress = None,
+        max_attempts: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None
     ) -> tuple[bool, bytes | str]:
         """
-        Slice watermark and return video as bytes (useful for Discord uploads).
+        Slice watermark and return video as bytes.
+
+        Holds the whole video in memory; prefer slice_to_stream() for
+        uploads and anything running many jobs at once.
 
         Returns:
             Tuple of (success, video_bytes or error_message)
@@ -185,58 +1121,419 @@ class SoraGiri:
             output_path=None,
             on_progress=on_progress,
             max_attempts=max_attempts,
-            poll_interval=poll_interval
+            poll_interval=poll_interval,
+            use_cache=use_cache,
+            deadline=deadline,
+            polling=polling
         )
 
         if not result.success:
             return False, result.error or "Unknown error"
 
-        # Download to bytes
+        # Download to bytes over the shared pool
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(result.output_url) as resp:
-                    if resp.status == 200:
-                        return True, await resp.read()
-                    else:
-                        return False, f"Download failed: HTTP {resp.status}"
+            artifact = await self.artifact_for(result)
+            if artifact is not None:
+                return True, await asyncio.to_thread(artifact.path.read_bytes)
+            session = await self._get_session()
+            async with session.get(result.output_url) as resp:
+                if resp.status == 200:
+                    return True, await resp.read()
+                error = f"Download failed: HTTP {resp.status}"
         except Exception as e:
-            return False, f"Download error: {e}"
+            error = f"Download error: {e}"
+
+        if result.cached:
+            # Cached link went bad between the check and the download
+            self.cache.discard(normalize_video_url(video_url))
+            self._discard_job(result.job_id)
+            return await self.slice_to_bytes(
+                video_url, on_progress, max_attempts, poll_interval,
+                use_cache=False, deadline=deadline, polling=polling
+            )
+        return False, error
+
+    async def slice_to_stream(
+        self,
+        video_url: str,
+        on_progress: OnProgress = None,
+        max_bytes: Optional[int] = None,
+        **slice_kwargs
+    ) -> SliceResult:
+        """
+        Slice watermark and stream the video into a spooled file.
+
+        Unlike slice_to_bytes(), the whole video is never required to fit in
+        memory: result.file stays in RAM below the engine's spool_threshold
+        (and while the shared memory budget allows) and is on disk otherwise.
+
+        Args:
+            video_url: URL to the Sora video
+            on_progress: Progress callback(s), as for slice()
+            max_bytes: Largest result worth downloading (e.g. an upload
+                limit); bigger results are left at their URL
+            **slice_kwargs: Passed on to slice()
+
+        Returns:
+            SliceResult; on success result.file is a readable binary file
+            positioned at the start, or None if the result is over
+            max_bytes. The caller must close it.
+        """
+        result = await self.slice(video_url, on_progress=on_progress, **slice_kwargs)
+        if not result.success:
+            return result
+
+        try:
+            return await self.fetch(result, max_bytes)
+        except Exception as e:
+            if result.cached:
+                # Cached link went bad between the check and the download
+                self.cache.discard(normalize_video_url(video_url))
+                self._discard_job(result.job_id)
+                return await self.slice_to_stream(
+                    video_url, on_progress, max_bytes, **{**slice_kwargs, "use_cache": False}
+                )
+            return replace(result, success=False, error=f"Download error: {e}")
+
+    async def fetch(self, result: SliceResult, max_bytes: Optional[int] = None) -> SliceResult:
+        """
+        Download a successful result into result.file.
+
+        With max_bytes, the result's size is probed first (HEAD, then a
+        one-byte range request) and a result known to be larger is not
+        downloaded at all. If the CDN won't tell, the download stops as
+        soon as it passes max_bytes. Either way result.file stays None and
+        result.output_size holds the size when it is known.
+
+        With an artifact store, result.file is the stored copy (downloaded
+        into the store first if it isn't there yet).
+
+        Returns:
+            result, updated in place
 
-    async def _create_task(self, session: aiohttp.ClientSession, video_url: str) -> str:
-        """Submit video for watermark removal, returns task_id"""
+        Raises:
+            Exception: The download failed
+        """
+        if self.artifacts is not None:
+            return await self._fetch_stored(result, max_bytes)
+
+        if max_bytes is not None:
+            result.output_size = await self.result_size(result.output_url)
+            if result.output_size is not None and result.output_size > max_bytes:
+                return result
+
+        started = time.monotonic()
+        try:
+            result.file = await self.download(result.output_url, max_bytes)
+        except ResultTooLarge:
+            return result
+        result.output_size = result.file.size
+        seconds = time.monotonic() - started
+        self._record_download(result, result.file.size, seconds)
+        if "total" in result.timings:
+            result.timings["total"] += seconds
+        return result
+
+    async def _fetch_stored(self, result: SliceResult, max_bytes: Optional[int]) -> SliceResult:
+        """fetch() through the artifact store"""
+        stored = self.artifacts.get(self._artifact_key(result))
+        if stored is None and max_bytes is not None:
+            # Don't store what can't be delivered anyway
+            result.output_size = await self.result_size(result.output_url)
+            if result.output_size is not None and result.output_size > max_bytes:
+                return result
+
+        try:
+            # Without a known size, the download itself stops past max_bytes
+            artifact = await self.artifact_for(result, max_bytes if stored is None else None)
+        except ResultTooLarge:
+            return result
+        result.output_size = artifact.size
+        if max_bytes is None or artifact.size <= max_bytes:
+            result.file = open(artifact.path, "rb")
+        return result
+
+    async def save(self, result: SliceResult, output_path: Path) -> int:
+        """
+        Write a successful result's video to output_path.
+
+        With an artifact store the file is placed from the stored copy
+        (reflinked where the filesystem allows, otherwise copied); without
+        one it is downloaded.
+
+        Returns:
+            Size of the video in bytes
+        """
+        output_path = Path(output_path)
+        artifact = await self.artifact_for(result)
+        if artifact is None:
+            download = await self._download_video(await self._get_session(), result.output_url, output_path)
+            self._record_download(result, download.fetched, download.seconds)
+            return download.bytes
+
+        method = await self.artifacts.export(artifact, output_path)
+        self.metrics.inc("soragiri_artifact_exports_total", method=method)
+        return artifact.size
+
+    async def artifact_for(self, result: SliceResult, max_bytes: Optional[int] = None) -> Optional[Artifact]:
+        """
+        The stored video for a successful result, downloaded into the
+        artifact store first if it isn't there yet.
+
+        Args:
+            result: A successful SliceResult
+            max_bytes: Don't download (or store) a video larger than this
+
+        Returns:
+            The Artifact, or None if the engine has no artifact store
+
+        Raises:
+            ResultTooLarge: The video isn't stored and is over max_bytes
+            Exception: The download failed
+        """
+        if self.artifacts is None:
+            return None
+        key = self._artifact_key(result)
+        artifact = self.artifacts.get(key)
+        if artifact is not None:
+            self.metrics.inc("soragiri_artifact_requests_total", outcome="hit")
+            return artifact
+        # Callers delivering the same video at once (with the same limit)
+        # share its download
+        flight = key if max_bytes is None else f"{key}#max={max_bytes}"
+        return await self._stores.run(flight, lambda _: self._store_artifact(key, result, max_bytes))
+
+    async def _store_artifact(self, key: str, result: SliceResult, max_bytes: Optional[int] = None) -> Artifact:
+        self.metrics.inc("soragiri_artifact_requests_total", outcome="miss")
+        if not result.output_url:
+            raise Exception("No result URL to download")
+        async with self.artifacts.claim(key) as temp:
+            # Another process sharing the store may have finished it meanwhile
+            artifact = self.artifacts.get(key)
+            if artifact is not None:
+                return artifact
+            download = await self._download_video(await self._get_session(), result.output_url, temp, max_bytes)
+            self._record_download(result, download.fetched, download.seconds)
+            artifact = await self.artifacts.put(key, temp, result.output_url, result.cost_time_ms)
+        self.metrics.set("soragiri_artifact_bytes", self.artifacts.total_bytes)
+        return artifact
+
+    @staticmethod
+    def _artifact_key(result: SliceResult) -> str:
+        return normalize_video_url(result.video_url or result.output_url)
+
+    async def result_size(self, url: str) -> Optional[int]:
+        """Bytes behind a result URL without downloading it, if the CDN tells"""
+        return await probe_size(await self._get_session(), url)
+
+    async def download(self, url: str, max_bytes: Optional[int] = None) -> SpooledResult:
+        """
+        Download a result URL into a SpooledResult (memory or temp file).
+
+        Args:
+            url: Result URL
+            max_bytes: Give up with ResultTooLarge once the download passes this
+
+        Returns:
+            SpooledResult positioned at the start; the caller must close it
+        """
+        spool = SpooledResult(self.spool_threshold, self.memory_budget)
+        try:
+            async for chunk in self.iter_download(url):
+                if max_bytes is not None and spool.size + len(chunk) > max_bytes:
+                    raise ResultTooLarge(max_bytes)
+                if spool.in_memory:
+                    spool.write(chunk)
+                else:
+                    # Spilled to disk: keep the write off the event loop
+                    await asyncio.to_thread(spool.write, chunk)
+            spool.seek(0)
+            return spool
+        except BaseException:
+            spool.close()
+            raise
+
+    async def download_to(self, url: str, output_path: Path) -> DownloadStats:
+        """Download a result URL to a file (parallel ranges and resume when supported)"""
+        return await self._download_video(await self._get_session(), url, Path(output_path))
+
+    async def iter_download(self, url: str, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Stream a result URL as an async iterator of byte chunks"""
+        chunk_size = chunk_size or self.downloader.chunk_size
+        session = await self._get_session()
+        async with session.get(url) as resp:
+            if resp.status != 200:
+                raise Exception(f"Download failed: HTTP {resp.status}")
+
+            async for chunk in resp.content.iter_chunked(chunk_size):
+                yield chunk
+
+    async def _create_task(
+        self,
+        session: aiohttp.ClientSession,
+        video_url: str,
+        stats: Optional[dict] = None
+    ) -> tuple[str, ApiKey]:
+        """
+        Submit video for watermark removal on the best key in the pool.
+
+        A key that is throttled, out of credits or rejected is parked and
+        the task moves to another key while one is available.
+
+        Returns:
+            (task_id, key the task runs on); the key holds a task slot
+            until released
+        """
         payload = {
             "model": "sora-watermark-remover",
             "input": {"video_url": video_url}
         }
+        if self.webhook is not None:
+            payload["callBackUrl"] = self.webhook.callback_url
+
+        moves = 0
+        while True:
+            waited = time.monotonic()
+            key = await self.keys.acquire()
+            if stats is not None:
+                stats["rate_wait"] += time.monotonic() - waited
 
-        async with session.post(self.CREATE_ENDPOINT, headers=self.headers, json=payload) as resp:
-            if resp.status == 429:
-                raise Exception("Rate limited - the blade needs rest")
+            try:
+                data = await self._send(
+                    session, key, "create", "POST", self.CREATE_ENDPOINT, stats,
+                    reroute=moves < len(self.keys), json=payload
+                )
+            except KeyThrottled:
+                self.keys.release(key)
+                moves += 1
+                continue
+            except BaseException:
+                self.keys.release(key)
+                raise
 
-            data = await resp.json()
+            code = data.get("code")
+            if code == 200:
+                task_id = data["data"]["taskId"]
+                self.keys.assign(task_id, key)
+                return task_id, key
 
-            if data.get("code") != 200:
-                error_msg = data.get("message", "Unknown error")
-                raise Exception(f"API Error: {error_msg}")
+            self.keys.release(key)
+            if code in CREDIT_CODES or code in AUTH_CODES:
+                self.keys.park(key, "credits" if code in CREDIT_CODES else "auth")
+                if self.keys.has_alternative(key) and moves < len(self.keys):
+                    moves += 1
+                    continue
 
-            return data["data"]["taskId"]
+            error_msg = data.get("message") or data.get("msg") or "Unknown error"
+            raise Exception(f"API Error: {error_msg}")
+
+    def _on_callback(self, task_id: str, data: dict) -> None:
+        """A task result pushed to the webhook"""
+        matched = self._poller is not None and self._poller.complete(task_id, data)
+        self.metrics.inc("soragiri_callbacks_total", matched="yes" if matched else "no")
+
+    async def _poll_task(self, task_id: str) -> dict:
+        """Status query used by the shared poller"""
+        session = await self._get_session()
+        return await self._query_task(session, task_id)
 
     async def _query_task(self, session: aiohttp.ClientSession, task_id: str) -> dict:
-        """Check status of a watermark removal task"""
+        """Check status of a watermark removal task, with the key that created it"""
         params = {"taskId": task_id}
+        key = self.keys.key_for(task_id)
+        return await self._send(session, key, "query", "GET", self.QUERY_ENDPOINT, params=params)
 
-        async with session.get(self.QUERY_ENDPOINT, headers=self.headers, params=params) as resp:
-            return await resp.json()
+    async def _send(
+        self,
+        session: aiohttp.ClientSession,
+        key: ApiKey,
+        endpoint: str,
+        method: str,
+        url: str,
+        stats: Optional[dict] = None,
+        reroute: bool = False,
+        **kwargs
+    ) -> dict:
+        """
+        Make a Kie.ai API call with a key, through its rate governor.
 
-    async def _download_video(self, session: aiohttp.ClientSession, url: str, output_path: Path) -> None:
-        """Download video to specified path"""
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        Waits in the endpoint's fair queue for a token, honours Retry-After,
+        and retries 429/5xx responses (HTTP status or the body's "code") and
+        connection errors with backoff. A 429 parks the key for new tasks;
+        with reroute, KeyThrottled is raised instead of retrying when
+        another key could take the call. Seconds spent waiting are added to
+        stats["rate_wait"] and retries to stats["retries"].
+        """
+        policy = key.governor.retry
+        attempt = 0
 
-        async with session.get(url) as resp:
-            if resp.status != 200:
-                raise Exception(f"Download failed: HTTP {resp.status}")
+        while True:
+            waited = await key.governor.acquire(endpoint)
+            if stats is not None:
+                stats["rate_wait"] += waited
+            self.metrics.observe("soragiri_api_rate_wait_seconds", waited, endpoint=endpoint)
+
+            status = None
+            retry_after = None
+            sent = time.monotonic()
+            try:
+                async with session.request(method, url, headers=key.headers, **kwargs) as resp:
+                    if resp.status not in policy.RETRY_STATUSES:
+                        data = await resp.json(content_type=None)
+                        if not isinstance(data, dict) or data.get("code") not in policy.RETRY_STATUSES:
+                            self._record_request(endpoint, resp.status, sent)
+                            # Only a new task proves the key works again; status
+                            # polls succeed even on a key that is out of credits
+                            if endpoint == "create" and isinstance(data, dict) and data.get("code") == 200:
+                                self.keys.healthy(key)
+                            return data
+                        status = data.get("code")
+                    else:
+                        status = resp.status
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    failure = f"HTTP {status}"
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                failure = str(e) or type(e).__name__
+            self._record_request(endpoint, status or "error", sent)
+
+            if attempt >= policy.max_retries:
+                if status == 429:
+                    raise Exception("Rate limited - the blade needs rest")
+                raise Exception(f"API unavailable after {attempt + 1} attempts: {failure}")
 
-            with open(output_path, "wb") as f:
-                async for chunk in resp.content.iter_chunked(8192):
-                    f.write(chunk)
+            delay = policy.delay(attempt, retry_after)
+            attempt += 1
+            if stats is not None:
+                stats["retries"] += 1
+            self.metrics.inc("soragiri_api_retries_total", endpoint=endpoint, reason=str(status or "error"))
+
+            if status == 429:
+                # Everyone queued on this key's endpoint waits out the limit
+                # together, and new tasks try other keys meanwhile
+                paused = key.governor.pause(endpoint, delay)
+                self.keys.park(key, "throttled", delay)
+                if reroute and self.keys.has_alternative(key):
+                    raise KeyThrottled(key, delay)
+                if not paused:
+                    # No bucket to hold the retry back; wait here instead
+                    if stats is not None:
+                        stats["rate_wait"] += delay
+                    await asyncio.sleep(delay)
+            else:
+                if stats is not None:
+                    stats["rate_wait"] += delay
+                await asyncio.sleep(delay)
+
+    def _record_request(self, endpoint: str, status: Union[int, str], sent: float) -> None:
+        self.metrics.inc("soragiri_api_requests_total", endpoint=endpoint, status=str(status))
+        self.metrics.observe("soragiri_api_request_seconds", time.monotonic() - sent, endpoint=endpoint)
+
+    async def _download_video(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        output_path: Path,
+        max_bytes: Optional[int] = None
+    ) -> DownloadStats:
+        """Download video to specified path (parallel ranges and resume when supported)"""
+        return await self.downloader.fetch(session, url, output_path, max_bytes)
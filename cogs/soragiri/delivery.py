@@ -0,0 +1,106 @@
+"""
+SoraGiri (空斬り) - Delivery planning
+Decides how a finished cut reaches a chat with an upload limit: attached,
+re-encoded to fit, or as a link - before any bytes are downloaded.
+Zero Discord dependencies.
+"""
+
+import shutil
+import asyncio
+from enum import Enum
+from pathlib import Path
+from typing import Optional
+
+
+# Re-encoding more than this far below the source size looks too rough
+MAX_SHRINK_RATIO = 4.0
+# Container overhead and bitrate overshoot, kept free below the limit
+SIZE_HEADROOM = 0.92
+AUDIO_BITRATE = 96_000
+MIN_VIDEO_BITRATE = 150_000
+
+
+class Delivery(Enum):
+    """How a finished cut is handed over"""
+    ATTACH = "attach"        # small enough: stream it and attach it
+    REENCODE = "reencode"    # too large, but a local re-encode can fit it
+    LINK = "link"            # too large: reply with the hosted link only
+
+
+def reencode_available() -> bool:
+    """Whether ffmpeg and ffprobe are on PATH"""
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+def plan_delivery(size: Optional[int], limit: int, reencode: bool = False) -> Delivery:
+    """
+    Pick a delivery path for a result of `size` bytes under an upload limit.
+
+    Args:
+        size: Result size from a HEAD/range probe, None if unknown
+        limit: Upload limit of the destination in bytes
+        reencode: Whether local re-encoding is enabled and available
+
+    Returns:
+        ATTACH when the result fits (or its size is unknown; the download
+        is capped at the limit), REENCODE when it is at most
+        MAX_SHRINK_RATIO times too large and re-encoding is allowed, LINK
+        otherwise
+    """
+    if size is None or size <= limit:
+        return Delivery.ATTACH
+    if reencode and size <= limit * MAX_SHRINK_RATIO:
+        return Delivery.REENCODE
+    return Delivery.LINK
+
+
+async def reencode_to_fit(source: Path, target: Path, limit: int) -> bool:
+    """
+    Re-encode a video with ffmpeg at the bitrate that fits it under limit.
+
+    Args:
+        source: Video to shrink
+        target: Where the re-encoded video goes
+        limit: Largest acceptable size in bytes
+
+    Returns:
+        True if target was written and fits; False if the video can't be
+        shrunk that far at a watchable bitrate or ffmpeg failed
+    """
+    duration = await _duration(source)
+    if not duration:
+        return False
+
+    video_bitrate = int(limit * 8 * SIZE_HEADROOM / duration) - AUDIO_BITRATE
+    if video_bitrate < MIN_VIDEO_BITRATE:
+        return False
+
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-y", "-loglevel", "error", "-i", str(source),
+        "-c:v", "libx264", "-preset", "veryfast",
+        "-b:v", str(video_bitrate), "-maxrate", str(video_bitrate), "-bufsize", str(video_bitrate * 2),
+        "-c:a", "aac", "-b:a", str(AUDIO_BITRATE),
+        "-movflags", "+faststart", str(target),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        print(f"[SoraGiri] Re-encode failed: {stderr.decode(errors='replace').strip()[:200]}")
+        return False
+    return target.exists() and target.stat().st_size <= limit
+
+
+async def _duration(path: Path) -> Optional[float]:
+    """Length of a video in seconds, via ffprobe"""
+    process = await asyncio.create_subprocess_exec(
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", str(path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    stdout, _ = await process.communicate()
+    try:
+        return float(stdout.strip()) or None
+    except ValueError:
+        return None
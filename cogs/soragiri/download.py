@@ -0,0 +1,573 @@
+"""
+SoraGiri (空斬り) - Download engine
+Parallel ranged and resumable downloads to disk, plus spooled result
+files under a global memory budget, so concurrent downloads never hold
+whole videos in RAM.
+"""
+
+import io
+import os
+import json
+import time
+import asyncio
+import tempfile
+import aiohttp
+from pathlib import Path
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+
+class MemoryBudget:
+    """
+    Caps the bytes all in-flight downloads may hold in memory.
+
+    Reservations never block: a download that cannot reserve more memory
+    spills to disk instead, so the budget can't deadlock.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+
+    def try_reserve(self, size: int) -> bool:
+        """Reserve size bytes if they fit in the budget"""
+        if self.used + size > self.max_bytes:
+            return False
+        self.used += size
+        return True
+
+    def release(self, size: int) -> None:
+        self.used = max(0, self.used - size)
+
+
+class SpooledResult(io.RawIOBase):
+    """
+    A downloaded video, kept in memory while small and moved to a temp file
+    once it exceeds `threshold` bytes or the shared memory budget runs out.
+
+    Behaves as a readable, seekable binary file (so it can be handed to
+    discord.File or shutil.copyfileobj). Close it to free memory or disk.
+    """
+
+    def __init__(self, threshold: int, budget: Optional[MemoryBudget] = None):
+        super().__init__()
+        self.threshold = threshold
+        self.budget = budget
+        self.size = 0
+        self._reserved = 0
+        # max_size=0: never roll over on its own, we decide when to spill
+        self._file = tempfile.SpooledTemporaryFile(max_size=0)
+        self._on_disk = False
+
+    @property
+    def in_memory(self) -> bool:
+        return not self._on_disk
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def write(self, chunk: bytes) -> int:
+        if not self._on_disk:
+            fits = self.size + len(chunk) <= self.threshold
+            if not (fits and self._reserve(len(chunk))):
+                self.spill()
+
+        written = self._file.write(chunk)
+        self.size += written
+        return written
+
+    def spill(self) -> None:
+        """Move the buffered bytes to disk and return their memory to the budget"""
+        if not self._on_disk:
+            self._file.rollover()
+            self._on_disk = True
+            self._release()
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self._file.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._release()
+            self._file.close()
+        super().close()
+
+    def _reserve(self, size: int) -> bool:
+        if self.budget is None:
+            return True
+        if self.budget.try_reserve(size):
+            self._reserved += size
+            return True
+        return False
+
+    def _release(self) -> None:
+        if self.budget is not None and self._reserved:
+            self.budget.release(self._reserved)
+        self._reserved = 0
+
+
+class AsyncFileWriter:
+    """
+    Moves a download's file writes off the event loop.
+
+    The loop only hands buffers over: contiguous chunks are collected into
+    batches of about batch_size bytes (without copying them), and each full
+    batch is joined and written on the writer thread. At most max_pending
+    batches are queued; beyond that write() waits, which throttles the
+    download to the disk. close() flushes what is left and fsyncs once.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mode: str = "r+b",
+        batch_size: int = 4 * 1024 * 1024,
+        max_pending: int = 4,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        """
+        Args:
+            path: File to write
+            mode: open() mode ("wb", "ab" or "r+b" for positional writes)
+            batch_size: Bytes collected before a batch goes to the writer thread
+            max_pending: Batches allowed in the writer's queue at once
+            executor: Single-thread executor to write on (shared between
+                writers to keep the thread count down); a private one if omitted
+        """
+        self.path = Path(path)
+        self.mode = mode
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="soragiri-writer")
+        self._file = None
+        self._position = 0
+        # end offset -> (start offset, chunks, size) for each run of contiguous writes
+        self._batches: dict[int, tuple[int, list[bytes], int]] = {}
+        self._pending: deque[asyncio.Future] = deque()
+
+    async def open(self) -> "AsyncFileWriter":
+        self._file = await self._run(open, self.path, self.mode)
+        self._position = await self._run(self._file.tell)
+        return self
+
+    async def write(self, data: bytes, offset: Optional[int] = None) -> None:
+        """Queue data at offset (default: after the previous sequential write)"""
+        if offset is None:
+            offset = self._position
+        end = offset + len(data)
+        self._position = end
+
+        # Extend the batch this chunk continues, or start a new one
+        start, chunks, size = self._batches.pop(offset, (offset, [], 0))
+        chunks.append(data)
+        size += len(data)
+
+        if size >= self.batch_size:
+            await self._submit(start, chunks)
+        else:
+            self._batches[end] = (start, chunks, size)
+
+    async def close(self, fsync: bool = True) -> None:
+        """Write everything still buffered, fsync once and close the file"""
+        try:
+            batches, self._batches = self._batches, {}
+            for start, chunks, _ in batches.values():
+                await self._submit(start, chunks)
+            await self._drain(0)
+            if self._file is not None:
+                await self._run(self._flush, fsync)
+        finally:
+            try:
+                if self._file is not None:
+                    # Queued behind any writes still pending, so it closes
+                    # last; shielded so a cancelled caller still closes it
+                    closing = self._executor.submit(self._file.close)
+                    await asyncio.shield(asyncio.wrap_future(closing))
+            finally:
+                if self._own_executor:
+                    self._executor.shutdown(wait=False)
+
+    async def _submit(self, start: int, chunks: list[bytes]) -> None:
+        await self._drain(self.max_pending - 1)
+        self._pending.append(asyncio.get_running_loop().run_in_executor(
+            self._executor, self._write_at, start, chunks
+        ))
+
+    async def _drain(self, keep: int) -> None:
+        """Wait until at most `keep` batches are queued"""
+        while len(self._pending) > keep:
+            await self._pending.popleft()
+
+    def _write_at(self, start: int, chunks: list[bytes]) -> None:
+        # Runs on the writer thread: the join (copy) happens here, not on the
+        # loop, and only this thread touches the file, so seek+write is safe
+        self._file.seek(start)
+        self._file.write(chunks[0] if len(chunks) == 1 else b"".join(chunks))
+
+    def _flush(self, fsync: bool) -> None:
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+
+@dataclass
+class DownloadStats:
+    """What a download moved and how fast"""
+    bytes: int                 # final file size
+    fetched: int               # bytes transferred by this run (excludes resumed bytes)
+    seconds: float
+    parts: int = 1             # parallel ranges used (1 = single stream)
+    resumed: int = 0           # bytes reused from an interrupted earlier run
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second transferred by this run"""
+        return self.fetched / self.seconds if self.seconds > 0 else 0.0
+
+
+class _RangesUnsupported(Exception):
+    """Server ignored a Range request"""
+
+
+class ResultTooLarge(Exception):
+    """A download grew past the size its caller could use"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Result is larger than {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+async def probe_size(session: aiohttp.ClientSession, url: str) -> Optional[int]:
+    """
+    Size of the resource at url without downloading it: Content-Length
+    from a HEAD request, or the total of a one-byte range request's
+    Content-Range when HEAD doesn't say. None if neither tells.
+    """
+    try:
+        async with session.head(url, allow_redirects=True) as resp:
+            length = resp.headers.get("Content-Length")
+            if resp.status < 400 and length and length.isdigit():
+                return int(length)
+        async with session.get(url, headers={"Range": "bytes=0-0"}) as resp:
+            # "bytes 0-0/12345"; a 200 means ranges are ignored and the
+            # body is the whole file
+            total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+            if resp.status == 206 and total.isdigit():
+                return int(total)
+            length = resp.headers.get("Content-Length")
+            if resp.status == 200 and length and length.isdigit():
+                return int(length)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        pass
+    return None
+
+
+class RangedDownloader:
+    """
+    Downloads a URL to a file, in parallel byte ranges when the server
+    allows it.
+
+    Data lands in '<name>.part' and is renamed into place only after its
+    size matches Content-Length. Ranged downloads keep their progress in
+    '<name>.part.json', so an interrupted download resumes where each
+    range stopped; single-stream downloads resume from the end of the
+    .part file when the server accepts ranges. Dropped connections are
+    resumed in place a few times before the error is raised. Disk writes
+    go through AsyncFileWriters sharing one writer thread, never on the
+    event loop; call close() to stop that thread.
+    """
+
+    def __init__(
+        self,
+        parallelism: int = 4,
+        chunk_size: int = 1024 * 1024,
+        min_part_size: int = 1024 * 1024,
+        retries: int = 2,
+        batch_size: int = 4 * 1024 * 1024
+    ):
+        """
+        Args:
+            parallelism: Byte ranges fetched at once (1 disables splitting)
+            chunk_size: Read/write buffer size in bytes
+            min_part_size: Smallest range worth its own connection
+            retries: Times a dropped download is resumed before giving up
+            batch_size: Bytes merged into one write by the writer thread
+        """
+        self.parallelism = max(1, parallelism)
+        self.chunk_size = chunk_size
+        self.min_part_size = min_part_size
+        self.retries = retries
+        self.batch_size = batch_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def close(self) -> None:
+        """Stop the writer thread (it restarts on the next download)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _writer(self, path: Path, mode: str) -> AsyncFileWriter:
+        return AsyncFileWriter(path, mode, self.batch_size, executor=self._writer_thread())
+
+    def _writer_thread(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="soragiri-writer")
+        return self._executor
+
+    async def _on_writer(self, fn, *args):
+        """Run blocking file work (state, preallocation) on the writer thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._writer_thread(), fn, *args)
+
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        output_path: Path,
+        max_bytes: Optional[int] = None
+    ) -> DownloadStats:
+        """
+        Download url to output_path, returning transfer stats.
+
+        Raises:
+            ResultTooLarge: The file is (or grows) past max_bytes; nothing
+                is kept
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        part = output_path.with_name(output_path.name + ".part")
+        state_path = output_path.with_name(output_path.name + ".part.json")
+
+        started = time.monotonic()
+        fetched = 0
+        for attempt in range(self.retries + 1):
+            try:
+                size, done, parts, resumed = await self._fetch_once(session, url, part, state_path, max_bytes)
+                fetched += done
+                break
+            except ResultTooLarge:
+                part.unlink(missing_ok=True)
+                state_path.unlink(missing_ok=True)
+                raise
+            except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                # Dropped connection: the .part file keeps what arrived
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+        actual = part.stat().st_size
+        if size is not None and actual != size:
+            raise Exception(f"Download incomplete: {actual} of {size} bytes")
+
+        os.replace(part, output_path)
+        state_path.unlink(missing_ok=True)
+
+        return DownloadStats(
+            bytes=actual,
+            fetched=fetched,
+            seconds=time.monotonic() - started,
+            parts=parts,
+            resumed=resumed
+        )
+
+    async def _fetch_once(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        part: Path,
+        state_path: Path,
+        max_bytes: Optional[int] = None
+    ) -> tuple[Optional[int], int, int, int]:
+        """One download attempt into the .part file; returns (size, fetched, parts, resumed)"""
+        size, ranges, validator = await self._probe(session, url)
+        if max_bytes is not None and size is not None and size > max_bytes:
+            raise ResultTooLarge(max_bytes)
+
+        if ranges and size and self.parallelism > 1 and size >= 2 * self.min_part_size:
+            try:
+                fetched, resumed, parts = await self._fetch_ranged(
+                    session, url, part, state_path, size, validator
+                )
+                return size, fetched, parts, resumed
+            except _RangesUnsupported:
+                ranges = False
+
+        if state_path.exists():
+            # A preallocated ranged .part can't be resumed as one stream
+            part.unlink(missing_ok=True)
+            state_path.unlink()
+
+        fetched, resumed, size = await self._fetch_stream(session, url, part, size, ranges, max_bytes)
+        return size, fetched, 1, resumed
+
+    async def _probe(self, session: aiohttp.ClientSession, url: str) -> tuple[Optional[int], bool, Optional[str]]:
+        """HEAD the URL for (Content-Length, range support, resume validator)"""
+        try:
+            async with session.head(url, allow_redirects=True) as resp:
+                if resp.status >= 400:
+                    return None, False, None
+                length = resp.headers.get("Content-Length")
+                ranges = resp.headers.get("Accept-Ranges", "").lower() == "bytes"
+                etag = resp.headers.get("ETag")
+                # Weak ETags can't guard byte ranges
+                validator = etag if etag and not etag.startswith("W/") else resp.headers.get("Last-Modified")
+                return (int(length) if length and length.isdigit() else None), ranges, validator
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None, False, None
+
+    async def _fetch_ranged(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        part: Path,
+        state_path: Path,
+        size: int,
+        validator: Optional[str]
+    ) -> tuple[int, int, int]:
+        """Fetch in parallel ranges into a preallocated .part file; returns (fetched, resumed, parts)"""
+        state = await self._on_writer(self._load_state, state_path, part, size, validator)
+        if state is None:
+            count = min(self.parallelism, max(1, size // self.min_part_size))
+            step = -(-size // count)
+            state = {
+                "size": size,
+                "validator": validator,
+                # [start, next byte to fetch, end (exclusive)]
+                "ranges": [[start, start, min(size, start + step)] for start in range(0, size, step)]
+            }
+            await self._on_writer(self._preallocate, part, size)
+            await self._on_writer(self._save_state, state_path, state)
+
+        resumed = sum(pos - start for start, pos, _ in state["ranges"])
+
+        async def fetch_range(span: list) -> int:
+            start, pos, end = span
+            if pos >= end:
+                return 0
+
+            headers = {"Range": f"bytes={pos}-{end - 1}"}
+            if validator:
+                headers["If-Range"] = validator
+
+            fetched = 0
+            async with session.get(url, headers=headers) as resp:
+                if resp.status >= 400:
+                    raise Exception(f"Download failed: HTTP {resp.status}")
+                if resp.status != 206:
+                    raise _RangesUnsupported()
+
+                async for chunk in resp.content.iter_chunked(self.chunk_size):
+                    chunk = chunk[:end - span[1]]
+                    await writer.write(chunk, offset=span[1])
+                    span[1] += len(chunk)
+                    fetched += len(chunk)
+            return fetched
+
+        writer = await self._writer(part, "r+b").open()
+        tasks = [asyncio.create_task(fetch_range(span)) for span in state["ranges"]]
+        try:
+            fetched = sum(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            # Whatever was handed to the writer is on disk before progress is saved
+            await writer.close()
+            # Shielded so a cancelled download still records its progress
+            await asyncio.shield(self._on_writer(self._save_state, state_path, state))
+
+        return fetched, resumed, len(state["ranges"])
+
+    async def _fetch_stream(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        part: Path,
+        size: Optional[int],
+        ranges: bool,
+        max_bytes: Optional[int] = None
+    ) -> tuple[int, int, Optional[int]]:
+        """Single-stream fetch with a large buffer; returns (fetched, resumed, size)"""
+        offset = part.stat().st_size if part.exists() else 0
+        if not ranges or (size is not None and offset > size):
+            offset = 0
+
+        if size is not None and offset == size:
+            return 0, offset, size
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        fetched = 0
+        async with session.get(url, headers=headers) as resp:
+            if resp.status == 206:
+                mode = "ab"
+            elif resp.status == 200:
+                # Server sent the whole file; start over
+                mode, offset = "wb", 0
+            else:
+                raise Exception(f"Download failed: HTTP {resp.status}")
+
+            if size is None and resp.content_length is not None:
+                size = offset + resp.content_length
+            if max_bytes is not None and size is not None and size > max_bytes:
+                raise ResultTooLarge(max_bytes)
+
+            writer = await self._writer(part, mode).open()
+            try:
+                async for chunk in resp.content.iter_chunked(self.chunk_size):
+                    if max_bytes is not None and offset + fetched + len(chunk) > max_bytes:
+                        raise ResultTooLarge(max_bytes)
+                    await writer.write(chunk)
+                    fetched += len(chunk)
+            finally:
+                await writer.close()
+
+        return fetched, offset, size
+
+    @staticmethod
+    def _preallocate(part: Path, size: int) -> None:
+        with open(part, "wb") as f:
+            f.truncate(size)
+
+    @staticmethod
+    def _load_state(state_path: Path, part: Path, size: int, validator: Optional[str]) -> Optional[dict]:
+        """Resume state from an earlier run, if it still matches the remote file"""
+        try:
+            state = json.loads(state_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if state.get("size") != size or state.get("validator") != validator:
+            return None
+        if not part.exists() or part.stat().st_size != size:
+            return None
+        return state
+
+    @staticmethod
+    def _save_state(state_path: Path, state: dict) -> None:
+        tmp = state_path.with_name(state_path.name + ".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, state_path)
@@ -0,0 +1,144 @@
+"""
+SoraGiri (空斬り) - Progress events
+Non-blocking fan-out of progress events to subscribers, so a slow
+callback never holds up polling or downloads.
+"""
+
+import asyncio
+import inspect
+from collections import deque
+from dataclasses import replace
+from typing import Optional, Callable, Union, Iterable, Awaitable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core import ProgressEvent
+
+EventCallback = Callable[["ProgressEvent"], Union[None, Awaitable[None]]]
+
+# Delivery tasks still draining after their feed was closed
+_draining: set[asyncio.Task] = set()
+
+
+def positional_arity(callback: Callable) -> Optional[int]:
+    """Number of required positional parameters of callback, if it can be inspected"""
+    try:
+        parameters = inspect.signature(callback).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    return sum(
+        1 for p in parameters
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) and p.default is p.empty
+    )
+
+
+def as_event_callback(callback: Callable) -> EventCallback:
+    """
+    Accept both callback styles: new ones take a ProgressEvent, legacy ones
+    take (state, message).
+    """
+    if positional_arity(callback) == 1:
+        return callback
+    return lambda event: callback(event.state, event.message)
+
+
+class ProgressChannel:
+    """
+    Bounded latest-value channel in front of one subscriber.
+
+    put() never blocks. Consecutive events in the same state replace each
+    other (latest value wins), while state changes are kept, up to
+    `capacity` events; beyond that the oldest are dropped. A dedicated
+    task delivers events in order, so a slow subscriber only ever falls
+    behind itself.
+    """
+
+    def __init__(self, callback: EventCallback, capacity: int = 8):
+        self.callback = callback
+        self._events: deque["ProgressEvent"] = deque(maxlen=max(1, capacity))
+        self._ready = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def put(self, event: "ProgressEvent") -> None:
+        if self._closing:
+            return
+        if self._events and self._events[-1].state == event.state:
+            self._events[-1] = event
+        else:
+            self._events.append(event)
+        self._ready.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def close(self) -> Optional[asyncio.Task]:
+        """Stop taking events; returns the delivery task, which ends once drained"""
+        self._closing = True
+        self._ready.set()
+        return self._task
+
+    async def _run(self) -> None:
+        while True:
+            if not self._events:
+                if self._closing:
+                    return
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            event = self._events.popleft()
+            try:
+                result = self.callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                # One broken subscriber must never fail the slice
+                print(f"[SoraGiri] WARNING: progress callback failed: {e}")
+
+
+class ProgressFeed:
+    """
+    One caller's progress subscribers.
+
+    publish() hands an event to every subscriber's channel and returns
+    immediately. close() gives the channels a short grace period to
+    drain; slower subscribers finish in the background.
+    """
+
+    def __init__(
+        self,
+        callbacks: Union[None, Callable, Iterable[Callable]] = None,
+        video_url: Optional[str] = None
+    ):
+        """
+        Args:
+            callbacks: One callback or several; each takes a ProgressEvent
+                or, legacy style, (state, message)
+            video_url: URL stamped on every event (callers coalesced onto one
+                task may have asked with different URLs)
+        """
+        if callbacks is None:
+            callbacks = []
+        elif callable(callbacks):
+            callbacks = [callbacks]
+        self.video_url = video_url
+        self.channels = [ProgressChannel(as_event_callback(cb)) for cb in callbacks]
+
+    def __bool__(self) -> bool:
+        return bool(self.channels)
+
+    def publish(self, event: "ProgressEvent") -> None:
+        if self.video_url and event.video_url != self.video_url:
+            event = replace(event, video_url=self.video_url)
+        for channel in self.channels:
+            channel.put(event)
+
+    async def close(self, grace: float = 1.0) -> None:
+        """Stop publishing and wait up to grace seconds for delivery to finish"""
+        tasks = [channel.close() for channel in self.channels]
+        tasks = {task for task in tasks if task is not None and not task.done()}
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=grace)
+        for task in pending:
+            _draining.add(task)
+            task.add_done_callback(_draining.discard)
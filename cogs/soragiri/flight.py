@@ -0,0 +1,102 @@
+"""
+SoraGiri (空斬り) - Single-flight registry
+Coalesces concurrent slices of the same video into one upstream task.
+"""
+
+import asyncio
+from typing import Optional, Callable, Awaitable, TypeVar, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core import ProgressEvent
+
+T = TypeVar("T")
+
+# Subscribers must not block: they only hand the event on (see events.ProgressFeed)
+Publisher = Callable[["ProgressEvent"], None]
+Emitter = Publisher
+
+
+class Flight:
+    """One in-progress slice, shared by every caller that asked for it"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers: list[Publisher] = []
+        self.waiters = 0
+        self.last: Optional["ProgressEvent"] = None
+
+    def emit(self, event: "ProgressEvent") -> None:
+        """Fan a progress event out to every attached caller"""
+        self.last = event
+        for publish in list(self.subscribers):
+            publish(event)
+
+    def detach(self, callback: Optional[Publisher]) -> None:
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+
+class SingleFlight:
+    """
+    In-flight registry keyed on a normalized video URL.
+
+    The first caller for a key starts the work; later callers attach to it
+    and receive its progress and result. The work is only cancelled when
+    every attached caller has gone away.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    async def run(
+        self,
+        key: str,
+        work: Callable[[Emitter], Awaitable[T]],
+        on_progress: Optional[Publisher] = None
+    ) -> T:
+        """
+        Run work for key, or attach to the run already in flight.
+
+        Args:
+            key: Coalescing key (normalized video URL)
+            work: Coroutine factory receiving the flight's emit function
+            on_progress: This caller's progress publisher (must not block)
+
+        Returns:
+            The shared result of work (callers should copy before mutating)
+        """
+        flight = self._flights.get(key)
+        joined = flight is not None
+
+        if flight is None:
+            flight = Flight(key)
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(work(flight.emit))
+            flight.task.add_done_callback(lambda _: self._forget(flight))
+
+        flight.waiters += 1
+        if on_progress:
+            flight.subscribers.append(on_progress)
+            # Late joiners start from the flight's current state
+            if joined and flight.last:
+                on_progress(flight.last)
+
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            flight.detach(on_progress)
+            # Last caller gone (cancelled) - nobody wants the result anymore
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _forget(self, flight: Flight) -> None:
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
@@ -0,0 +1,96 @@
+"""
+SoraGiri (空斬り) - Hedged resubmission
+Decides when a task stuck in Kie.ai's queue gets a second task for the
+same video, and keeps the extra spend under a fixed share of all tasks.
+"""
+
+from collections import deque
+from typing import Optional
+
+
+class HedgePolicy:
+    """
+    Hedge tasks that sit in the queue longer than usual.
+
+    A task still waiting after the `percentile` of recent queue times
+    (but at least min_delay seconds) gets one hedge: a second task for the
+    same video, raced against the first. Hedging starts once min_samples
+    queue times are known, and is skipped while hedges already make up
+    max_ratio of the last `window` tasks, which caps the extra credits.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_ratio: float = 0.05,
+        min_delay: float = 10.0,
+        window: int = 200,
+        min_samples: int = 20
+    ):
+        """
+        Args:
+            percentile: Queue-time percentile (0..1) after which a task is hedged
+            max_ratio: Most hedges per task over the recent window (0.05 = 5%)
+            min_delay: Never hedge a task queued for less than this (seconds)
+            window: Recent tasks (and queue times) the policy looks at
+            min_samples: Queue times needed before hedging starts
+        """
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._queue_times: deque[float] = deque(maxlen=window)
+        # Recent tasks in order: False for a primary task, True for a hedge
+        self._recent: deque[bool] = deque(maxlen=window)
+
+        self.tasks = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        """Hedges per task since the engine started"""
+        return self.hedges / self.tasks if self.tasks else 0.0
+
+    def record_queue(self, seconds: float) -> None:
+        """Learn from a finished task's time in the queue"""
+        if seconds >= 0:
+            self._queue_times.append(seconds)
+
+    def delay(self) -> Optional[float]:
+        """Seconds a task may wait in the queue before it is hedged (None: don't hedge yet)"""
+        if len(self._queue_times) < self.min_samples:
+            return None
+        ordered = sorted(self._queue_times)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+    def task_started(self) -> None:
+        """Count a primary task, for the hedge budget"""
+        self.tasks += 1
+        self._recent.append(False)
+
+    def allow(self) -> bool:
+        """Whether one more hedge fits the budget"""
+        hedges = sum(self._recent)
+        tasks = len(self._recent) - hedges
+        return tasks > 0 and (hedges + 1) / tasks <= self.max_ratio
+
+    def hedged(self) -> None:
+        """Count a hedge sent for the most recent tasks"""
+        self.hedges += 1
+        self._recent.append(True)
+
+    def won(self) -> None:
+        """A hedge finished before the task it was racing"""
+        self.hedge_wins += 1
+
+    def stats(self) -> dict:
+        """Counters for reporting: tasks, hedges, hedge_wins, hedge_rate and the current delay"""
+        return {
+            "tasks": self.tasks,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": self.hedge_rate,
+            "delay": self.delay()
+        }
@@ -0,0 +1,309 @@
+"""
+SoraGiri (空斬り) - Job queue
+A bounded queue served by a fixed pool of workers, with admission
+control, so traffic spikes wait in line instead of piling up unbounded
+slices. Zero Discord dependencies.
+"""
+
+import math
+import time
+import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Optional, Callable, Awaitable, Hashable, Union
+
+from .metrics import MetricsSink
+from .scheduler import FairScheduler, Priority, tenant_path
+
+
+WorkFn = Callable[[], Awaitable[None]]
+PositionFn = Callable[[int, Optional[float]], Awaitable[None]]
+
+
+class QueueFull(Exception):
+    """The queue cannot take another job right now"""
+
+
+class UserLimitReached(QueueFull):
+    """The submitting user already has their maximum number of jobs"""
+
+
+@dataclass(eq=False)
+class QueuedJob:
+    """A job waiting for (or running on) a worker"""
+    owner: Hashable
+    work: WorkFn
+    on_position: Optional[PositionFn] = None
+    tenant: Union[Hashable, tuple] = None
+    priority: Priority = Priority.INTERACTIVE
+    group: Optional[Hashable] = None
+    enqueued: float = field(default_factory=time.monotonic)
+    started: Optional[float] = None
+    done: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+    @property
+    def wait_time(self) -> float:
+        """Seconds spent in the queue"""
+        return (self.started or time.monotonic()) - self.enqueued
+
+
+class JobQueue:
+    """
+    Bounded queue of jobs run by `workers` concurrent workers.
+
+    submit() rejects a job with QueueFull when max_queue jobs are already
+    waiting, or with UserLimitReached when its owner has per_user jobs
+    (or job groups) waiting or running. Free workers take jobs in the scheduler's order:
+    by priority tier, then fairly across tenants (see FairScheduler).
+    Waiting jobs are told their position and an ETA whenever the line
+    moves. Queue waits are kept per tenant, for wait_percentiles().
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queue: int = 50,
+        per_user: int = 3,
+        window: int = 50,
+        metrics: Optional[MetricsSink] = None,
+        scheduler: Optional[FairScheduler] = None,
+        max_tenants: int = 500
+    ):
+        """
+        Args:
+            workers: Jobs run at once
+            max_queue: Jobs allowed to wait for a worker (0 = unlimited)
+            per_user: Jobs one owner may have waiting or running (0 = unlimited)
+            window: Recent job durations used for ETAs, and queue waits
+                kept per tenant
+            metrics: Where queue depth and wait times are reported
+            scheduler: Order in which waiting jobs start (default: a
+                FairScheduler with equal weights)
+            max_tenants: Tenants whose queue waits are tracked (least
+                recently active ones are forgotten first)
+        """
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.per_user = per_user
+        self.scheduler = scheduler or FairScheduler()
+        self.window = window
+        self.max_tenants = max_tenants
+        self._tenant_waits: OrderedDict[Hashable, deque[float]] = OrderedDict()
+        self._running: set[QueuedJob] = set()
+        self._owners: dict[Hashable, int] = {}
+        # (owner, group) -> jobs of that group still in flight
+        self._groups: dict[tuple, int] = {}
+        self._durations: deque[float] = deque(maxlen=window)
+        self._ready = asyncio.Event()
+        self._workers: list[asyncio.Task] = []
+        self._notices: set[asyncio.Task] = set()
+        self.metrics = metrics or MetricsSink()
+
+    @property
+    def waiting(self) -> int:
+        return len(self.scheduler)
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def admit(self, owner: Hashable) -> None:
+        """Raise QueueFull or UserLimitReached if owner can't submit a job now"""
+        if self.per_user and self._owners.get(owner, 0) >= self.per_user:
+            self.metrics.inc("soragiri_jobs_rejected_total", reason="user_limit")
+            raise UserLimitReached(
+                f"You already have {self.per_user} cut(s) in progress. Let the blade finish first."
+            )
+        self._admit_queue()
+
+    def _admit_queue(self) -> None:
+        """Raise QueueFull if no more jobs may wait"""
+        if self.max_queue and self.waiting >= self.max_queue:
+            self.metrics.inc("soragiri_jobs_rejected_total", reason="queue_full")
+            raise QueueFull(
+                f"The dojo is full ({self.waiting} cuts waiting). Try again in a moment."
+            )
+
+    def submit(
+        self,
+        owner: Hashable,
+        work: WorkFn,
+        on_position: Optional[PositionFn] = None,
+        tenant: Union[Hashable, tuple] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        group: Optional[Hashable] = None
+    ) -> QueuedJob:
+        """
+        Queue a job.
+
+        Args:
+            owner: Who the job belongs to (for per-user limits)
+            work: Coroutine function run by a worker
+            on_position: Optional coroutine called with (position, eta
+                seconds or None) while the job waits; position 1 is next
+            tenant: Who the job is scheduled for, e.g. (guild_id, user_id)
+                (default: owner)
+            priority: Scheduling tier; INTERACTIVE jobs go before BATCH ones
+            group: Jobs of one owner with the same group (e.g. the links of
+                one mention) count once against per_user; only the first
+                one is checked against it
+
+        Returns:
+            The queued job; await job.done to wait for it
+
+        Raises:
+            QueueFull: Too many jobs are waiting
+            UserLimitReached: owner has too many jobs in flight
+        """
+        key = (owner, group)
+        if group is not None and key in self._groups:
+            # The group already holds one of the owner's slots
+            self._admit_queue()
+            self._groups[key] += 1
+        else:
+            self.admit(owner)
+            self._owners[owner] = self._owners.get(owner, 0) + 1
+            if group is not None:
+                self._groups[key] = 1
+        job = QueuedJob(owner, work, on_position, owner if tenant is None else tenant, priority, group)
+        self.scheduler.push(job)
+        self._report_depth()
+        self._ensure_workers()
+        self._ready.set()
+        if self.running >= self.workers:
+            self._notify(job, self.position(job))
+        return job
+
+    def position(self, job: QueuedJob) -> Optional[int]:
+        """1-based place in line (as things stand), or None once the job has started"""
+        try:
+            return self.scheduler.order().index(job) + 1
+        except ValueError:
+            return None
+
+    def wait_percentiles(self, quantiles: tuple[float, ...] = (0.5, 0.95, 0.99)) -> dict[Hashable, dict]:
+        """
+        Recent queue waits per top-level tenant (e.g. per guild), to check
+        fairness under load.
+
+        Returns:
+            {tenant: {"jobs": n, "p50": seconds, "p95": ..., "p99": ...}}
+        """
+        report = {}
+        for tenant, waits in self._tenant_waits.items():
+            ordered = sorted(waits)
+            report[tenant] = {"jobs": len(ordered)}
+            for q in quantiles:
+                report[tenant][f"p{q * 100:g}"] = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return report
+
+    def eta(self, position: int) -> Optional[float]:
+        """Expected seconds until the job at `position` starts, once durations are known"""
+        if not self._durations:
+            return None
+        average = sum(self._durations) / len(self._durations)
+        return math.ceil(position / self.workers) * average
+
+    async def close(self) -> None:
+        """Stop the workers; waiting jobs are cancelled"""
+        for task in self._workers + list(self._notices):
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        for job in self.scheduler:
+            if not job.done.done():
+                job.done.cancel()
+        self.scheduler.clear()
+
+    def _ensure_workers(self) -> None:
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            while not self.scheduler:
+                self._ready.clear()
+                await self._ready.wait()
+
+            job = self.scheduler.pop()
+            job.started = time.monotonic()
+            self._running.add(job)
+            self._report_depth()
+            self._record_wait(job)
+            for position, waiting in enumerate(self.scheduler.order(), start=1):
+                self._notify(waiting, position)
+
+            try:
+                await job.work()
+                if not job.done.done():
+                    job.done.set_result(None)
+            except asyncio.CancelledError:
+                job.done.cancel()
+                raise
+            except Exception as e:
+                print(f"[SoraGiri] Queued job failed: {e}")
+                if not job.done.done():
+                    job.done.set_exception(e)
+                    # Nobody may be awaiting it; don't warn about it
+                    job.done.exception()
+            finally:
+                self._running.discard(job)
+                self._report_depth()
+                self._durations.append(time.monotonic() - job.started)
+                self.metrics.observe("soragiri_job_run_seconds", self._durations[-1])
+                self._release(job)
+
+    def _release(self, job: QueuedJob) -> None:
+        """Give back the owner's slot, once the last job of its group is done"""
+        if job.group is not None:
+            key = (job.owner, job.group)
+            left = self._groups.get(key, 1) - 1
+            if left:
+                self._groups[key] = left
+                return
+            self._groups.pop(key, None)
+        remaining = self._owners.get(job.owner, 1) - 1
+        if remaining:
+            self._owners[job.owner] = remaining
+        else:
+            self._owners.pop(job.owner, None)
+
+    def _record_wait(self, job: QueuedJob) -> None:
+        """Report a started job's queue wait, overall and for its tenant"""
+        tier = job.priority.name.lower()
+        self.metrics.observe("soragiri_job_queue_wait_seconds", job.wait_time, tier=tier)
+
+        tenant = tenant_path(job.tenant)[0]
+        waits = self._tenant_waits.pop(tenant, None) or deque(maxlen=self.window)
+        waits.append(job.wait_time)
+        self._tenant_waits[tenant] = waits
+        while len(self._tenant_waits) > self.max_tenants:
+            self._tenant_waits.popitem(last=False)
+
+        ordered = sorted(waits)
+        for q in (0.5, 0.95, 0.99):
+            self.metrics.set(
+                "soragiri_tenant_queue_wait_seconds",
+                ordered[min(len(ordered) - 1, int(q * len(ordered)))],
+                tenant=str(tenant), quantile=f"{q:g}"
+            )
+
+    def _report_depth(self) -> None:
+        self.metrics.set("soragiri_jobs_waiting", self.waiting)
+        self.metrics.set("soragiri_jobs_running", self.running)
+
+    def _notify(self, job: QueuedJob, position: int) -> None:
+        """Tell a waiting job its place in line (without blocking the worker)"""
+        if job.on_position is None:
+            return
+
+        async def notify():
+            try:
+                await job.on_position(position, self.eta(position))
+            except Exception:
+                pass
+
+        task = asyncio.create_task(notify())
+        self._notices.add(task)
+        task.add_done_callback(self._notices.discard)
@@ -0,0 +1,268 @@
+"""
+SoraGiri (空斬り) - Job journal
+Write-ahead record of every slice job, so tasks already paid for on Kie.ai
+survive a restart and their results still reach whoever asked.
+"""
+
+import json
+import time
+import uuid
+import sqlite3
+from pathlib import Path
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Union
+
+
+class JobState(Enum):
+    """Lifecycle of a journaled job"""
+    PENDING = "pending"          # accepted, no Kie.ai task yet
+    SUBMITTED = "submitted"      # task created, waiting for the result
+    SUCCEEDED = "succeeded"      # result URL known, not yet delivered
+    FAILED = "failed"            # task failed or timed out, not yet reported
+    DELIVERED = "delivered"      # result (or error) handed to the destination
+
+
+# Jobs that still need Kie.ai work
+ACTIVE_STATES = (JobState.PENDING, JobState.SUBMITTED)
+
+
+@dataclass
+class JobRecord:
+    """One journaled slice job"""
+    job_id: str
+    video_url: str
+    key: str
+    state: JobState
+    task_id: Optional[str] = None
+    output_url: Optional[str] = None
+    error: Optional[str] = None
+    cost_time_ms: Optional[int] = None
+    destination: Optional[dict] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    api_key_id: Optional[str] = None    # fingerprint of the key that created the task
+
+
+class JobJournal:
+    """
+    Durable log of slice jobs in a SQLite file (WAL mode).
+
+    Each job records its video URL, Kie.ai task ID (and a fingerprint of
+    the API key that created it), current state, an
+    optional destination (any JSON-serialisable dict, e.g. the Discord
+    channel and message to reply to) and a history of state transitions
+    with timestamps. After a restart, jobs left PENDING or SUBMITTED are
+    resumed and finished-but-undelivered jobs are delivered again.
+    """
+
+    _COLUMNS = (
+        "job_id, video_url, key, state, task_id, output_url, error, "
+        "cost_time_ms, destination, created_at, updated_at, api_key_id"
+    )
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: SQLite file holding the journal
+        """
+        self.path = Path(path)
+        self._db: Optional[sqlite3.Connection] = None
+
+    def create(self, video_url: str, key: str, destination: Optional[dict] = None) -> JobRecord:
+        """
+        Journal a new job.
+
+        If another active job for the same video already has a Kie.ai task
+        (a coalesced request), the new job inherits its task ID.
+        """
+        db = self._connect()
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        row = db.execute(
+            "SELECT task_id, api_key_id FROM jobs WHERE key = ? AND state = ? AND task_id IS NOT NULL LIMIT 1",
+            (key, JobState.SUBMITTED.value)
+        ).fetchone()
+        task_id, api_key_id = row if row else (None, None)
+        state = JobState.SUBMITTED if task_id else JobState.PENDING
+
+        with db:
+            db.execute(
+                f"INSERT INTO jobs ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?, NULL, NULL, NULL, ?, ?, ?, ?)",
+                (job_id, video_url, key, state.value, task_id,
+                 json.dumps(destination) if destination is not None else None, now, now, api_key_id)
+            )
+            self._log(db, job_id, state, now)
+
+        return JobRecord(
+            job_id=job_id,
+            video_url=video_url,
+            key=key,
+            state=state,
+            task_id=task_id,
+            destination=destination,
+            created_at=now,
+            updated_at=now,
+            api_key_id=api_key_id
+        )
+
+    def attach_task(self, key: str, task_id: str, api_key_id: Optional[str] = None) -> None:
+        """Record a freshly created Kie.ai task (and the key it runs on) on every pending job for the video"""
+        db = self._connect()
+        now = time.time()
+        with db:
+            jobs = [row[0] for row in db.execute(
+                "SELECT job_id FROM jobs WHERE key = ? AND state = ?",
+                (key, JobState.PENDING.value)
+            )]
+            for job_id in jobs:
+                db.execute(
+                    "UPDATE jobs SET task_id = ?, api_key_id = ?, state = ?, updated_at = ? WHERE job_id = ?",
+                    (task_id, api_key_id, JobState.SUBMITTED.value, now, job_id)
+                )
+                self._log(db, job_id, JobState.SUBMITTED, now, task_id)
+
+    def finish(
+        self,
+        job_id: str,
+        output_url: Optional[str] = None,
+        error: Optional[str] = None,
+        cost_time_ms: Optional[int] = None
+    ) -> None:
+        """Record a job's outcome (SUCCEEDED with a URL, FAILED otherwise)"""
+        state = JobState.SUCCEEDED if output_url else JobState.FAILED
+        db = self._connect()
+        now = time.time()
+        with db:
+            db.execute(
+                "UPDATE jobs SET state = ?, output_url = ?, error = ?, cost_time_ms = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (state.value, output_url, error, cost_time_ms, now, job_id)
+            )
+            self._log(db, job_id, state, now, error)
+
+    def mark_delivered(self, job_id: str) -> None:
+        """Record that a job's result reached its destination"""
+        db = self._connect()
+        now = time.time()
+        with db:
+            db.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE job_id = ?",
+                (JobState.DELIVERED.value, now, job_id)
+            )
+            self._log(db, job_id, JobState.DELIVERED, now)
+
+    def discard(self, job_id: str) -> None:
+        """Forget a job (e.g. it was superseded by a retry)"""
+        db = self._connect()
+        with db:
+            db.execute("DELETE FROM transitions WHERE job_id = ?", (job_id,))
+            db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        row = self._connect().execute(
+            f"SELECT {self._COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return self._record(row) if row else None
+
+    def unfinished(self) -> list[JobRecord]:
+        """Jobs a restart interrupted: still PENDING or SUBMITTED"""
+        return self._select(
+            "state IN (?, ?)", [s.value for s in ACTIVE_STATES]
+        )
+
+    def undelivered(self) -> list[JobRecord]:
+        """Finished jobs with a destination that never got their result"""
+        return self._select(
+            "state IN (?, ?) AND destination IS NOT NULL",
+            [JobState.SUCCEEDED.value, JobState.FAILED.value]
+        )
+
+    def history(self, job_id: str) -> list[tuple[JobState, float, Optional[str]]]:
+        """State transitions of a job as (state, timestamp, detail), oldest first"""
+        rows = self._connect().execute(
+            "SELECT state, at, detail FROM transitions WHERE job_id = ? ORDER BY id", (job_id,)
+        ).fetchall()
+        return [(JobState(state), at, detail) for state, at, detail in rows]
+
+    def prune(self, max_age: float = 7 * 24 * 60 * 60) -> int:
+        """
+        Delete closed jobs older than max_age seconds.
+
+        Returns:
+            Number of jobs removed
+        """
+        db = self._connect()
+        cutoff = time.time() - max_age
+        closed = "(state = ? OR (state IN (?, ?) AND destination IS NULL)) AND updated_at < ?"
+        params = (JobState.DELIVERED.value, JobState.SUCCEEDED.value, JobState.FAILED.value, cutoff)
+        with db:
+            db.execute(f"DELETE FROM transitions WHERE job_id IN (SELECT job_id FROM jobs WHERE {closed})", params)
+            return db.execute(f"DELETE FROM jobs WHERE {closed}", params).rowcount
+
+    def close(self) -> None:
+        """Close the SQLite file (it reopens on next use)"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _select(self, where: str, params: list) -> list[JobRecord]:
+        rows = self._connect().execute(
+            f"SELECT {self._COLUMNS} FROM jobs WHERE {where} ORDER BY created_at", params
+        ).fetchall()
+        return [self._record(row) for row in rows]
+
+    @staticmethod
+    def _record(row: tuple) -> JobRecord:
+        (job_id, video_url, key, state, task_id, output_url, error,
+         cost_time_ms, destination, created_at, updated_at, api_key_id) = row
+        return JobRecord(
+            job_id=job_id,
+            video_url=video_url,
+            key=key,
+            state=JobState(state),
+            task_id=task_id,
+            output_url=output_url,
+            error=error,
+            cost_time_ms=cost_time_ms,
+            destination=json.loads(destination) if destination else None,
+            created_at=created_at,
+            updated_at=updated_at,
+            api_key_id=api_key_id
+        )
+
+    @staticmethod
+    def _log(db: sqlite3.Connection, job_id: str, state: JobState, at: float, detail: Optional[str] = None) -> None:
+        db.execute(
+            "INSERT INTO transitions (job_id, state, at, detail) VALUES (?, ?, ?, ?)",
+            (job_id, state.value, at, detail)
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            # WAL: a commit is one sequential append, and readers never block
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    "job_id TEXT PRIMARY KEY, video_url TEXT NOT NULL, key TEXT NOT NULL, "
+                    "state TEXT NOT NULL, task_id TEXT, output_url TEXT, error TEXT, "
+                    "cost_time_ms INTEGER, destination TEXT, "
+                    "created_at REAL NOT NULL, updated_at REAL NOT NULL, api_key_id TEXT)"
+                )
+                # Journals written before key pools lack the column
+                columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+                if "api_key_id" not in columns:
+                    self._db.execute("ALTER TABLE jobs ADD COLUMN api_key_id TEXT")
+                self._db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)")
+                self._db.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key)")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS transitions ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, "
+                    "state TEXT NOT NULL, at REAL NOT NULL, detail TEXT)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS transitions_job ON transitions (job_id)")
+        return self._db
@@ -0,0 +1,250 @@
+"""
+SoraGiri (空斬り) - API key pool
+Spreads Kie.ai tasks over several API keys, each with its own rate limits
+and task slots, and steers new tasks away from keys that are throttled or
+out of credits.
+"""
+
+import re
+import time
+import asyncio
+import hashlib
+from collections import deque
+from typing import Optional, Callable, Iterable, Union
+
+from .ratelimit import RateGovernor
+from .metrics import MetricsSink
+
+
+# Response codes that take a key out of rotation for new tasks
+CREDIT_CODES = (402,)        # insufficient credits
+AUTH_CODES = (401, 403)      # key revoked or invalid
+
+
+def split_keys(value: str) -> list[str]:
+    """Keys from a comma- or whitespace-separated string (e.g. KIE_API_KEY)"""
+    return [key for key in re.split(r"[\s,]+", value) if key]
+
+
+def key_id(token: str) -> str:
+    """Short, stable fingerprint of a key, safe for logs, metrics and the journal"""
+    return hashlib.sha256(token.encode()).hexdigest()[:10]
+
+
+class KeyThrottled(Exception):
+    """A key hit its rate limit and the request should move to another key"""
+
+    def __init__(self, key: "ApiKey", retry_after: float):
+        super().__init__(f"Key {key.id} throttled for {retry_after:.1f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class ApiKey:
+    """One Kie.ai key: its own rate governor, task slots and health"""
+
+    def __init__(self, token: str, governor: RateGovernor, max_tasks: int = 0):
+        """
+        Args:
+            token: The API key
+            governor: Rate limits and retry policy for calls made with it
+            max_tasks: Tasks it may have running at once (0 = unlimited)
+        """
+        self.token = token
+        self.id = key_id(token)
+        self.governor = governor
+        self.max_tasks = max_tasks
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}"
+        }
+        self.tasks = 0
+        self.parked_until = 0.0
+        self.park_reason: Optional[str] = None
+        self.strikes = 0
+        self.last_used = 0.0
+
+    def __repr__(self) -> str:
+        return f"ApiKey({self.id}, tasks={self.tasks}/{self.max_tasks or '∞'}, parked={self.parked})"
+
+    @property
+    def parked(self) -> bool:
+        return time.monotonic() < self.parked_until
+
+    @property
+    def has_slot(self) -> bool:
+        return not self.max_tasks or self.tasks < self.max_tasks
+
+    @property
+    def load(self) -> float:
+        """Share of its task slots in use (running tasks if unlimited)"""
+        return self.tasks / self.max_tasks if self.max_tasks else float(self.tasks)
+
+
+class KeyPool:
+    """
+    Routes Kie.ai tasks over a set of API keys.
+
+    acquire() reserves a task slot on the least-loaded healthy key, waiting
+    when every key is at its max_tasks. A key that is throttled or out of
+    credits is parked: new tasks avoid it until the park runs out or a
+    call on it succeeds. Throttled keys are parked for the server's
+    Retry-After; credit and auth errors for park_seconds, doubled with
+    each further strike up to max_park.
+    When every key is parked, the one due back first is used anyway, so a
+    lone key still serves requests instead of stalling.
+
+    Tasks are bound to the key that created them; status queries for a task
+    must use key_for(task_id).
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[Union[str, ApiKey]],
+        governor: Optional[Callable[[], RateGovernor]] = None,
+        max_tasks: int = 0,
+        park_seconds: float = 300.0,
+        max_park: float = 3600.0,
+        metrics: Optional[MetricsSink] = None
+    ):
+        """
+        Args:
+            keys: API keys (strings, or ApiKeys with their own settings);
+                duplicates are dropped
+            governor: Builds each key's rate governor (default: unlimited)
+            max_tasks: Tasks each key may run at once (0 = unlimited)
+            park_seconds: First park after a credit or auth error
+            max_park: Longest a key is parked, however many strikes
+            metrics: Where task slots and parks per key are reported
+        """
+        self.keys: list[ApiKey] = []
+        for key in keys:
+            if isinstance(key, str):
+                key = ApiKey(key, governor() if governor else RateGovernor(), max_tasks)
+            if all(k.id != key.id for k in self.keys):
+                self.keys.append(key)
+        if not self.keys:
+            raise ValueError("KeyPool needs at least one API key")
+
+        self.park_seconds = park_seconds
+        self.max_park = max_park
+        self.metrics = metrics or MetricsSink()
+        self._by_id = {key.id: key for key in self.keys}
+        self._tasks: dict[str, ApiKey] = {}
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get(self, key_id: Optional[str]) -> Optional[ApiKey]:
+        return self._by_id.get(key_id) if key_id else None
+
+    async def acquire(self) -> ApiKey:
+        """Reserve a task slot on the best key, waiting while every key is full"""
+        while True:
+            key = self._pick()
+            if key is not None:
+                key.tasks += 1
+                key.last_used = time.monotonic()
+                self.metrics.set("soragiri_key_tasks", key.tasks, key=key.id)
+                return key
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def claim(self, key_id: Optional[str]) -> ApiKey:
+        """
+        Take a slot for a task created before a restart, without waiting.
+
+        Args:
+            key_id: Fingerprint of the key the task was created with; an
+                unknown or removed key falls back to the first one
+
+        Returns:
+            The key the task's queries should use
+        """
+        key = self.get(key_id) or self.keys[0]
+        key.tasks += 1
+        self.metrics.set("soragiri_key_tasks", key.tasks, key=key.id)
+        return key
+
+    def assign(self, task_id: str, key: ApiKey) -> None:
+        """Bind a created task to its key, for key_for()"""
+        self._tasks[task_id] = key
+
+    def key_for(self, task_id: str) -> ApiKey:
+        """The key a task was created with (the first key if unknown)"""
+        return self._tasks.get(task_id) or self.keys[0]
+
+    def release(self, key: ApiKey, task_id: Optional[str] = None) -> None:
+        """Free a slot taken by acquire() or claim(), and forget its task"""
+        key.tasks = max(0, key.tasks - 1)
+        self.metrics.set("soragiri_key_tasks", key.tasks, key=key.id)
+        if task_id is not None and self._tasks.get(task_id) is key:
+            del self._tasks[task_id]
+        self._notify()
+
+    def park(self, key: ApiKey, reason: str, seconds: Optional[float] = None) -> float:
+        """
+        Take a key out of rotation for new tasks.
+
+        Args:
+            key: The key to park
+            reason: Why ("throttled", "credits", "auth"), for logs and metrics
+            seconds: How long (default: park_seconds, doubled for each
+                such strike since the key last worked)
+
+        Returns:
+            Seconds the key stays parked
+        """
+        now = time.monotonic()
+        if seconds is None and key.parked and key.park_reason == reason:
+            # Calls that were already in flight hit the same wall; not a new strike
+            return key.parked_until - now
+
+        if seconds is None:
+            key.strikes += 1
+            seconds = self.park_seconds * 2 ** (key.strikes - 1)
+        seconds = min(self.max_park, seconds)
+        self.metrics.inc("soragiri_key_parks_total", key=key.id, reason=reason)
+        if now + seconds > key.parked_until:
+            key.parked_until = now + seconds
+            # Throttling comes and goes with bursts; only long parks are worth a line
+            if reason != "throttled":
+                print(f"[SoraGiri] Key {key.id} parked for {seconds:.0f}s ({reason})")
+            key.park_reason = reason
+        return key.parked_until - now
+
+    def healthy(self, key: ApiKey) -> None:
+        """A call on the key succeeded: clear its strikes and any park"""
+        if key.strikes or key.park_reason:
+            if key.parked and key.park_reason != "throttled":
+                print(f"[SoraGiri] Key {key.id} back in rotation")
+            key.strikes = 0
+            key.parked_until = 0.0
+            key.park_reason = None
+
+    def has_alternative(self, key: ApiKey) -> bool:
+        """Whether another key could take new work right now"""
+        return any(k is not key and not k.parked and k.has_slot for k in self.keys)
+
+    def _pick(self) -> Optional[ApiKey]:
+        open_keys = [key for key in self.keys if key.has_slot]
+        if not open_keys:
+            return None
+        healthy = [key for key in open_keys if not key.parked]
+        if healthy:
+            return min(healthy, key=lambda k: (k.load, k.last_used))
+        return min(open_keys, key=lambda k: k.parked_until)
+
+    def _notify(self) -> None:
+        """Let everyone waiting for a slot look again"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
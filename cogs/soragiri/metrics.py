@@ -0,0 +1,283 @@
+"""
+SoraGiri (空斬り) - Metrics
+Counters, gauges and histograms for the engine and cog, with an
+in-process registry and a Prometheus text endpoint. Zero Discord
+dependencies.
+"""
+
+import math
+import threading
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+
+# Histogram buckets (upper bounds) for durations in seconds
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# ... for byte sizes and throughputs
+BYTES_BUCKETS = (1e5, 1e6, 4e6, 1e7, 2.5e7, 5e7, 1e8, 2.5e8, 1e9)
+# ... for small counts, like polls per task
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+# HELP text of the metrics the engine and cog report
+DESCRIPTIONS = {
+    "soragiri_api_requests_total": "Kie.ai API responses by endpoint and status",
+    "soragiri_api_request_seconds": "Kie.ai API request latency",
+    "soragiri_api_rate_wait_seconds": "Time API calls waited for a client-side rate token",
+    "soragiri_api_retries_total": "Kie.ai API calls retried, by endpoint and reason",
+    "soragiri_task_create_seconds": "Time to create a Kie.ai task, retries included",
+    "soragiri_task_queue_seconds": "Time a task waited in Kie.ai's queue",
+    "soragiri_task_generate_seconds": "Time Kie.ai spent generating a task",
+    "soragiri_task_polls": "Status checks per task",
+    "soragiri_tasks_total": "Finished Kie.ai tasks by outcome",
+    "soragiri_key_tasks": "Kie.ai tasks running per API key",
+    "soragiri_key_parks_total": "API keys taken out of rotation, by key and reason",
+    "soragiri_artifact_requests_total": "Artifact store lookups for a video to deliver, by outcome (hit, miss)",
+    "soragiri_artifact_exports_total": "Stored videos placed at an output path, by method (reflink, copy)",
+    "soragiri_artifact_bytes": "Bytes of videos in the artifact store",
+    "soragiri_hedges_total": "Hedge tasks for stuck tasks, by outcome",
+    "soragiri_callbacks_total": "Task callbacks received, by whether a task was waiting for them",
+    "soragiri_slices_total": "Finished slice calls by outcome",
+    "soragiri_slice_seconds": "End-to-end slice time by outcome",
+    "soragiri_download_bytes_total": "Bytes downloaded from result URLs",
+    "soragiri_download_seconds": "Result download time",
+    "soragiri_download_throughput_bytes_per_second": "Result download throughput",
+    "soragiri_jobs_waiting": "Jobs waiting for a worker",
+    "soragiri_jobs_running": "Jobs running on a worker",
+    "soragiri_jobs_rejected_total": "Jobs turned away, by reason",
+    "soragiri_job_queue_wait_seconds": "Time jobs waited for a worker, by priority tier",
+    "soragiri_tenant_queue_wait_seconds": "Recent queue-wait quantiles per tenant (guild)",
+    "soragiri_job_run_seconds": "Time jobs spent on a worker",
+    "soragiri_embed_edit_seconds": "Discord progress edit latency",
+    "soragiri_embed_edits_total": "Discord progress edits sent, by kind",
+    "soragiri_upload_seconds": "Discord upload time",
+    "soragiri_upload_bytes_total": "Bytes uploaded to Discord",
+    "soragiri_deliveries_total": "Delivered cuts by method",
+    "soragiri_reencodes_total": "Oversized cuts re-encoded, by outcome",
+}
+
+
+class MetricsSink:
+    """
+    Where instrumentation goes. This base class drops everything, so
+    instrumented code costs next to nothing until a real sink is plugged
+    in; subclass it to forward metrics elsewhere (StatsD, logs, ...).
+    """
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Add value to a counter"""
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge"""
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record one observation in a histogram"""
+
+
+class _Histogram:
+    """Cumulative bucket counts, sum and count for one label set"""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class MetricsRegistry(MetricsSink):
+    """
+    In-process metrics store.
+
+    Metrics are created on first use. Histogram buckets come from
+    describe() or, failing that, the metric's name: '*_bytes*' uses
+    BYTES_BUCKETS, '*_polls' COUNT_BUCKETS, everything else
+    SECONDS_BUCKETS. render() produces the Prometheus text exposition
+    format.
+    """
+
+    def __init__(self):
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._gauges: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+        self._help: dict[str, str] = {}
+        self._buckets: dict[str, tuple[float, ...]] = {}
+        # Download writers and other threads may report too
+        self._lock = threading.Lock()
+        for name, help in DESCRIPTIONS.items():
+            self.describe(name, help)
+
+    def describe(self, name: str, help: str, buckets: Optional[tuple[float, ...]] = None) -> None:
+        """Set a metric's HELP text and, for histograms, its buckets"""
+        self._help[name] = help
+        if buckets is not None:
+            self._buckets[name] = tuple(sorted(buckets))
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = self._key(labels)
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[self._key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            key = self._key(labels)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._buckets_for(name))
+            histogram.observe(value)
+
+    def value(self, name: str, **labels: str) -> Optional[float]:
+        """Current value of a counter or gauge (None if never reported)"""
+        key = self._key(labels)
+        with self._lock:
+            for store in (self._counters, self._gauges):
+                if name in store and key in store[name]:
+                    return store[name][key]
+        return None
+
+    def snapshot(self) -> dict:
+        """
+        Everything recorded so far, as plain data.
+
+        Returns:
+            {"counters": {name: {labels: value}}, "gauges": {...},
+             "histograms": {name: {labels: {"count", "sum", "buckets"}}}},
+            labels being a tuple of (label, value) pairs
+        """
+        with self._lock:
+            return {
+                "counters": {name: dict(series) for name, series in self._counters.items()},
+                "gauges": {name: dict(series) for name, series in self._gauges.items()},
+                "histograms": {
+                    name: {
+                        key: {
+                            "count": h.count,
+                            "sum": h.sum,
+                            "buckets": dict(zip(h.buckets, h.counts))
+                        }
+                        for key, h in series.items()
+                    }
+                    for name, series in self._histograms.items()
+                }
+            }
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric"""
+        lines = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(store):
+                    self._header(lines, name, kind)
+                    for key, value in sorted(store[name].items()):
+                        lines.append(f"{name}{self._format_labels(key)} {self._format_value(value)}")
+
+            for name in sorted(self._histograms):
+                self._header(lines, name, "histogram")
+                for key, h in sorted(self._histograms[name].items()):
+                    for bound, count in zip(h.buckets, h.counts):
+                        le = (("le", self._format_value(bound)),)
+                        lines.append(f"{name}_bucket{self._format_labels(key + le)} {count}")
+                    lines.append(f'{name}_bucket{self._format_labels(key + (("le", "+Inf"),))} {h.count}')
+                    lines.append(f"{name}_sum{self._format_labels(key)} {self._format_value(h.sum)}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {h.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: list[str], name: str, kind: str) -> None:
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def _buckets_for(self, name: str) -> tuple[float, ...]:
+        if name in self._buckets:
+            return self._buckets[name]
+        if "_bytes" in name:
+            return BYTES_BUCKETS
+        if name.endswith("_polls"):
+            return COUNT_BUCKETS
+        return SECONDS_BUCKETS
+
+    @staticmethod
+    def _key(labels: dict[str, str]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    @staticmethod
+    def _format_labels(key: LabelKey) -> str:
+        if not key:
+            return ""
+        pairs = (
+            k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            for k, v in key
+        )
+        return "{" + ",".join(pairs) + "}"
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+
+
+class MetricsServer:
+    """
+    Serves a registry at /metrics in the Prometheus text format from a
+    small aiohttp server on the running event loop.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "127.0.0.1"):
+        """
+        Args:
+            registry: Metrics to expose
+            port: TCP port to listen on (0 picks a free one)
+            host: Interface to bind; keep it local unless scraped remotely
+        """
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self._runner: Optional["web.AppRunner"] = None
+
+    async def start(self) -> "MetricsServer":
+        """Start listening; self.port is the bound port afterwards"""
+        if self._runner is None:
+            # Imported here: most users of this module never serve anything
+            from aiohttp import web
+
+            app = web.Application()
+            app.router.add_get("/metrics", self._handle)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            if not self.port:
+                self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.Response(
+            body=self.registry.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        )
@@ -0,0 +1,299 @@
+"""
+SoraGiri (空斬り) - Task poller
+One background service that polls every outstanding Kie.ai task under a
+single request-rate budget, instead of one polling loop per slice.
+"""
+
+import time
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Callable, Awaitable
+
+from .polling import PollingStrategy
+
+
+# Terminal task states reported by recordInfo
+FINAL_STATES = ("success", "fail")
+
+# Pushed results for tasks not watched yet, kept for a watch() that follows
+EARLY_RESULTS = 256
+
+QueryFn = Callable[[str], Awaitable[dict]]
+UpdateFn = Callable[[str, int, float], Awaitable[None]]
+
+
+@dataclass
+class PollOutcome:
+    """How a watched task ended"""
+    state: str                 # "success", "fail" or "timeout"
+    data: dict = field(default_factory=dict)
+    polls: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class _Watch:
+    """A task the poller is tracking"""
+    task_id: str
+    strategy: PollingStrategy
+    deadline: float
+    max_polls: Optional[int]
+    on_update: Optional[UpdateFn]
+    future: asyncio.Future
+    created: float
+    due: float
+    polls: int = 0
+    errors: int = 0
+    in_flight: bool = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.created
+
+    def priority(self) -> tuple[float, float]:
+        """Sort key among due tasks: closest to expected completion first"""
+        eta = self.strategy.eta(self.elapsed)
+        return (eta if eta is not None else 0.0, self.due)
+
+
+class TaskPoller:
+    """
+    Multiplexes status queries for all outstanding tasks.
+
+    Callers register a task ID with watch() and await the returned future.
+    Each task's polling strategy decides when it is next due; the poller
+    then issues queries no faster than max_rate per second overall, picking
+    the task nearest its expected completion when several are due at once.
+
+    Results pushed by other means (a webhook) resolve watches through
+    complete(); polling then only has to catch what was never pushed.
+    """
+
+    def __init__(
+        self,
+        query: QueryFn,
+        max_rate: float = 5.0,
+        max_in_flight: int = 8,
+        max_errors: int = 3
+    ):
+        """
+        Args:
+            query: Coroutine fetching recordInfo for a task ID
+            max_rate: Global status queries per second
+            max_in_flight: Status queries allowed in flight at once
+            max_errors: Consecutive query errors before a task is failed
+        """
+        self.query = query
+        self.max_rate = max_rate
+        self.max_errors = max_errors
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._watches: dict[str, _Watch] = {}
+        self._wake = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._closed = False
+        self._queries: set[asyncio.Task] = set()
+        self._next_slot = 0.0
+        self._early: OrderedDict[str, dict] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._watches)
+
+    def watch(
+        self,
+        task_id: str,
+        strategy: PollingStrategy,
+        deadline: float,
+        on_update: Optional[UpdateFn] = None,
+        max_polls: Optional[int] = None
+    ) -> asyncio.Future:
+        """
+        Start tracking a task.
+
+        Args:
+            task_id: Kie.ai task ID
+            strategy: Decides when the task is next due
+            deadline: Seconds from now before the task times out
+            on_update: Optional coroutine called after each non-final poll
+                with (state, polls, elapsed)
+            max_polls: Optional cap on status queries
+
+        Returns:
+            Future resolving to a PollOutcome
+        """
+        existing = self._watches.get(task_id)
+        if existing is not None:
+            return existing.future
+
+        early = self._early.pop(task_id, None)
+        if early is not None:
+            # Its result was pushed before anyone started watching
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(PollOutcome(early["state"], early, 0, 0.0))
+            return future
+
+        now = time.monotonic()
+        watch = _Watch(
+            task_id=task_id,
+            strategy=strategy,
+            deadline=deadline,
+            max_polls=max_polls,
+            on_update=on_update,
+            future=asyncio.get_running_loop().create_future(),
+            created=now,
+            due=now + min(strategy.first_delay(), deadline)
+        )
+        self._watches[task_id] = watch
+        watch.future.add_done_callback(lambda _: self._forget(watch))
+        self._ensure_running()
+        self._wake.set()
+        return watch.future
+
+    def complete(self, task_id: str, data: dict) -> bool:
+        """
+        Resolve a task from a pushed status instead of a poll.
+
+        Args:
+            task_id: Kie.ai task ID
+            data: Task record in recordInfo's "data" shape
+
+        Returns:
+            True if a watch was waiting for the task. Final results for
+            tasks not watched yet are kept for the next watch() of them.
+        """
+        state = data.get("state")
+        if state not in FINAL_STATES:
+            return False
+
+        watch = self._watches.get(task_id)
+        if watch is None:
+            self._early[task_id] = data
+            while len(self._early) > EARLY_RESULTS:
+                self._early.popitem(last=False)
+            return False
+
+        self._finish(watch, PollOutcome(state, data, watch.polls, watch.elapsed))
+        return True
+
+    async def close(self) -> None:
+        """Stop polling and cancel every outstanding watch"""
+        # wait_for() can swallow a cancel that races the wake event, so the
+        # loop also checks this flag
+        self._closed = True
+        self._wake.set()
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+        for query in list(self._queries):
+            query.cancel()
+
+        for watch in self._watches.values():
+            if not watch.future.done():
+                watch.future.cancel()
+        self._watches.clear()
+
+    def _ensure_running(self) -> None:
+        self._closed = False
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Scheduling loop: dispatch the best due task whenever budget allows"""
+        while not self._closed:
+            waiting = [w for w in self._watches.values() if not w.in_flight]
+            now = time.monotonic()
+
+            if waiting:
+                ready_at = max(min(w.due for w in waiting), self._next_slot)
+                timeout = ready_at - now
+            else:
+                timeout = None
+
+            if timeout is None or timeout > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            watch = min((w for w in waiting if w.due <= now), key=_Watch.priority)
+            watch.in_flight = True
+            self._next_slot = now + 1.0 / self.max_rate
+
+            await self._slots.acquire()
+            query = asyncio.create_task(self._poll(watch))
+            self._queries.add(query)
+            query.add_done_callback(self._queries.discard)
+
+    async def _poll(self, watch: _Watch) -> None:
+        """Query one task, then resolve it or schedule its next poll"""
+        try:
+            try:
+                result = await self.query(watch.task_id)
+            finally:
+                self._slots.release()
+
+            if watch.future.done():
+                return  # Resolved by complete() while the query was out
+
+            watch.polls += 1
+            watch.errors = 0
+            data = result.get("data") or {}
+            state = data.get("state", "unknown")
+
+            if state in FINAL_STATES:
+                self._finish(watch, PollOutcome(state, data, watch.polls, watch.elapsed))
+                return
+
+            if watch.on_update:
+                await watch.on_update(state, watch.polls, watch.elapsed)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            watch.errors += 1
+            if watch.errors >= self.max_errors:
+                self._finish(watch, error=e)
+                return
+
+        self._reschedule(watch)
+
+    def _reschedule(self, watch: _Watch) -> None:
+        if watch.future.done():
+            return
+
+        elapsed = watch.elapsed
+        remaining = watch.deadline - elapsed
+        if remaining <= 0 or (watch.max_polls and watch.polls >= watch.max_polls):
+            self._finish(watch, PollOutcome("timeout", {}, watch.polls, elapsed))
+            return
+
+        delay = watch.strategy.next_delay(watch.polls, elapsed)
+        watch.due = time.monotonic() + min(delay, remaining)
+        watch.in_flight = False
+        self._wake.set()
+
+    def _forget(self, watch: _Watch) -> None:
+        """Stop tracking a watch once its future is done (or its caller gave up)"""
+        if self._watches.get(watch.task_id) is watch:
+            del self._watches[watch.task_id]
+            self._wake.set()
+
+    def _finish(
+        self,
+        watch: _Watch,
+        outcome: Optional[PollOutcome] = None,
+        error: Optional[Exception] = None
+    ) -> None:
+        if not watch.future.done():
+            if error is not None:
+                watch.future.set_exception(error)
+            else:
+                watch.future.set_result(outcome)
+        self._forget(watch)
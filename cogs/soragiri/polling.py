@@ -0,0 +1,206 @@
+"""
+SoraGiri (空斬り) - Polling strategies
+Decide when to ask Kie.ai about a task, so short jobs are picked up
+promptly and long jobs don't burn recordInfo calls.
+"""
+
+import random
+from collections import deque
+from typing import Optional
+
+
+# Default time budget for a task before the slice gives up (seconds)
+DEFAULT_DEADLINE = 300.0
+
+
+def _jittered(delay: float, jitter: float) -> float:
+    """Spread delay by +/- jitter (fraction) so tasks don't poll in lockstep"""
+    if jitter <= 0:
+        return delay
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+
+class PollingStrategy:
+    """
+    Base polling strategy.
+
+    A strategy is shared by every task the engine runs. Per-task state is
+    passed in (polls made so far, seconds since the task was created), so
+    implementations only keep what they learn across tasks.
+    """
+
+    def first_delay(self) -> float:
+        """Seconds to wait after task creation before the first query"""
+        return self.next_delay(0, 0.0)
+
+    def next_delay(self, polls: int, elapsed: float) -> float:
+        """Seconds to wait before the next query"""
+        raise NotImplementedError
+
+    def record(self, cost_time_ms: Optional[int]) -> None:
+        """Learn from a finished task's upstream processing time"""
+
+    def eta(self, elapsed: float) -> Optional[float]:
+        """Expected seconds until the task finishes, if known"""
+        return None
+
+
+class FixedPolling(PollingStrategy):
+    """Query every `interval` seconds (the original behaviour)"""
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+
+    def next_delay(self, polls: int, elapsed: float) -> float:
+        return self.interval
+
+
+class SafetyNetPolling(PollingStrategy):
+    """
+    For tasks whose completion is pushed by a webhook: one slow check every
+    `interval` seconds, only to catch callbacks that never arrive. ETAs
+    come from the wrapped strategy.
+    """
+
+    def __init__(self, inner: PollingStrategy, interval: float = 30.0, jitter: float = 0.1):
+        self.inner = inner
+        self.interval = interval
+        self.jitter = jitter
+
+    def next_delay(self, polls: int, elapsed: float) -> float:
+        return _jittered(self.interval, self.jitter)
+
+    def record(self, cost_time_ms: Optional[int]) -> None:
+        self.inner.record(cost_time_ms)
+
+    def eta(self, elapsed: float) -> Optional[float]:
+        return self.inner.eta(elapsed)
+
+
+class BackoffPolling(PollingStrategy):
+    """Exponential backoff with jitter: initial, initial*factor, ... up to max_interval"""
+
+    def __init__(
+        self,
+        initial: float = 1.0,
+        factor: float = 1.6,
+        max_interval: float = 15.0,
+        jitter: float = 0.1
+    ):
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+
+    def next_delay(self, polls: int, elapsed: float) -> float:
+        delay = min(self.max_interval, self.initial * self.factor ** polls)
+        return _jittered(delay, self.jitter)
+
+
+class CostTimeEstimator:
+    """
+    Learns how long Kie.ai takes from recent `costTime` values.
+
+    Until min_samples tasks have finished, a prior of `prior` seconds
+    (+/- 50%) is used.
+    """
+
+    def __init__(self, window: int = 200, prior: float = 30.0, min_samples: int = 5):
+        self.prior = prior
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def warm(self) -> bool:
+        """True once enough tasks have finished to trust the learned window"""
+        return len(self._samples) >= self.min_samples
+
+    def record(self, seconds: float) -> None:
+        if seconds > 0:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        """q-quantile of recent processing times in seconds"""
+        if not self.warm:
+            return self.prior * (0.5 + q)
+
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    @property
+    def expected(self) -> float:
+        """Median processing time in seconds"""
+        return self.quantile(0.5)
+
+
+class AdaptivePolling(PollingStrategy):
+    """
+    Polls around the expected finish time learned from past tasks.
+
+    - Before the fast end of the learned window (p10), sleep in long jumps.
+    - Inside the window (p10..p90), poll at a fine interval so completion
+      is noticed quickly.
+    - Past the window, back off in proportion to how overdue the task is.
+
+    Until the estimator has seen enough tasks, it falls back to exponential
+    backoff starting at the minimum interval.
+    """
+
+    def __init__(
+        self,
+        estimator: Optional[CostTimeEstimator] = None,
+        min_interval: float = 0.5,
+        max_interval: float = 15.0,
+        window_polls: int = 8,
+        backoff: float = 0.25,
+        jitter: float = 0.1
+    ):
+        """
+        Args:
+            estimator: Processing-time estimator (a fresh one if omitted)
+            min_interval: Shortest gap between queries
+            max_interval: Longest gap between queries
+            window_polls: Queries spread across the expected finish window
+            backoff: Extra delay per second overdue, once past the window
+            jitter: Random spread applied to each delay (fraction)
+        """
+        self.estimator = estimator or CostTimeEstimator()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.window_polls = window_polls
+        self.backoff = backoff
+        self.jitter = jitter
+        self.cold_start = BackoffPolling(
+            initial=max(min_interval, 1.0),
+            max_interval=max_interval,
+            jitter=jitter
+        )
+
+    def next_delay(self, polls: int, elapsed: float) -> float:
+        if not self.estimator.warm:
+            return self.cold_start.next_delay(polls, elapsed)
+
+        low = self.estimator.quantile(0.1)
+        high = self.estimator.quantile(0.9)
+        fine = min(3.0, max(self.min_interval, (high - low) / self.window_polls))
+
+        if elapsed < low:
+            delay = low - elapsed
+        elif elapsed < high:
+            delay = fine
+        else:
+            delay = fine + (elapsed - high) * self.backoff
+
+        delay = min(self.max_interval, max(self.min_interval, delay))
+        return _jittered(delay, self.jitter)
+
+    def record(self, cost_time_ms: Optional[int]) -> None:
+        if cost_time_ms:
+            self.estimator.record(cost_time_ms / 1000)
+
+    def eta(self, elapsed: float) -> Optional[float]:
+        return max(0.0, self.estimator.expected - elapsed)
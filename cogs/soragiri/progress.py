@@ -0,0 +1,195 @@
+"""
+SoraGiri (空斬り) - Progress renderer
+Coalesces progress embed edits and status reactions per message and keeps
+each channel under an edit budget, so busy channels don't run into
+Discord's rate limits.
+"""
+
+import time
+import asyncio
+import discord
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .ratelimit import TokenBucket
+from .metrics import MetricsSink
+
+
+@dataclass(eq=False)
+class _MessageState:
+    """What a message should show, and what it shows now"""
+    message: discord.Message
+    embed: Optional[discord.Embed] = None   # latest embed not yet sent
+    reaction: Optional[str] = None          # status reaction it should carry
+    shown_reaction: Optional[str] = None    # status reaction it carries
+    final: bool = False
+    last_edit: float = 0.0
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def dirty(self) -> bool:
+        return self.embed is not None or self.reaction != self.shown_reaction
+
+
+class ProgressRenderer:
+    """
+    Renders progress embeds with latest-value-wins semantics.
+
+    update() never blocks: it records the newest embed (and status
+    reaction) for a message, and a per-message task applies it at most
+    every min_interval seconds, taking a token from the channel's bucket
+    for each edit. Intermediate states that are superseded before their
+    turn are never sent. finish() sends the final state right away,
+    skipping the debounce and the channel budget, and waits until it is
+    on screen.
+
+    Reactions are a single status emoji per message: switching it only
+    costs API calls for the reactions actually shown, so a job that
+    finishes quickly never gets its in-progress reaction at all.
+    """
+
+    def __init__(
+        self,
+        edits_per_second: float = 1.0,
+        burst: int = 5,
+        min_interval: float = 1.5,
+        metrics: Optional[MetricsSink] = None
+    ):
+        """
+        Args:
+            edits_per_second: Sustained edit budget per channel
+            burst: Edits a quiet channel may make back-to-back
+            min_interval: Shortest gap between edits of one message
+            metrics: Where edit counts and latencies are reported
+        """
+        self.edits_per_second = edits_per_second
+        self.burst = burst
+        self.min_interval = min_interval
+        self._buckets: dict[int, TokenBucket] = {}
+        self._states: dict[int, _MessageState] = {}
+        self.metrics = metrics or MetricsSink()
+
+    def update(
+        self,
+        message: discord.Message,
+        embed: Optional[discord.Embed] = None,
+        reaction: Optional[str] = None
+    ) -> None:
+        """Show embed (and/or status reaction) on message, soon"""
+        state = self._state(message)
+        if state.final:
+            return
+        if embed is not None:
+            state.embed = embed
+        if reaction is not None:
+            state.reaction = reaction
+        self._ensure_flushing(state)
+
+    async def finish(
+        self,
+        message: discord.Message,
+        embed: Optional[discord.Embed] = None,
+        reaction: Optional[str] = None
+    ) -> None:
+        """Show the final embed and reaction now, and stop tracking the message"""
+        state = self._state(message)
+        state.final = True
+        if embed is not None:
+            state.embed = embed
+        if reaction is not None:
+            state.reaction = reaction
+        state.wake.set()
+        self._ensure_flushing(state)
+        try:
+            await asyncio.shield(state.task)
+        finally:
+            if self._states.get(message.id) is state:
+                del self._states[message.id]
+
+    async def close(self) -> None:
+        """Drop pending updates"""
+        for state in self._states.values():
+            if state.task:
+                state.task.cancel()
+        self._states.clear()
+
+    def _state(self, message: discord.Message) -> _MessageState:
+        state = self._states.get(message.id)
+        if state is None:
+            state = self._states[message.id] = _MessageState(message)
+        return state
+
+    def _bucket(self, channel_id: int) -> TokenBucket:
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = TokenBucket(self.edits_per_second, self.burst)
+        return bucket
+
+    def _ensure_flushing(self, state: _MessageState) -> None:
+        if state.task is None or state.task.done():
+            state.task = asyncio.create_task(self._flush(state))
+
+    async def _flush(self, state: _MessageState) -> None:
+        """Apply a message's latest state until nothing is left to send"""
+        while state.dirty:
+            if not state.final:
+                delay = state.last_edit + self.min_interval - time.monotonic()
+                # A final update cuts both waits short
+                if delay > 0 and not await self._wait(state, asyncio.sleep(delay)):
+                    continue
+                if not state.final:
+                    channel = state.message.channel.id
+                    if not await self._wait(state, self._bucket(channel).acquire()):
+                        continue
+
+            embed, state.embed = state.embed, None
+            reaction = state.reaction
+            try:
+                if embed is not None:
+                    sent = time.monotonic()
+                    await state.message.edit(embed=embed)
+                    state.last_edit = time.monotonic()
+                    self.metrics.observe("soragiri_embed_edit_seconds", state.last_edit - sent)
+                    self.metrics.inc("soragiri_embed_edits_total", kind="final" if state.final else "progress")
+                if reaction != state.shown_reaction:
+                    await self._react(state, reaction)
+            except (discord.NotFound, discord.Forbidden):
+                # Message gone or off-limits: nothing more to show
+                self._states.pop(state.message.id, None)
+                return
+            except discord.HTTPException as e:
+                print(f"[SoraGiri] Progress update failed: {e}")
+                # Don't retry a reaction Discord refused
+                state.reaction = state.shown_reaction
+                if state.final:
+                    return
+
+    async def _react(self, state: _MessageState, reaction: Optional[str]) -> None:
+        """Swap the message's status reaction"""
+        if state.shown_reaction is not None:
+            try:
+                await state.message.clear_reaction(state.shown_reaction)
+            except discord.Forbidden:
+                pass
+        state.shown_reaction = None
+        if reaction is not None:
+            await state.message.add_reaction(reaction)
+        state.shown_reaction = reaction
+
+    @staticmethod
+    async def _wait(state: _MessageState, waiter) -> bool:
+        """Await waiter unless a final update arrives first; True if it finished"""
+        if state.final:
+            waiter.close()
+            return False
+        state.wake.clear()
+        pending = asyncio.ensure_future(waiter)
+        woken = asyncio.ensure_future(state.wake.wait())
+        try:
+            await asyncio.wait({pending, woken}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            woken.cancel()
+            if not pending.done():
+                pending.cancel()
+        return not pending.cancelled()
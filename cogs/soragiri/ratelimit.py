@@ -0,0 +1,131 @@
+"""
+SoraGiri (空斬り) - Rate governor
+Client-side token buckets, Retry-After handling and retry backoff, so
+traffic spikes queue up instead of failing on HTTP 429.
+"""
+
+import time
+import random
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Token bucket with a fair (FIFO) wait queue.
+
+    Callers await acquire() for a token instead of failing; they are served
+    strictly in arrival order. pause() empties the bucket until a given
+    time, which is how a server's Retry-After is honoured.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (requests allowed back-to-back)
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds`"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        # Refilling restarts when the pause ends, not from before it
+        self._updated = self._paused_until
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent waiting"""
+        started = time.monotonic()
+        # asyncio.Lock wakes waiters in FIFO order, which makes the queue fair
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return time.monotonic() - started
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for retryable failures"""
+
+    # HTTP statuses worth retrying
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        ceiling = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return random.uniform(ceiling / 2, ceiling)
+
+
+class RateGovernor:
+    """Per-endpoint token buckets plus a shared retry policy"""
+
+    def __init__(
+        self,
+        buckets: Optional[dict[str, TokenBucket]] = None,
+        retry: Optional[RetryPolicy] = None
+    ):
+        self.buckets = buckets or {}
+        self.retry = retry or RetryPolicy()
+
+    async def acquire(self, endpoint: str) -> float:
+        """Wait for a token on endpoint's bucket (unlimited if it has none)"""
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            return 0.0
+        return await bucket.acquire()
+
+    def pause(self, endpoint: str, seconds: float) -> bool:
+        """
+        Back off an endpoint (e.g. after a 429 with Retry-After).
+
+        Returns:
+            False if the endpoint has no bucket, so the caller must wait
+            out the pause itself
+        """
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            return False
+        bucket.pause(seconds)
+        return True
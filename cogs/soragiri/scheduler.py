@@ -0,0 +1,214 @@
+"""
+SoraGiri (空斬り) - Fair scheduling
+Decides which waiting job a free worker takes next: interactive requests
+before bulk ones, and within each tier a weighted share for every tenant
+(guild, then user), so one busy server can't starve the rest.
+"""
+
+import time
+from enum import IntEnum
+from collections import OrderedDict, deque
+from typing import Optional, Hashable, Iterator, Protocol, Union
+
+
+class Priority(IntEnum):
+    """Scheduling tiers; lower values are served first"""
+    INTERACTIVE = 0     # someone is watching: /slice, !slice, a single-link mention
+    BATCH = 1           # bulk work: multi-link mentions, batch submissions
+
+
+class Schedulable(Protocol):
+    tenant: Union[Hashable, tuple]
+    priority: Priority
+    enqueued: float
+
+
+def tenant_path(tenant: Union[Hashable, tuple]) -> tuple:
+    """A tenant as a path: (guild, user) stays as is, a plain key becomes (key,)"""
+    return tenant if isinstance(tenant, tuple) and tenant else (tenant,)
+
+
+class _DeficitRoundRobin:
+    """
+    Deficit round-robin over flows; a flow is a deque of jobs or, for
+    nested tenants, another round.
+
+    Every job costs 1. On its turn a flow earns its weight in credit and
+    is served while it has a whole credit left, so a flow of weight 2
+    gets two jobs per round and one of weight 0.5 one job every other
+    round. Flows that empty out leave the round and forfeit their credit.
+    """
+
+    def __init__(self, weights: Optional[dict] = None, default_weight: float = 1.0):
+        self.weights = weights or {}
+        self.default_weight = default_weight
+        self.flows: OrderedDict[Hashable, Union[deque, "_DeficitRoundRobin"]] = OrderedDict()
+        self.deficit: dict[Hashable, float] = {}
+        self._in_turn = False
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def weight(self, key: Hashable) -> float:
+        # Never zero, or a flow could hold the round forever without being served
+        return max(0.01, float(self.weights.get(key, self.default_weight)))
+
+    def push(self, path: tuple, job) -> None:
+        key, rest = path[0], path[1:]
+        flow = self.flows.get(key)
+        if flow is None:
+            flow = self.flows[key] = _DeficitRoundRobin() if rest else deque()
+            self.deficit[key] = 0.0
+        if rest:
+            flow.push(rest, job)
+        else:
+            flow.append(job)
+        self._size += 1
+
+    def pop(self):
+        while self.flows:
+            key, flow = next(iter(self.flows.items()))
+            if not self._in_turn:
+                self.deficit[key] += self.weight(key)
+                self._in_turn = True
+            if self.deficit[key] >= 1:
+                self.deficit[key] -= 1
+                job = flow.pop() if isinstance(flow, _DeficitRoundRobin) else flow.popleft()
+                self._size -= 1
+                if not flow:
+                    self._drop(key)
+                return job
+            # Out of credit: next flow's turn
+            self.flows.move_to_end(key)
+            self._in_turn = False
+        return None
+
+    def remove(self, job) -> bool:
+        for key, flow in self.flows.items():
+            if isinstance(flow, _DeficitRoundRobin):
+                found = flow.remove(job)
+            else:
+                found = job in flow
+                if found:
+                    flow.remove(job)
+            if found:
+                self._size -= 1
+                if not flow:
+                    self._drop(key)
+                return True
+        return False
+
+    def jobs(self) -> Iterator:
+        for flow in self.flows.values():
+            yield from flow.jobs() if isinstance(flow, _DeficitRoundRobin) else flow
+
+    def copy(self) -> "_DeficitRoundRobin":
+        clone = _DeficitRoundRobin(self.weights, self.default_weight)
+        for key, flow in self.flows.items():
+            clone.flows[key] = flow.copy()
+        clone.deficit = dict(self.deficit)
+        clone._in_turn = self._in_turn
+        clone._size = self._size
+        return clone
+
+    def _drop(self, key: Hashable) -> None:
+        first = next(iter(self.flows)) == key
+        del self.flows[key]
+        del self.deficit[key]
+        if first:
+            # The flow whose turn it was is gone; the next one starts fresh
+            self._in_turn = False
+
+
+class FairScheduler:
+    """
+    Waiting jobs, ordered by priority tier and then fairly across tenants.
+
+    A job's tenant is a key or a path such as (guild_id, user_id): each
+    tier runs deficit round-robin across guilds, weighted by `weights`,
+    and within a guild across its users. A higher tier is always served
+    first, except that once a lower tier's oldest job has waited
+    max_wait seconds that tier gets the next free worker, so bulk work
+    keeps moving under a steady stream of interactive requests.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[dict[Hashable, float]] = None,
+        default_weight: float = 1.0,
+        max_wait: float = 120.0
+    ):
+        """
+        Args:
+            weights: Share per top-level tenant (e.g. guild ID -> 2.0 for
+                twice the default share)
+            default_weight: Share of tenants without a weight
+            max_wait: Seconds a lower-tier job may wait before its tier is
+                served ahead of higher ones (0 = never)
+        """
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.max_wait = max_wait
+        self._tiers: dict[Priority, _DeficitRoundRobin] = {}
+
+    def __len__(self) -> int:
+        return sum(len(tier) for tier in self._tiers.values())
+
+    def __bool__(self) -> bool:
+        return any(self._tiers.values())
+
+    def __iter__(self) -> Iterator:
+        """Waiting jobs, in no particular order (see order())"""
+        for tier in self._tiers.values():
+            yield from tier.jobs()
+
+    def push(self, job: Schedulable) -> None:
+        tier = self._tiers.get(job.priority)
+        if tier is None:
+            tier = self._tiers[job.priority] = _DeficitRoundRobin(self.weights, self.default_weight)
+        tier.push(tenant_path(job.tenant), job)
+
+    def pop(self) -> Optional[Schedulable]:
+        """The job to run next, or None if nothing is waiting"""
+        tier = self._starved() or self._first_tier()
+        return tier.pop() if tier is not None else None
+
+    def remove(self, job: Schedulable) -> bool:
+        tier = self._tiers.get(job.priority)
+        return tier is not None and tier.remove(job)
+
+    def clear(self) -> None:
+        self._tiers.clear()
+
+    def order(self) -> list:
+        """
+        Waiting jobs in the order they would start if nothing else arrived
+        (ignoring the starvation guard); used for queue positions.
+        """
+        ordered = []
+        for priority in sorted(self._tiers):
+            tier = self._tiers[priority].copy()
+            while (job := tier.pop()) is not None:
+                ordered.append(job)
+        return ordered
+
+    def _first_tier(self) -> Optional[_DeficitRoundRobin]:
+        for priority in sorted(self._tiers):
+            if self._tiers[priority]:
+                return self._tiers[priority]
+        return None
+
+    def _starved(self) -> Optional[_DeficitRoundRobin]:
+        """The lowest tier whose oldest job has waited past max_wait, if any"""
+        if not self.max_wait:
+            return None
+        cutoff = time.monotonic() - self.max_wait
+        first = self._first_tier()
+        for priority in sorted(self._tiers, reverse=True):
+            tier = self._tiers[priority]
+            if tier is first:
+                break
+            if tier and min(job.enqueued for job in tier.jobs()) <= cutoff:
+                return tier
+        return None
@@ -0,0 +1,626 @@
+"""
+SoraGiri (空斬り) - Job service
+A long-lived HTTP service around one engine, so every script and CLI run
+on a host shares its connections, result cache, rate budget and request
+coalescing, plus a client that talks to it. Zero Discord dependencies.
+
+    POST /jobs                  {"url": ...} or {"urls": [...]} (queued as batch work); 202 with the job(s)
+    GET  /jobs/{id}             job state, and its result once finished
+    GET  /jobs/{id}/events      progress as server-sent events, ending with "done"
+    GET  /jobs/{id}/result      the result video, streamed
+    GET  /health                engine and queue status
+"""
+
+import hmac
+import json
+import time
+import asyncio
+import secrets
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Hashable, AsyncIterator, Iterable
+
+import aiohttp
+from aiohttp import web
+
+from .core import (
+    SoraGiri, SliceState, SliceResult, ProgressEvent, OnProgress, output_name_for, unique_video_urls
+)
+from .events import ProgressFeed
+from .jobs import JobQueue, QueueFull
+from .scheduler import Priority
+
+
+def event_to_dict(event: ProgressEvent) -> dict:
+    """A ProgressEvent as JSON-ready fields"""
+    return {
+        "state": event.state.value,
+        "message": event.message,
+        "video_url": event.video_url,
+        "task_id": event.task_id,
+        "attempt": event.attempt,
+        "max_attempts": event.max_attempts,
+        "elapsed": event.elapsed,
+        "deadline": event.deadline,
+        "eta": event.eta
+    }
+
+
+def event_from_dict(data: dict) -> ProgressEvent:
+    """The ProgressEvent behind event_to_dict()"""
+    return ProgressEvent(
+        SliceState(data["state"]),
+        data.get("message", ""),
+        video_url=data.get("video_url"),
+        task_id=data.get("task_id"),
+        attempt=data.get("attempt", 0),
+        max_attempts=data.get("max_attempts"),
+        elapsed=data.get("elapsed", 0.0),
+        deadline=data.get("deadline"),
+        eta=data.get("eta")
+    )
+
+
+def result_to_dict(result: SliceResult) -> dict:
+    """A SliceResult as JSON-ready fields (paths and open files are local and left out)"""
+    return {
+        "success": result.success,
+        "output_url": result.output_url,
+        "error": result.error,
+        "cost_time_ms": result.cost_time_ms,
+        "cached": result.cached,
+        "video_url": result.video_url,
+        "polls": result.polls,
+        "rate_wait_ms": result.rate_wait_ms,
+        "retries": result.retries,
+        "output_size": result.output_size,
+        "timings": result.timings
+    }
+
+
+def result_from_dict(data: dict) -> SliceResult:
+    """The SliceResult behind result_to_dict()"""
+    return SliceResult(
+        success=data["success"],
+        output_url=data.get("output_url"),
+        error=data.get("error"),
+        cost_time_ms=data.get("cost_time_ms"),
+        cached=data.get("cached", False),
+        video_url=data.get("video_url"),
+        polls=data.get("polls"),
+        rate_wait_ms=data.get("rate_wait_ms"),
+        retries=data.get("retries", 0),
+        output_size=data.get("output_size"),
+        timings=data.get("timings") or {}
+    )
+
+
+@dataclass(eq=False)
+class ServiceJob:
+    """One submitted URL and everything its clients may ask about it"""
+    job_id: str
+    video_url: str
+    use_cache: bool = True
+    created: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    result: Optional[SliceResult] = None
+    # Latest events, numbered so event streams can pick up where they left off
+    events: deque = field(default_factory=lambda: deque(maxlen=64))
+    sequence: int = 0
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    @property
+    def state(self) -> str:
+        if self.result is not None:
+            return SliceState.COMPLETE.value if self.result.success else SliceState.FAILED.value
+        return self.events[-1][1]["state"] if self.events else SliceState.INITIALIZING.value
+
+    def publish(self, event: ProgressEvent) -> None:
+        self.sequence += 1
+        self.events.append((self.sequence, event_to_dict(event)))
+        self._wake()
+
+    def finish(self, result: SliceResult) -> None:
+        self.result = result
+        self.finished = time.time()
+        self._wake()
+
+    async def changed(self, since: int, timeout: float) -> None:
+        """Wait for an event numbered after `since`, or the end of the job (or timeout)"""
+        if self.sequence > since or self.done:
+            return
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.job_id,
+            "video_url": self.video_url,
+            "state": self.state,
+            "message": self.events[-1][1]["message"] if self.events else "Waiting for a free blade...",
+            "created": self.created,
+            "finished": self.finished,
+            "result": result_to_dict(self.result) if self.result is not None else None
+        }
+
+    def _wake(self) -> None:
+        # Everyone waiting on the old event wakes; later waits use a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class JobService:
+    """
+    Serves one SoraGiri engine over HTTP.
+
+    Submitted URLs become jobs on a JobQueue with `workers` slices in
+    flight, so bursts from many clients queue up instead of failing (and
+    are refused with 503 once max_queue jobs are waiting). The engine's
+    result cache and request coalescing apply across clients. Finished
+    jobs are kept for download until max_jobs newer ones push them out.
+
+    Keep it on localhost unless it sits behind something that
+    authenticates; with a token, every request needs
+    `Authorization: Bearer <token>`.
+    """
+
+    # Seconds between keep-alive comments on a quiet event stream
+    KEEPALIVE = 15.0
+
+    def __init__(
+        self,
+        giri: SoraGiri,
+        port: int = 8788,
+        host: str = "127.0.0.1",
+        token: Optional[str] = None,
+        workers: int = 8,
+        max_queue: int = 1000,
+        max_jobs: int = 1000
+    ):
+        """
+        Args:
+            giri: The engine every job runs on (started and closed by the caller)
+            port: Local port to listen on (0 picks a free one)
+            host: Interface to bind
+            token: Bearer token clients must send (default: none required)
+            workers: Slices in flight at once
+            max_queue: Jobs allowed to wait for a worker (0 = unlimited)
+            max_jobs: Jobs remembered, finished ones first to go
+        """
+        self.giri = giri
+        self.port = port
+        self.host = host
+        self.token = token
+        self.max_jobs = max_jobs
+        self.queue = JobQueue(workers=workers, max_queue=max_queue, per_user=0, metrics=giri.metrics)
+        self.jobs: OrderedDict[str, ServiceJob] = OrderedDict()
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    async def start(self) -> "JobService":
+        """Start listening; self.port is the bound port afterwards"""
+        if self._runner is None:
+            app = web.Application(middlewares=[self._authorize])
+            app.router.add_post("/jobs", self._submit)
+            app.router.add_get("/jobs/{job_id}", self._status)
+            app.router.add_get("/jobs/{job_id}/events", self._events)
+            app.router.add_get("/jobs/{job_id}/result", self._download)
+            app.router.add_get("/health", self._health)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            if not self.port:
+                self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self) -> None:
+        """Stop serving; jobs still waiting or running are cancelled"""
+        await self.queue.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def submit(
+        self,
+        video_url: str,
+        owner: Hashable = None,
+        use_cache: bool = True,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> ServiceJob:
+        """
+        Queue a URL. Jobs are scheduled fairly across owners; BATCH ones
+        wait behind INTERACTIVE ones.
+
+        Raises:
+            QueueFull: Too many jobs are waiting
+        """
+        job = ServiceJob(secrets.token_hex(8), video_url, use_cache)
+
+        async def work():
+            try:
+                result = await self.giri.slice(video_url, on_progress=job.publish, use_cache=job.use_cache)
+            except Exception as e:
+                result = SliceResult(success=False, error=f"Service error: {e}", video_url=video_url)
+            # The service holds the result now; nothing left for recover() to redo
+            self.giri.mark_delivered(result.job_id)
+            job.finish(result)
+
+        async def on_position(position: int, eta: Optional[float]):
+            wait = f", ~{eta:.0f}s" if eta else ""
+            job.publish(ProgressEvent(
+                SliceState.INITIALIZING, f"Waiting for a free blade (#{position} in line{wait})...",
+                video_url=video_url
+            ))
+
+        self.queue.submit(owner, work, on_position, priority=priority)
+        self.jobs[job.job_id] = job
+        self._forget_old()
+        return job
+
+    def _forget_old(self) -> None:
+        excess = len(self.jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.done][:excess]:
+            del self.jobs[job_id]
+
+    def _job(self, request: web.Request) -> ServiceJob:
+        job = self.jobs.get(request.match_info["job_id"])
+        if job is None:
+            raise web.HTTPNotFound(text=json.dumps({"error": "No such job"}), content_type="application/json")
+        return job
+
+    @web.middleware
+    async def _authorize(self, request: web.Request, handler):
+        if self.token:
+            sent = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            if not hmac.compare_digest(sent.encode(), self.token.encode()):
+                return web.json_response({"error": "Bad or missing token"}, status=401)
+        return await handler(request)
+
+    async def _submit(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return web.json_response({"error": "Body must be JSON"}, status=400)
+
+        batch = isinstance(body, dict) and "urls" in body
+        urls = body.get("urls") if batch else [body.get("url")] if isinstance(body, dict) else None
+        if not isinstance(urls, list) or not urls or not all(isinstance(url, str) and url.strip() for url in urls):
+            return web.json_response({"error": "Send {\"url\": ...} or {\"urls\": [...]}"}, status=400)
+
+        # Same video twice in one batch is one job
+        urls = unique_video_urls(urls)
+
+        queue = self.queue
+        if queue.max_queue and queue.waiting + len(urls) > queue.max_queue:
+            return web.json_response(
+                {"error": f"The dojo is full ({queue.waiting} cuts waiting). Try again in a moment."},
+                status=503
+            )
+
+        use_cache = bool(body.get("use_cache", True))
+        try:
+            priority = Priority.BATCH if batch else Priority.INTERACTIVE
+            jobs = [self.submit(url, request.remote, use_cache, priority) for url in urls]
+        except QueueFull as e:
+            return web.json_response({"error": str(e)}, status=503)
+        payload = {"jobs": [job.to_dict() for job in jobs]} if batch else {"job": jobs[0].to_dict()}
+        return web.json_response(payload, status=202)
+
+    async def _status(self, request: web.Request) -> web.Response:
+        return web.json_response(self._job(request).to_dict())
+
+    async def _events(self, request: web.Request) -> web.StreamResponse:
+        job = self._job(request)
+        try:
+            last = int(request.headers.get("Last-Event-ID", 0))
+        except ValueError:
+            last = 0
+
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+        await response.prepare(request)
+        while True:
+            # Events that scrolled out of the history are skipped; the latest always arrives
+            for sequence, event in list(job.events):
+                if sequence > last:
+                    last = sequence
+                    await response.write(f"id: {sequence}\nevent: progress\ndata: {json.dumps(event)}\n\n".encode())
+            if job.done:
+                await response.write(f"event: done\ndata: {json.dumps(job.to_dict())}\n\n".encode())
+                break
+            await job.changed(last, self.KEEPALIVE)
+            if job.sequence == last and not job.done:
+                await response.write(b": keep-alive\n\n")
+        await response.write_eof()
+        return response
+
+    async def _download(self, request: web.Request) -> web.StreamResponse:
+        job = self._job(request)
+        if not job.done:
+            return web.json_response({"error": "Still cutting", "state": job.state}, status=409)
+        if not job.result.success:
+            return web.json_response({"error": job.result.error, "state": job.state}, status=409)
+
+        filename = output_name_for(job.video_url)
+        if self.giri.artifacts is not None:
+            # Served from local disk (with Range support); stored on first request
+            try:
+                artifact = await self.giri.artifact_for(job.result)
+            except Exception as e:
+                return web.json_response({"error": f"Download error: {e}"}, status=502)
+            return web.FileResponse(artifact.path, headers={
+                "Content-Type": "video/mp4",
+                "Content-Disposition": f'attachment; filename="{filename}"'
+            })
+
+        chunks = self.giri.iter_download(job.result.output_url).__aiter__()
+        try:
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                first = b""
+            except Exception as e:
+                return web.json_response({"error": f"Download error: {e}"}, status=502)
+
+            response = web.StreamResponse(headers={
+                "Content-Type": "video/mp4",
+                "Content-Disposition": f'attachment; filename="{filename}"'
+            })
+            if job.result.output_size:
+                response.content_length = job.result.output_size
+            await response.prepare(request)
+            await response.write(first)
+            async for chunk in chunks:
+                await response.write(chunk)
+            await response.write_eof()
+            return response
+        finally:
+            await chunks.aclose()
+
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "ok": True,
+            "jobs": len(self.jobs),
+            "waiting": self.queue.waiting,
+            "running": self.queue.running,
+            "workers": self.queue.workers,
+            "keys": len(self.giri.keys),
+            "queue_wait": {str(tenant): waits for tenant, waits in self.queue.wait_percentiles().items()}
+        })
+
+
+class ServiceClient:
+    """
+    Sends work to a running JobService instead of slicing in-process.
+
+    slice() and slice_many() take the same main arguments as the engine's
+    and return SliceResults, with progress from the service's event stream
+    fed to on_progress, so callers can use either one.
+    """
+
+    def __init__(self, url: str, token: Optional[str] = None, chunk_size: int = 1024 * 1024):
+        """
+        Args:
+            url: Where the service listens, e.g. http://127.0.0.1:8788
+            token: Bearer token, if the service requires one
+            chunk_size: Bytes per read while downloading results
+        """
+        self.url = url.rstrip("/")
+        self.chunk_size = chunk_size
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "ServiceClient":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> "ServiceClient":
+        if self._session is None or self._session.closed:
+            # No overall timeout: event streams and downloads last as long as the cut
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=None, connect=10)
+            )
+        return self
+
+    async def close(self) -> None:
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    async def health(self) -> dict:
+        return await self._call("GET", "/health")
+
+    async def submit(self, video_urls: Iterable[str], use_cache: bool = True) -> list[dict]:
+        """
+        Queue URLs on the service. A single URL is sent as such, so it is
+        scheduled as interactive work rather than behind batches.
+
+        Returns:
+            One job dict per unique URL
+
+        Raises:
+            Exception: The service refused them (full, bad request, bad token)
+        """
+        video_urls = list(video_urls)
+        if len(video_urls) == 1:
+            body = await self._call("POST", "/jobs", json={"url": video_urls[0], "use_cache": use_cache})
+            return [body["job"]]
+        body = await self._call("POST", "/jobs", json={"urls": video_urls, "use_cache": use_cache})
+        return body["jobs"]
+
+    async def job(self, job_id: str) -> dict:
+        return await self._call("GET", f"/jobs/{job_id}")
+
+    async def events(self, job_id: str) -> AsyncIterator[tuple[str, dict]]:
+        """Follow a job's event stream; yields ("progress", event) pairs and finally ("done", job)"""
+        session = await self._get_session()
+        async with session.get(f"{self.url}/jobs/{job_id}/events") as resp:
+            if resp.status != 200:
+                raise Exception(await self._error(resp))
+            kind, data = "message", []
+            async for raw in resp.content:
+                line = raw.decode().rstrip("\r\n")
+                if line.startswith("event:"):
+                    kind = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].strip())
+                elif not line and data:
+                    yield kind, json.loads("\n".join(data))
+                    if kind == "done":
+                        return
+                    kind, data = "message", []
+
+    async def wait(self, job_id: str, on_progress: OnProgress = None, video_url: Optional[str] = None) -> dict:
+        """Wait for a job to finish, passing its progress to on_progress; returns the finished job"""
+        feed = ProgressFeed(on_progress, video_url)
+        try:
+            async for kind, data in self.events(job_id):
+                if kind == "progress":
+                    feed.publish(event_from_dict(data))
+                elif kind == "done":
+                    return data
+            # Stream ended early (service restarting?): ask directly
+            return await self.job(job_id)
+        finally:
+            await feed.close()
+
+    async def download(self, job_id: str, output_path: Path) -> int:
+        """Save a finished job's video to output_path; returns the bytes written"""
+        output_path = Path(output_path)
+        partial = output_path.with_name(output_path.name + ".part")
+        session = await self._get_session()
+        written = 0
+        async with session.get(f"{self.url}/jobs/{job_id}/result") as resp:
+            if resp.status != 200:
+                raise Exception(await self._error(resp))
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            handle = await asyncio.to_thread(open, partial, "wb")
+            try:
+                async for chunk in resp.content.iter_chunked(self.chunk_size):
+                    await asyncio.to_thread(handle.write, chunk)
+                    written += len(chunk)
+            finally:
+                await asyncio.to_thread(handle.close)
+        partial.replace(output_path)
+        return written
+
+    async def slice(
+        self,
+        video_url: str,
+        output_path: Optional[Path] = None,
+        on_progress: OnProgress = None,
+        use_cache: bool = True
+    ) -> SliceResult:
+        """
+        Slice a video on the service.
+
+        Args:
+            video_url: URL to the Sora video
+            output_path: Optional path to save the output video
+            on_progress: Progress callback(s), as for SoraGiri.slice()
+            use_cache: Let the service answer from its result cache
+
+        Returns:
+            SliceResult as the service reported it, with output_path and
+            download figures filled in locally
+        """
+        try:
+            job = (await self.submit([video_url], use_cache))[0]
+            return await self._finish(job, video_url, output_path, on_progress)
+        except Exception as e:
+            return SliceResult(success=False, error=f"Service error: {e}", video_url=video_url)
+
+    async def slice_many(
+        self,
+        video_urls: Iterable[str],
+        output_dir: Optional[Path] = None,
+        concurrency: int = 4,
+        on_progress: OnProgress = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[SliceResult]:
+        """
+        Queue every URL on the service at once, then follow them,
+        `concurrency` at a time; yields results in completion order. The
+        service's own workers decide how many are cut at once.
+        """
+        urls = list(video_urls)
+        try:
+            jobs = await self.submit(urls, use_cache)
+        except Exception as e:
+            for url in dict.fromkeys(urls):
+                yield SliceResult(success=False, error=f"Service error: {e}", video_url=url)
+            return
+
+        slots = asyncio.Semaphore(max(1, concurrency))
+
+        async def follow(job: dict) -> SliceResult:
+            url = job["video_url"]
+            async with slots:
+                try:
+                    output_path = Path(output_dir) / output_name_for(url) if output_dir else None
+                    return await self._finish(job, url, output_path, on_progress)
+                except Exception as e:
+                    return SliceResult(success=False, error=f"Service error: {e}", video_url=url)
+
+        tasks = [asyncio.create_task(follow(job)) for job in jobs]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _finish(
+        self,
+        job: dict,
+        video_url: str,
+        output_path: Optional[Path],
+        on_progress: OnProgress
+    ) -> SliceResult:
+        job = await self.wait(job["id"], on_progress, video_url)
+        result = result_from_dict(job["result"])
+        result.video_url = video_url
+        if result.success and output_path is not None:
+            started = time.monotonic()
+            result.download_bytes = await self.download(job["id"], output_path)
+            result.download_ms = int((time.monotonic() - started) * 1000)
+            result.output_path = Path(output_path)
+            result.output_size = result.download_bytes
+        return result
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        await self.start()
+        return self._session
+
+    async def _call(self, method: str, path: str, **kwargs) -> dict:
+        session = await self._get_session()
+        async with session.request(method, f"{self.url}{path}", **kwargs) as resp:
+            if resp.status >= 400:
+                raise Exception(await self._error(resp))
+            return await resp.json()
+
+    @staticmethod
+    async def _error(resp: aiohttp.ClientResponse) -> str:
+        try:
+            message = (await resp.json()).get("error")
+        except (aiohttp.ContentTypeError, json.JSONDecodeError, AttributeError):
+            message = None
+        return f"HTTP {resp.status}: {message or resp.reason}"
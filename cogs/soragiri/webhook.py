@@ -0,0 +1,105 @@
+"""
+SoraGiri (空斬り) - Webhook receiver
+Embedded aiohttp server for Kie.ai's task callbacks, so finished tasks are
+pushed to the engine instead of discovered by polling.
+"""
+
+import hmac
+import json
+import secrets
+from typing import Optional, Callable
+from urllib.parse import urlsplit, urlunsplit, urlencode, parse_qsl
+
+from aiohttp import web
+
+
+# Called with (task_id, task record in recordInfo's "data" shape)
+ResultFn = Callable[[str, dict], None]
+
+
+class WebhookReceiver:
+    """
+    Receives Kie.ai callBackUrl notifications.
+
+    Kie.ai must be able to reach public_url (directly, or through a
+    reverse proxy forwarding to host:port). Every callback URL carries a
+    secret token; requests without it are rejected, so nobody else can
+    complete tasks.
+    """
+
+    def __init__(
+        self,
+        public_url: str,
+        port: int = 8787,
+        host: str = "0.0.0.0",
+        secret: Optional[str] = None
+    ):
+        """
+        Args:
+            public_url: URL Kie.ai posts to, e.g. https://bot.example.com/soragiri/callback;
+                its path is the path served locally
+            port: Local port to listen on (0 picks a free one)
+            host: Local interface to bind
+            secret: Token expected on callbacks (default: random per process)
+        """
+        self.public_url = public_url
+        self.port = port
+        self.host = host
+        self.secret = secret or secrets.token_urlsafe(24)
+        self.path = urlsplit(public_url).path or "/"
+        self.on_result: Optional[ResultFn] = None
+        self.received = 0
+        self.rejected = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def callback_url(self) -> str:
+        """public_url with the secret token, as registered on createTask"""
+        parts = urlsplit(self.public_url)
+        query = urlencode(parse_qsl(parts.query) + [("token", self.secret)])
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    async def start(self) -> "WebhookReceiver":
+        """Start listening; self.port is the bound port afterwards"""
+        if self._runner is None:
+            app = web.Application()
+            app.router.add_post(self.path, self._handle)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            if not self.port:
+                self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        token = request.query.get("token", "")
+        if not hmac.compare_digest(token.encode(), self.secret.encode()):
+            self.rejected += 1
+            return web.json_response({"code": 401, "msg": "bad token"}, status=401)
+
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self.rejected += 1
+            return web.json_response({"code": 400, "msg": "invalid JSON"}, status=400)
+
+        # Same record as recordInfo's "data"; tolerate a bare record too
+        data = body.get("data") if isinstance(body, dict) and isinstance(body.get("data"), dict) else body
+        task_id = data.get("taskId") if isinstance(data, dict) else None
+        if not task_id:
+            self.rejected += 1
+            return web.json_response({"code": 400, "msg": "missing taskId"}, status=400)
+
+        self.received += 1
+        if self.on_result is not None:
+            self.on_result(task_id, data)
+        return web.json_response({"code": 200, "msg": "success"})
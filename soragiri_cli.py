@@ -6,18 +6,30 @@ Cyber-Samurai Watermark Removal Tool
 Usage:
     python soragiri_cli.py <sora_url>
     python soragiri_cli.py <sora_url> -o output.mp4
+    python soragiri_cli.py <url1> <url2> ... --output-dir clean/
+    python soragiri_cli.py --input urls.txt --concurrency 8 --output-dir clean/
+    cat urls.txt | python soragiri_cli.py --input - --output-dir clean/
+
+    # One shared engine for every script on the host, and clients for it
+    python soragiri_cli.py serve --port 8788
+    python soragiri_cli.py <sora_url> --daemon http://127.0.0.1:8788
 """
 
 import os
 import sys
+import time
 import asyncio
 import argparse
 from pathlib import Path
+from typing import Optional
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Import from the local package logic
-from cogs.soragiri import SoraGiri, SliceState
+from cogs.soragiri import SoraGiri, SliceState, SliceResult
+from cogs.soragiri.core import ProgressEvent, output_name_for, read_url_list, unique_video_urls
+from cogs.soragiri.cache import ResultCache
+from cogs.soragiri.artifacts import store_from_env
 
 # Load environment
 load_dotenv()
@@ -77,7 +89,7 @@ def get_progress_bar(current: int, total: int, width: int = 25) -> str:
     return f"{C.BLADE}[{bar}]{C.RESET}"
 
 
-def on_progress(state: SliceState, message: str):
+def on_progress(event: ProgressEvent):
     """Handle progress updates with cyber-samurai flair"""
     icons = {
         SliceState.INITIALIZING: f"{C.CYAN}⚡",
@@ -88,35 +100,40 @@ def on_progress(state: SliceState, message: str):
         SliceState.COMPLETE: f"{C.GREEN}✓",
         SliceState.FAILED: f"{C.RED}✕",
     }
-    icon = icons.get(state, "•")
-    
-    # Check if message contains progress info like [3/60]
-    if "[" in message and "/" in message and "]" in message:
-        try:
-            parts = message.split("[")[1].split("]")[0].split("/")
-            curr, tot = int(parts[0]), int(parts[1])
-            bar = get_progress_bar(curr, tot)
-            blade_print(f"{icon} {message} {bar}{C.RESET}")
-        except:
-            blade_print(f"{icon} {message}{C.RESET}")
+    icon = icons.get(event.state, "•")
+
+    # Polling updates carry elapsed time against the deadline
+    if event.attempt and event.deadline:
+        bar = get_progress_bar(min(event.elapsed, event.deadline), event.deadline)
+        eta = f" {C.DIM}ETA ~{event.eta:.0f}s{C.RESET}" if event.eta else ""
+        blade_print(f"{icon} {event.message} {bar}{eta}{C.RESET}")
     else:
-        blade_print(f"{icon} {message}{C.RESET}")
+        blade_print(f"{icon} {event.message}{C.RESET}")
 
 
-async def run_slice(url: str, output: Path, api_key: str) -> bool:
-    """Execute the slice operation"""
-    giri = SoraGiri(api_key)
+def open_engine(api_key: Optional[str], daemon: Optional[str]):
+    """The in-process engine, or a client for a running `serve` daemon"""
+    if daemon:
+        # Imported here: in-process runs never need the service module
+        from cogs.soragiri.service import ServiceClient
+        return ServiceClient(daemon, token=os.getenv("SORAGIRI_SERVE_TOKEN") or None)
+    cache = ResultCache(path=os.getenv("SORAGIRI_CACHE_PATH") or None)
+    return SoraGiri(api_key, cache=cache, artifacts=store_from_env())
+
 
+async def run_slice(url: str, output: Path, api_key: Optional[str], daemon: Optional[str] = None) -> bool:
+    """Execute the slice operation"""
     print()
     blade_print(f"{C.DIM}Target acquired:{C.RESET}")
     blade_print(f"{C.WHITE}{url}{C.RESET}")
     print(f"  {C.DIM}│{C.RESET}")
 
-    result = await giri.slice(
-        video_url=url,
-        output_path=output,
-        on_progress=on_progress
-    )
+    async with open_engine(api_key, daemon) as giri:
+        result = await giri.slice(
+            video_url=url,
+            output_path=output,
+            on_progress=on_progress
+        )
 
     print(f"  {C.DIM}│{C.RESET}")
 
@@ -130,6 +147,22 @@ async def run_slice(url: str, output: Path, api_key: str) -> bool:
         
         if result.cost_time_ms:
             blade_print(f"{C.DIM}Time Taken:{C.RESET} {C.GLOW}{result.cost_time_ms}ms{C.RESET}")
+        if result.download_throughput:
+            mb = result.download_bytes / 1_000_000
+            rate = result.download_throughput / 1_000_000
+            blade_print(f"{C.DIM}Download:{C.RESET} {C.GLOW}{mb:.1f} MB @ {rate:.1f} MB/s{C.RESET}")
+        if result.rate_wait_ms:
+            blade_print(f"{C.DIM}Rate-limit Wait:{C.RESET} {C.GLOW}{result.rate_wait_ms}ms{C.RESET}"
+                        f"{C.DIM} ({result.retries} retries){C.RESET}")
+        if result.polls:
+            blade_print(f"{C.DIM}Status Checks:{C.RESET} {C.GLOW}{result.polls}{C.RESET}")
+        phases = [(name, result.timings[name]) for name in ("create", "queue", "generate", "download")
+                  if name in result.timings]
+        if phases:
+            breakdown = " · ".join(f"{name} {seconds:.1f}s" for name, seconds in phases)
+            blade_print(f"{C.DIM}Phases:{C.RESET} {C.GLOW}{breakdown}{C.RESET}")
+        if result.cached:
+            blade_print(f"{C.DIM}Source:{C.RESET} {C.GLOW}cached cut (no credits spent){C.RESET}")
         print()
         return True
     else:
@@ -139,6 +172,133 @@ async def run_slice(url: str, output: Path, api_key: str) -> bool:
         return False
 
 
+async def run_batch(
+    urls: list[str], output_dir: Path, concurrency: int, api_key: Optional[str], daemon: Optional[str] = None
+) -> bool:
+    """Slice many videos through one engine, with a combined progress view"""
+    total = len(urls)
+    index = {url: i + 1 for i, url in enumerate(urls)}
+    width = len(str(total))
+    last_state: dict[str, SliceState] = {}
+    done = 0
+    succeeded: list[SliceResult] = []
+    failed: list[SliceResult] = []
+
+    icons = {
+        SliceState.INITIALIZING: f"{C.CYAN}⚡",
+        SliceState.QUEUED: f"{C.MAGENTA}◎",
+        SliceState.SLICING: f"{C.NEON}⚔",
+        SliceState.DOWNLOADING: f"{C.BLUE}↓",
+    }
+
+    def on_batch_progress(event: ProgressEvent):
+        # One line per state change per video; polls in between stay quiet
+        url = event.video_url
+        if event.state in icons and last_state.get(url) != event.state:
+            last_state[url] = event.state
+            tag = f"{C.DIM}[{index.get(url, 0):>{width}}/{total}]{C.RESET}"
+            blade_print(f"{tag} {icons[event.state]} {output_name_for(url)}{C.RESET} {C.DIM}{event.message}{C.RESET}")
+
+    print()
+    blade_print(f"{C.DIM}Targets acquired:{C.RESET} {C.WHITE}{total}{C.RESET} "
+                f"{C.DIM}(concurrency {concurrency}, output {output_dir}){C.RESET}")
+    print(f"  {C.DIM}│{C.RESET}")
+
+    started = time.monotonic()
+    async with open_engine(api_key, daemon) as giri:
+        async for result in giri.slice_many(
+            urls,
+            output_dir=output_dir,
+            concurrency=concurrency,
+            on_progress=on_batch_progress
+        ):
+            done += 1
+            tag = f"{C.DIM}[{index.get(result.video_url, 0):>{width}}/{total}]{C.RESET}"
+            name = output_name_for(result.video_url)
+            if result.success:
+                succeeded.append(result)
+                note = " (cached)" if result.cached else ""
+                blade_print(f"{tag} {C.GREEN}✓ {name}{note}{C.RESET}")
+            else:
+                failed.append(result)
+                blade_print(f"{tag} {C.RED}✕ {name}: {result.error}{C.RESET}")
+            blade_print(f"{get_progress_bar(done, total)} {C.DIM}{done}/{total} done{C.RESET}")
+
+    elapsed = time.monotonic() - started
+    cached = sum(1 for r in succeeded if r.cached)
+    polled = [r.polls for r in succeeded + failed if r.polls]
+    rate_wait = sum(r.rate_wait_ms or 0 for r in succeeded + failed) / 1000
+    retries = sum(r.retries for r in succeeded + failed)
+
+    print(f"  {C.DIM}│{C.RESET}")
+    color = C.GREEN if not failed else (C.YELLOW if succeeded else C.RED)
+    blade_print(f"{color}{C.BOLD}BATCH COMPLETE{C.RESET}")
+    blade_print(f"{C.DIM}Sliced:{C.RESET} {C.GREEN}{len(succeeded)}{C.RESET}"
+                f"{C.DIM} (cached {cached}){C.RESET}  "
+                f"{C.DIM}Failed:{C.RESET} {C.RED}{len(failed)}{C.RESET}  "
+                f"{C.DIM}Elapsed:{C.RESET} {C.GLOW}{elapsed:.1f}s{C.RESET}")
+    if polled:
+        blade_print(f"{C.DIM}Status checks:{C.RESET} {C.GLOW}{sum(polled)}{C.RESET} "
+                    f"{C.DIM}({sum(polled) / len(polled):.1f} per sliced job){C.RESET}")
+    if rate_wait or retries:
+        blade_print(f"{C.DIM}Rate-limit wait:{C.RESET} {C.GLOW}{rate_wait:.1f}s{C.RESET} "
+                    f"{C.DIM}across jobs ({retries} retries){C.RESET}")
+    for result in failed:
+        blade_print(f"{C.RED}✕ {result.video_url}{C.RESET} {C.DIM}{result.error}{C.RESET}")
+    print()
+    return not failed
+
+
+async def run_service(api_key: str, host: str, port: int, workers: int, max_queue: int) -> None:
+    """Serve one warm engine to every client on the host until interrupted"""
+    from cogs.soragiri.service import JobService
+
+    cache = ResultCache(path=os.getenv("SORAGIRI_CACHE_PATH") or None)
+    async with SoraGiri(api_key, cache=cache, artifacts=store_from_env()) as giri:
+        await giri.warmup()
+        token = os.getenv("SORAGIRI_SERVE_TOKEN") or None
+        service = JobService(giri, port=port, host=host, token=token, workers=workers, max_queue=max_queue)
+        await service.start()
+        blade_print(f"{C.GREEN}{C.BOLD}DOJO OPEN{C.RESET} {C.CYAN}http://{host}:{service.port}{C.RESET}")
+        blade_print(f"{C.DIM}{workers} blades, {len(giri.keys)} API key(s), "
+                    f"token {'required' if token else 'off'}{C.RESET}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.close()
+
+
+def serve(argv: list[str]):
+    """`soragiri_cli.py serve`: run the shared job service"""
+    parser = argparse.ArgumentParser(
+        prog="soragiri_cli.py serve",
+        description="Run one SoraGiri engine as a local job service shared by every client"
+    )
+    parser.add_argument("--host", default=os.getenv("SORAGIRI_SERVE_HOST", "127.0.0.1"),
+                        help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SORAGIRI_SERVE_PORT", "8788")),
+                        help="Port to listen on (default: 8788)")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="Slices in flight at once (default: 8)")
+    parser.add_argument("--max-queue", type=int, default=1000,
+                        help="Jobs allowed to wait before new ones are refused (default: 1000, 0 = unlimited)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Minimal output")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    api_key = os.getenv("KIE_API_KEY")
+    if not api_key:
+        print(f"{C.RED}Error: KIE_API_KEY not found in environment{C.RESET}")
+        sys.exit(1)
+
+    if not args.quiet:
+        print_banner()
+    try:
+        asyncio.run(run_service(api_key, args.host, args.port, args.workers, args.max_queue))
+    except KeyboardInterrupt:
+        print(f"\n{C.YELLOW}  Dojo closed.{C.RESET}")
+
+
 def generate_output_name() -> Path:
     """Generate timestamped output filename"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -146,29 +306,59 @@ def generate_output_name() -> Path:
 
 
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        serve(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="SoraGiri (空斬り) - Watermark Slicing Engine",
+        epilog="To share one engine between scripts, start `soragiri_cli.py serve` "
+               "(see `serve --help`) and pass --daemon.",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
-    parser.add_argument("url", help="Sora video URL")
-    parser.add_argument("-o", "--output", type=Path, help="Output file path")
+    parser.add_argument("urls", nargs="*", metavar="url", help="Sora video URL(s)")
+    parser.add_argument("-o", "--output", type=Path, help="Output file path (single URL only)")
+    parser.add_argument("-i", "--input", metavar="FILE", help="Read URLs from FILE, one per line ('-' for stdin)")
+    parser.add_argument("-d", "--output-dir", type=Path, help="Directory for batch outputs (default: current directory)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Slices in flight at once (default: 4)")
     parser.add_argument("-q", "--quiet", action="store_true", help="Minimal output")
+    parser.add_argument("--daemon", metavar="URL", default=os.getenv("SORAGIRI_DAEMON") or None,
+                        help="Send the work to a running `serve` daemon at URL instead of slicing here")
 
     args = parser.parse_args()
 
-    # Get API key
+    urls = list(args.urls)
+    if args.input:
+        urls.extend(read_url_list(args.input))
+    elif not urls and not sys.stdin.isatty():
+        urls.extend(read_url_list("-"))
+
+    # Same video listed twice is only sliced (and counted) once
+    urls = unique_video_urls(urls)
+
+    if not urls:
+        parser.error("no URLs given (pass them as arguments, --input FILE, or on stdin)")
+    if args.output and len(urls) > 1:
+        parser.error("-o/--output takes a single URL; use --output-dir for batches")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    # Get API key (the daemon has its own)
     api_key = os.getenv("KIE_API_KEY")
-    if not api_key:
+    if not api_key and not args.daemon:
         print(f"{C.RED}Error: KIE_API_KEY not found in environment{C.RESET}")
         sys.exit(1)
 
-    output = args.output or generate_output_name()
-
     if not args.quiet:
         print_banner()
 
     try:
-        success = asyncio.run(run_slice(args.url, output, api_key))
+        if len(urls) == 1 and not args.output_dir:
+            output = args.output or generate_output_name()
+            success = asyncio.run(run_slice(urls[0], output, api_key, args.daemon))
+        else:
+            output_dir = args.output_dir or Path(".")
+            success = asyncio.run(run_batch(urls, output_dir, args.concurrency, api_key, args.daemon))
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print(f"\n{C.YELLOW}  Blade sheathed.{C.RESET}")